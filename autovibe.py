@@ -9,13 +9,18 @@ import json
 import subprocess
 import sys
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 from typing import Dict, Any
-import hashlib
+import asyncio
+import codecs
+import inspect
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import openai
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 from pydantic import BaseModel
 from enum import Enum
 import os
@@ -24,25 +29,204 @@ import platform
 import shutil
 from pathlib import Path
 
-from system_info import system_info
+from system_info import cached_system_info, get_venv_import_names, get_venv_packages
+from requirements_index import RequirementsIndex
+from llm_cache import LLMCache
+from llm_cassette import LLMCassette
+from verdict_store import VerdictStore, prompt_version
+from script_library import ScriptLibrary, code_hash
+from prevalidate import analyze
+from console_capture import ConsoleCapture, LLM_TOKEN_BUDGET, RESPONSE_TOKEN_BUDGET
+from run_limits import RunLimits, kill_group, signal_reason, wait_usage, wait_usage_async
+from concurrency import llm_slots, exec_slots, pip_slots, limits_stats
+from executor_pool import ExecutorPool
+from run_metrics import RunMetrics, RunUsage, run_stats, timed
+from metrics_registry import registry, observe_run, llm_errors, pip_seconds, fast_repairs, inferred_requirements
+from import_resolver import missing_module, distribution_for, infer_requirements, is_stdlib
 
 api_key = os.environ.get('OPEN_ROUTER_KEY', "")
+# any OpenAI compatible endpoint works (a local stub for load tests, benchmarks/stub_llm.py)
+base_url = os.environ.get('AUTOVIBE_LLM_BASE_URL') or "https://openrouter.ai/api/v1"
 client = OpenAI(
     api_key=api_key, 
-    base_url="https://openrouter.ai/api/v1",
+    base_url=base_url,
     )
+# same endpoint, but for the asyncio pipeline (as_tool_async): one client per event loop, its pooled
+# connections belong to the loop that opened them (Flask async views / asyncio.run => a new loop each time)
+async_clients: dict[asyncio.AbstractEventLoop, tuple] = {}
+async_clients_lock = threading.Lock()
+
+
+async def client_lifetime(loop: asyncio.AbstractEventLoop, loop_client: AsyncOpenAI):
+    """Async generator parked for as long as its loop runs: loop.shutdown_asyncgens()
+    (asyncio.run, Flask/asgiref on the way out) closes the client's connections."""
+    try:
+        yield
+    finally:
+        with async_clients_lock:
+            async_clients.pop(loop, None)
+        await loop_client.close()
+
+
+async def async_client() -> AsyncOpenAI:
+    loop = asyncio.get_running_loop()
+    with async_clients_lock:
+        # loops closed without shutting down their async generators
+        for closed in [l for l in async_clients if l.is_closed()]:
+            del async_clients[closed]
+        if loop in async_clients:
+            return async_clients[loop][0]
+        loop_client = AsyncOpenAI(api_key=api_key, base_url=base_url)
+        lifetime = client_lifetime(loop, loop_client)
+        async_clients[loop] = (loop_client, lifetime)
+    await lifetime.__anext__()
+    return loop_client
+
+# opt-in response cache (AUTOVIBE_LLM_CACHE), None when off
+llm_cache = LLMCache.from_env()
+# validation verdicts by script hash (AUTOVIBE_VERDICT_STORE), on by default
+verdict_store = VerdictStore.from_env()
+# record / replay llm_request calls (AUTOVIBE_CASSETTE), None when off
+cassette = LLMCassette.from_env()
+# scripts that worked, runnable again by id without the LLM (AUTOVIBE_SCRIPT_LIBRARY), on by default
+script_library = ScriptLibrary.from_env()
+
+
+def cache_lookups() -> dict:
+    lookups = {}
+    if llm_cache:
+        with llm_cache.lock:
+            for counts in llm_cache.counters.values():
+                lookups[('llm', 'hit')] = lookups.get(('llm', 'hit'), 0) + counts['hits']
+                lookups[('llm', 'miss')] = lookups.get(('llm', 'miss'), 0) + counts['misses']
+    if verdict_store:
+        lookups[('verdict', 'hit')] = verdict_store.hits
+        lookups[('verdict', 'miss')] = verdict_store.misses
+    return lookups
+
+
+def cache_hit_ratios() -> dict:
+    lookups = cache_lookups()
+    ratios = {}
+    for cache in {cache for cache, _ in lookups}:
+        hits, misses = lookups.get((cache, 'hit'), 0), lookups.get((cache, 'miss'), 0)
+        ratios[(cache,)] = hits / (hits + misses) if hits + misses else 0.0
+    return ratios
+
+
+registry.callback('autovibe_cache_lookups_total', "LLM response cache / verdict store lookups",
+                  cache_lookups, ('cache', 'result'), kind='counter')
+registry.callback('autovibe_cache_hit_ratio', "Hits / lookups since start", cache_hit_ratios, ('cache',))
+registry.callback('autovibe_slots_in_use', "Process-wide concurrency slots taken",
+                  lambda: {(name,): limiter['active'] for name, limiter in limits_stats().items()}, ('limiter',))
+registry.callback('autovibe_slots_waiting', "Waiting for a concurrency slot",
+                  lambda: {(name,): limiter['waiting'] for name, limiter in limits_stats().items()}, ('limiter',))
+registry.callback('autovibe_exec_pool_spawns_total', "Scripts forked from a warm zygote instead of a cold interpreter",
+                  lambda: sum(stats['spawned'] for stats in exec_pool_stats().values()), kind='counter')
+registry.callback('autovibe_exec_pool_saved_seconds_total', "Estimated startup time saved by the executor pool",
+                  lambda: sum(stats['saved_s_total'] or 0 for stats in exec_pool_stats().values()), kind='counter')
+
+
+def llm_request(baseClass, system, user, model, metrics: RunMetrics = None, generations: list = None):
+    """metrics => the call (time, tokens, cache hit) is recorded there.
+    generations => a code generation goes there instead of into llm_cache (see AutoVibe.settle_generations)."""
+    started = time.monotonic()
+    if cassette and cassette.replaying:
+        with llm_slots:
+            waited = time.monotonic() - started
+            response, usage, delay = cassette.play(baseClass, system, user, model)
+            time.sleep(delay)
+        if metrics:
+            metrics.llm_call(baseClass.__name__, model, time.monotonic() - started, waited, usage)
+        return response
+
+    if llm_cache:
+        cached = llm_cache.get(baseClass, system, user, model)
+        if cached:
+            if generations is not None:
+                generations.append(((baseClass, system, user, model), cached, True))
+            if metrics:
+                metrics.llm_call(baseClass.__name__, model, time.monotonic() - started, cache_hit=True)
+            if cassette:
+                cassette.record(baseClass, system, user, model, cached, latency_s=time.monotonic() - started)
+            return cached
+
+    with llm_slots:
+        waited = time.monotonic() - started
+        try:
+            completion = client.beta.chat.completions.parse(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system},
+                    {"role": "user", "content": user},
+                ],
+                response_format=baseClass,
+            )
+        except Exception as e:
+            llm_errors.inc(model, type(e).__name__)
+            raise
+    if metrics:
+        metrics.llm_call(baseClass.__name__, model, time.monotonic() - started, waited, completion.usage)
+    response = completion.choices[0].message.parsed
+    if cassette:
+        cassette.record(baseClass, system, user, model, response, completion.usage, time.monotonic() - started - waited)
+    if response and llm_cache:
+        if generations is not None:
+            generations.append(((baseClass, system, user, model), response, False))
+        else:
+            llm_cache.put(baseClass, system, user, model, response)
+    return response or None
 
 
-def llm_request(baseClass, system, user, model):
-    completion = client.beta.chat.completions.parse(
-        model=model,
-        messages=[
-            {"role": "system", "content": system},
-            {"role": "user", "content": user},
-        ],
-        response_format=baseClass,
-    )
+async def llm_request_async(baseClass, system, user, model, metrics: RunMetrics = None, generations: list = None):
+    """metrics => the call (time, tokens, cache hit) is recorded there.
+    generations => a code generation goes there instead of into llm_cache (see AutoVibe.settle_generations)."""
+    started = time.monotonic()
+    if cassette and cassette.replaying:
+        async with llm_slots:
+            waited = time.monotonic() - started
+            response, usage, delay = cassette.play(baseClass, system, user, model)
+            await asyncio.sleep(delay)
+        if metrics:
+            metrics.llm_call(baseClass.__name__, model, time.monotonic() - started, waited, usage)
+        return response
+
+    if llm_cache:
+        cached = await asyncio.to_thread(llm_cache.get, baseClass, system, user, model)
+        if cached:
+            if generations is not None:
+                generations.append(((baseClass, system, user, model), cached, True))
+            if metrics:
+                metrics.llm_call(baseClass.__name__, model, time.monotonic() - started, cache_hit=True)
+            if cassette:
+                cassette.record(baseClass, system, user, model, cached, latency_s=time.monotonic() - started)
+            return cached
+
+    loop_client = await async_client()
+    async with llm_slots:
+        waited = time.monotonic() - started
+        try:
+            completion = await loop_client.beta.chat.completions.parse(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system},
+                    {"role": "user", "content": user},
+                ],
+                response_format=baseClass,
+            )
+        except Exception as e:
+            llm_errors.inc(model, type(e).__name__)
+            raise
+    if metrics:
+        metrics.llm_call(baseClass.__name__, model, time.monotonic() - started, waited, completion.usage)
     response = completion.choices[0].message.parsed
+    if cassette:
+        cassette.record(baseClass, system, user, model, response, completion.usage, time.monotonic() - started - waited)
+    if response and llm_cache:
+        if generations is not None:
+            generations.append(((baseClass, system, user, model), response, False))
+        else:
+            await asyncio.to_thread(llm_cache.put, baseClass, system, user, model, response)
     return response or None
 
 
@@ -77,12 +261,24 @@ class AutoVibeCheck(BaseModel):
     reasoning: str
     message: str
 
+class ScriptRefused(Exception):
+    """A library script that won't run directly; reason says why (unknown, not_approved, bad_args, gone, changed)."""
+    def __init__(self, reason: str, message: str):
+        super().__init__(message)
+        self.reason = reason
+
 class ToolReturn(BaseModel):
     is_error: bool
     content: str
     results: list[AutoVibeCheck]
-
-def code_gen_system(repair_mode=False):
+    # one entry per script run, in order
+    usage: list[RunUsage] = []
+    # full (untruncated) script output: console_capture.read_log / GET /logs/<log_id>
+    log_id: str | None = None
+    # per stage wall time, LLM calls + tokens, script rusage (run_metrics.py)
+    metrics: RunMetrics | None = None
+
+def code_gen_system(repair_mode=False, venv_dir=None):
     system =  """
 You are top coding agent. Your job is to help user manage their PC or accomplish simple tasks automatically.
 Generate clean, working Python code based on user requests. 
@@ -161,7 +357,7 @@ Input: "Create a script to list files in a directory."
     system += f"""
 
     SYSTEM INFO:
-    {system_info()}
+    {cached_system_info(venv_dir)}
 
     """
     return system.strip()
@@ -286,56 +482,363 @@ Output:
 - Provide a brief message of operation status. (shown to user)
 - Maintain coherence between the reasoning and the success boolean value.
 """
+# hash of validation_system: edit the policy text => previously stored verdicts stop matching
+VALIDATION_PROMPT_VERSION = prompt_version(validation_system)
+
+def repair_prompt(user_request, current_script_text, current_console_dump):
+    return f"""
+        # Initial user request:
+
+        <user_request>
+            {user_request}
+        </user_request>
 
+        # Previously generated code:
+        <previous_code>
+            {current_script_text}
+        </previous_code>
 
+        <full_console_dumps>
+            {current_console_dump}
+        </full_console_dumps>
+        """
 
-class AutoVibe:
-    def __init__(self, 
-        max_retry=2, 
-        auto_check=False,
-        exec_timeout=120,
-        max_risk_level="DENY"
+def check_prompt(user_request, current_console_dump):
+    return f"""
+        # Initial user request:
 
-        ):
+        <user_request>
+            {user_request}
+        </user_request>
+
+        # Console log dump:
+
+        <full_console_dumps>
+            {current_console_dump}
+        </full_console_dumps>
+        """
+
+
+def print_output(stream: str, text: str):
+    """on_output for the terminal: echo script output live as it comes."""
+    target = sys.stderr if stream == 'stderr' else sys.stdout
+    target.write(text)
+    target.flush()
+
+
+# generated scripts + their venv live here (relative to cwd)
+SCRIPTS_DIR = Path("./vibe_scripts")
+# after the script exits, how long to wait for its pipes to drain (something it spawned may hold them open)
+PIPE_DRAIN_TIMEOUT = 5
+# missing-module installs + re-runs per run before it's the LLM's turn, and how much stderr to look at
+MAX_FAST_REPAIRS = 3
+FAST_REPAIR_SCAN_CHARS = 8 * 1024
+# error ToolReturn content prefix => outcome label (anything else that failed: 'failed')
+RUN_OUTCOMES = (
+    ("Max retry reached", 'max_retry'),
+    ("Code gen error", 'codegen_error'),
+    ("Failed to install requirements", 'install_failed'),
+    ("Unknown error", 'exception'),
+)
+
+
+def exec_pool_stats() -> dict:
+    """Executor pool stats per scripts dir (engines that have one)."""
+    with VibeEngine._shared_lock:
+        engines = list(VibeEngine._shared.items())
+    return {str(path): engine.exec_pool.stats() for path, engine in engines if engine.exec_pool}
+
+
+class VibeEngine:
+    """What all runs share: scripts dir, the one venv and its requirements index.
+    Nothing run-specific lives here; the venv is only changed under venv_lock."""
+
+    _shared: dict[Path, 'VibeEngine'] = {}
+    _shared_lock = threading.Lock()
 
-        self.scripts_dir = Path("./vibe_scripts")
-        self.scripts_dir.mkdir(exist_ok=True)
+    def __init__(self, scripts_dir: Path = SCRIPTS_DIR):
+        self.scripts_dir = Path(scripts_dir)
+        self.scripts_dir.mkdir(parents=True, exist_ok=True)
         self.venv_dir = self.scripts_dir / "venv"
         # Set venv python executable path
         if os.name == 'nt':  # Windows
             self.venv_python = self.venv_dir / "Scripts" / "python.exe"
         else:  # Unix/Linux/macOS
             self.venv_python = self.venv_dir / "bin" / "python"
+        # per-run scratch dirs (TMPDIR of the scripts), removed when the run ends
+        self.runs_dir = self.scripts_dir / "runs"
 
+        # pip into one venv from two runs at once ends badly
+        self.venv_lock = threading.Lock()
         self.setup_venv()
+        # what the venv already has => pip only runs for the missing subset
+        self.requirements_index = RequirementsIndex(self.venv_dir)
+        # warm zygote forking the scripts (AUTOVIBE_EXEC_POOL), None => cold interpreter per run
+        self.exec_pool = ExecutorPool.from_env(self.venv_python, self.venv_dir)
+        if self.exec_pool:
+            self.exec_pool.start()
+
+    @classmethod
+    def shared(cls, scripts_dir: Path = SCRIPTS_DIR) -> 'VibeEngine':
+        """One engine per scripts dir per process, so every AutoVibe uses the same venv lock."""
+        key = Path(scripts_dir).resolve()
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(scripts_dir)
+            return cls._shared[key]
+
+    def popen_script(self, filepath: Path, env: dict, limits: RunLimits, args: list[str] = ()) -> subprocess.Popen:
+        """Start a script with piped stdout/stderr: forked from the warm pool when there is one, else cold."""
+        def cold():
+            return limits.spawn(
+                [str(self.venv_python), str(filepath), *args],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                env=env,
+            )
+        if not self.exec_pool:
+            return cold()
+        return self.exec_pool.popen(str(filepath), os.getcwd(), env, limits.rlimits(), cold, list(args))
 
-        # START | REPAIR
-        self.current_stage = 'START'
-        self.current_retry = 0
-        self.max_retry = max_retry
-        self.auto_check = auto_check
-        self.max_risk_level = max_risk_level
+    def popen_pooled(self, filepath: Path, env: dict, limits: RunLimits, args: list[str] = ()) -> subprocess.Popen | None:
+        """popen_script from the warm pool only: None when there is no pool or it can't fork."""
+        if not self.exec_pool:
+            return None
+        return self.exec_pool.popen(str(filepath), os.getcwd(), env, limits.rlimits(), lambda: None, list(args))
 
-        # script name and text, so we feed onto next loop, if not
-        # on repair will overwrite file, not patch (until they really learn how to do a proper patch...)
-        self.user_request = ''
+    def setup_venv(self):
+        """Create virtual environment if it doesn't exist."""
+        with self.venv_lock:
+            if not self.venv_dir.exists():
+                print("🔧 Creating virtual environment...")
+                subprocess.run([sys.executable, "-m", "venv", str(self.venv_dir)], check=True)
+                print(f"✅ Virtual environment created at: {self.venv_dir}")
 
-        self.current_script_name = ''
-        self.current_script_text = ''
-        self.current_console_dump = ''
+    def write_script(self, code_gen: CodeGeneration) -> Path:
+        """Save generated code to file with hash suffix."""
+        # Generate hash from code content
+        short_hash = code_hash(code_gen.code)[:8]  # First 8 chars
 
-        self.check_results: list[AutoVibeCheck] = []
+        # Split filename and extension
+        base_name = code_gen.filename.replace('.py', '')
+        hashed_filename = f"{base_name}_{short_hash}.py"
 
-    def setup_venv(self):
-        """Create virtual environment if it doesn't exist."""
-        if not self.venv_dir.exists():
-            print("🔧 Creating virtual environment...")
-            subprocess.run([sys.executable, "-m", "venv", str(self.venv_dir)], check=True)
-            print(f"✅ Virtual environment created at: {self.venv_dir}")
-    
-    def generate_code(self, user_prompt: str) -> CodeGeneration:
+        filepath = self.scripts_dir / hashed_filename
+
+        # same name => same bytes, but write-then-rename so a parallel run never executes half a file
+        partial = filepath.with_name(f".{hashed_filename}.{threading.get_ident()}.tmp")
+        with open(partial, 'w', encoding='utf-8') as f:
+            f.write(code_gen.code)
+        os.replace(partial, filepath)
+
+        print(f"💾 Code saved to: {filepath}")
+        return filepath
+
+    def pip_install(self, requirements: list[str]) -> bool:
+        """Install required packages (only the ones venv doesn't have yet)."""
+        if not requirements:
+            return True
+
+        if not self.requirements_index.missing(requirements):
+            print("📦 Requirements already installed")
+            return True
+
+        with self.venv_lock:
+            # whoever held the lock may have just installed them
+            requirements = self.requirements_index.missing(requirements)
+            if not requirements:
+                print("📦 Requirements already installed")
+                return True
+
+            print("📦 Installing requirements...")
+            try:
+                before = self.requirements_index.snapshot()
+                with pip_slots:
+                    started = time.monotonic()
+                    try:
+                        subprocess.run(
+                            [str(self.venv_python), "-m", "pip", "install", *requirements],
+                            check=True,
+                            capture_output=True,
+                            text=True
+                        )
+                    except subprocess.CalledProcessError:
+                        pip_seconds.observe(time.monotonic() - started, 'failed')
+                        raise
+                    pip_seconds.observe(time.monotonic() - started, 'ok')
+                self.requirements_index.record(requirements, before)
+                print(f"✅ Installed: {', '.join(requirements)}")
+                return True  # Add explicit return True
+            except subprocess.CalledProcessError as e:
+                print(f"❌ Failed to install {', '.join(requirements)}: {e}")
+                # Access stderr from the result object
+                if e.stderr:
+                    print(f"Error output: {e.stderr}")
+                return False
+
+    def infer_requirements(self, code_gen: CodeGeneration) -> tuple[list[str], list[str], list[str], list[str]]:
+        """Declared requirements vs the code's imports (import_resolver.infer_requirements) => (requirements, added, dropped, skipped)."""
+        with os.scandir(self.scripts_dir) as entries:
+            local = {entry.name[:-3] for entry in entries if entry.name.endswith('.py')}
+        return infer_requirements(
+            code_gen.code,
+            code_gen.requirements,
+            get_venv_import_names(self.venv_dir),
+            set(get_venv_packages(self.venv_dir)),
+            local,
+            self.known_distributions(),
+        )
+
+    def known_distributions(self) -> set[str]:
+        """Dist names we trust pip installing for a bare import name: what the venv has or had."""
+        return set(get_venv_packages(self.venv_dir)) | self.requirements_index.known_names()
+
+    def new_run_dir(self, run_id: str) -> Path:
+        run_dir = self.runs_dir / run_id
+        run_dir.mkdir(parents=True, exist_ok=True)
+        return run_dir
+
+
+@dataclass
+class VibeRun:
+    """State of one request going through the loop. A fresh one per as_tool/as_tool_async/as_repl call,
+    so one AutoVibe can serve many requests at once."""
+    user_request: str
+    run_dir: Path
+    on_output: Any = None
+    on_progress: Any = None
+    # START | REPAIR
+    stage: str = 'START'
+    # GENERATE | REPAIR | VALIDATE | EXECUTE | CHECK, for on_progress
+    step: str = ''
+    retry: int = 0
+    # script name and text, so we feed onto next loop, if not
+    # on repair will overwrite file, not patch (until they really learn how to do a proper patch...)
+    script_name: str = ''
+    script_text: str = ''
+    # every attempt's output, bounded in memory, full text spilled to disk
+    console: ConsoleCapture = field(default_factory=ConsoleCapture)
+    check_results: list[AutoVibeCheck] = field(default_factory=list)
+    usage: list[RunUsage] = field(default_factory=list)
+    metrics: RunMetrics = field(default_factory=RunMetrics)
+    started: float = field(default_factory=time.monotonic)
+    # modules already pip installed after a ModuleNotFoundError this run (each gets one go)
+    fast_repaired: list[str] = field(default_factory=list)
+    # requirements added from the script's imports (not declared by the model)
+    inferred: list[str] = field(default_factory=list)
+    # code generations this run got: ((llm_cache key args), response, came from cache)
+    generations: list[tuple] = field(default_factory=list)
+    # last script that passed validation + what it needs, for the script library
+    script_path: Path | None = None
+    requirements: list[str] = field(default_factory=list)
+    validation: ValidationResult | None = None
+    # where the last verdict came from: llm | verdict_store | local (prevalidate.py)
+    verdict_source: str = ''
+    # extra argv for the script (library runs)
+    script_args: list[str] = field(default_factory=list)
+
+    @property
+    def console_dump(self) -> str:
+        """All attempts' output, truncated to fit the LLM prompt budget."""
+        return self.console.render(LLM_TOKEN_BUDGET)
+
+
+class AutoVibe:
+    """Settings + the shared engine. Run state lives in VibeRun, so calls may overlap (threads or tasks)."""
+
+    def __init__(self,
+        max_retry=2,
+        auto_check=False,
+        exec_timeout=120,
+        max_risk_level="DENY",
+        pipeline=True,
+        prevalidate=True,
+        fast_repair=True,
+        infer_requirements=True,
+        on_output=None,
+        on_progress=None,
+        engine: VibeEngine = None,
+
+        ):
+
+        self.engine = engine or VibeEngine.shared()
+        self.scripts_dir = self.engine.scripts_dir
+        self.venv_dir = self.engine.venv_dir
+        self.venv_python = self.engine.venv_python
+
+        self.max_retry = max_retry
+        self.auto_check = auto_check
+        self.max_risk_level = max_risk_level
+        # wall clock per run + rlimits (cpu, memory, open files) from AUTOVIBE_LIMIT_*
+        self.exec_timeout = exec_timeout
+        self.limits = RunLimits.from_env(exec_timeout)
+        # install requirements while the validation LLM call is in flight (as_tool / as_tool_async)
+        self.pipeline = pipeline
+        # decide obviously safe / obviously bad scripts locally, LLM validator only for the rest
+        self.prevalidate = prevalidate
+        # ModuleNotFoundError => pip install the module + re-run the same script, no LLM repair, no retry used
+        self.fast_repair = fast_repair
+        # requirements cross-checked with the script's imports (AST) before install
+        self.infer_requirements = infer_requirements
+        # on_output(stream, text): called with each stdout/stderr chunk while a script runs
+        # (may be async when used from as_tool_async)
+        self.on_output = on_output
+        # on_progress(run): called when the tool loop moves to another step (GENERATE, VALIDATE, ...)
+        self.on_progress = on_progress
+
+    def new_run(self, user_request: str, on_output=None) -> VibeRun:
+        console = ConsoleCapture()
+        return VibeRun(
+            user_request=user_request,
+            run_dir=self.engine.new_run_dir(console.log_id),
+            on_output=on_output or self.on_output,
+            on_progress=self.on_progress,
+            console=console,
+        )
+
+    def end_run(self, run: VibeRun):
+        shutil.rmtree(run.run_dir, ignore_errors=True)
+        run.metrics.total_s = time.monotonic() - run.started
+        run_stats.add(run.metrics)
+        observe_run(run.metrics)
+
+    def finish_run(self, run: VibeRun, result: 'ToolReturn') -> 'ToolReturn':
+        """Label the run's outcome for metrics, from what the loop returned."""
+        if not result.is_error:
+            run.metrics.outcome = 'ok'
+            self.remember_script(run)
+        else:
+            run.metrics.outcome = next(
+                (outcome for prefix, outcome in RUN_OUTCOMES if result.content.startswith(prefix)), 'failed'
+            )
+        self.settle_generations(run, ok=not result.is_error)
+        return result
+
+    def settle_generations(self, run: VibeRun, ok: bool):
+        """llm_cache only keeps a code generation whose script worked (the run's last one, when it succeeded);
+        a cached one that needed repair or failed goes, so the next identical request asks the model again."""
+        if not llm_cache:
+            return
+        last = len(run.generations) - 1
+        for i, (args, response, cached) in enumerate(run.generations):
+            worked = ok and i == last
+            if worked and not cached:
+                llm_cache.put(*args, response)
+            elif not worked and cached:
+                llm_cache.delete(*args)
+        run.generations.clear()
+
+    def report_progress(self, run: VibeRun, step: str):
+        run.step = step
+        run.metrics.attempt = run.retry
+        if run.on_progress:
+            run.on_progress(run)
+
+    def generate_code(self, user_prompt: str, run: VibeRun = None) -> CodeGeneration:
         """Generate Python code from user prompt using OpenAI."""
-        result = llm_request(CodeGeneration, code_gen_system(), user_prompt, model_generate)
+        metrics = run.metrics if run else None
+        with timed(metrics, 'generate'):
+            result = llm_request(CodeGeneration, code_gen_system(venv_dir=self.venv_dir), user_prompt, model_generate, metrics, run and run.generations)
         
         # Debug: Check if code has proper line breaks
         if result and result.code:
@@ -345,30 +848,37 @@ class AutoVibe:
         
         return result
 
-    def repair_code(self, user_request, current_script_text, current_console_dump):
-        user_prompt = f"""
-        # Initial user request:
+    def repair_code(self, user_request, current_script_text, current_console_dump, run: VibeRun = None):
+        user_prompt = repair_prompt(user_request, current_script_text, current_console_dump)
+        metrics = run.metrics if run else None
+        with timed(metrics, 'repair'):
+            return llm_request(CodeGeneration, code_gen_system(venv_dir=self.venv_dir), user_prompt, model_generate, metrics, run and run.generations)
+        
 
-        <user_request>
-            {user_request}
-        </user_request>
 
-        # Previously generated code:
-        <previous_code>
-            {current_script_text}
-        </previous_code>
+    def validate_code(self, run: VibeRun, code: str) -> ValidationResult:
+        """Validate generated code for safety and correctness."""
+        with timed(run.metrics, 'validate'):
+            return self.validate_code_timed(run, code)
 
-        <full_console_dumps>
-            {current_console_dump}
-        </full_console_dumps>
-        """
-        return llm_request(CodeGeneration, code_gen_system(), user_prompt, model_generate)
-        
+    def validate_code_timed(self, run: VibeRun, code: str) -> ValidationResult:
+        stored = self.stored_verdict(code)
+        if stored:
+            run.verdict_source = 'verdict_store'
+            return stored
 
+        local = self.local_verdict(run, code)
+        if local:
+            run.verdict_source = 'local'
+            return local
 
-    def validate_code(self, code: str) -> ValidationResult:
-        """Validate generated code for safety and correctness."""
-        result = llm_request(ValidationResult, validation_system, code, model_validate)
+        run.verdict_source = 'llm'
+
+        return self.llm_verdict(run, code)
+
+    def llm_verdict(self, run: VibeRun, code: str) -> ValidationResult:
+        result = llm_request(ValidationResult, validation_system, code, model_validate, run.metrics)
+        self.store_verdict(code, result)
         if not result:
             return ValidationResult(
                 correct=True, 
@@ -378,108 +888,409 @@ class AutoVibe:
         
         return result
     
-    def auto_vibe_check(self, user_request, current_console_dump):
-        user_prompt = f"""
-        # Initial user request:
-
-        <user_request>
-            {user_request}
-        </user_request>
-
-        # Console log dump:
-
-        <full_console_dumps>
-            {current_console_dump}
-        </full_console_dumps>
-        """
-        result = llm_request(AutoVibeCheck, check_system, user_prompt, model_validate)
-        return result
+    def stored_verdict(self, code: str) -> ValidationResult | None:
+        """Verdict for byte-identical code seen before (same validator model + prompt version)."""
+        if not verdict_store:
+            return None
+        verdict = verdict_store.get(ValidationResult, code_hash(code), model_validate, VALIDATION_PROMPT_VERSION)
+        if verdict:
+            print("📋 Reusing stored validation verdict")
+        return verdict
+
+    def local_verdict(self, run: VibeRun, code: str) -> ValidationResult | None:
+        """Static AST check (prevalidate.py). Only clear ALLOW/DENY/broken cases, None => ask the LLM."""
+        if not self.prevalidate:
+            return None
+        report = analyze(code)
+        if report.syntax_error:
+            return self.check_syntax(run, code, run.script_name)
+        decision = report.decision()
+        if not decision:
+            return None
+        risk, correct, reasoning = decision
+        print(f"📋 Local pre-validation: {risk}")
+        return ValidationResult(correct=correct, risk=RiskLevel(risk), reasoning=reasoning)
+
+    def store_verdict(self, code: str, verdict: ValidationResult | None):
+        # fallback CHECK (validator returned nothing) is not a verdict, don't keep it
+        if verdict_store and verdict:
+            verdict_store.put(code_hash(code), model_validate, VALIDATION_PROMPT_VERSION, verdict)
+    
+    def auto_vibe_check(self, user_request, current_console_dump, run: VibeRun = None):
+        user_prompt = check_prompt(user_request, current_console_dump)
+        metrics = run.metrics if run else None
+        with timed(metrics, 'check'):
+            return llm_request(AutoVibeCheck, check_system, user_prompt, model_validate, metrics)
         
 
     def save_code(self, code_gen: CodeGeneration) -> Path:
-        """Save generated code to file with hash suffix."""
-        # Generate hash from code content
-        code_hash = hashlib.md5(code_gen.code.encode('utf-8')).hexdigest()[:8]  # First 8 chars
-        
-        # Split filename and extension
-        base_name = code_gen.filename.replace('.py', '')
-        hashed_filename = f"{base_name}_{code_hash}.py"
-        
-        filepath = self.scripts_dir / hashed_filename
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(code_gen.code)
-            
-        print(f"💾 Code saved to: {filepath}")
-        return filepath
-
-
-    def install_requirements(self, requirements: list[str]) -> bool:
-        """Install required packages."""
-        if not requirements:
+        return self.engine.write_script(code_gen)
+
+    def script_requirements(self, run: VibeRun, code_gen: CodeGeneration) -> list[str]:
+        """What to install for this script: declared requirements minus stdlib names, plus missing imports."""
+        if not self.infer_requirements:
+            return code_gen.requirements
+        requirements, added, dropped, skipped = self.engine.infer_requirements(code_gen)
+        run.inferred = added
+        run.metrics.inferred_requirements = added
+        run.metrics.skipped_requirements = skipped
+        for kind, names in (('added', added), ('dropped', dropped), ('skipped', skipped)):
+            if names:
+                inferred_requirements.inc(kind, amount=len(names))
+        if added or dropped:
+            print(f"📦 Requirements from imports: +{', '.join(added) or '-'} / dropped stdlib {', '.join(dropped) or '-'}")
+        if skipped:
+            print(f"🤷 Imports with no distribution we know, not installing: {', '.join(skipped)}")
+        return requirements
+
+    def install_requirements(self, requirements: list[str], run: VibeRun = None) -> bool:
+        with timed(run.metrics if run else None, 'install'):
+            return self.pip_install(requirements, run)
+
+    def pip_install(self, requirements: list[str], run: VibeRun = None) -> bool:
+        if self.engine.pip_install(requirements):
             return True
-            
-        print("📦 Installing requirements...")
-        try:
-            subprocess.run(
-                [str(self.venv_python), "-m", "pip", "install", *requirements],
-                check=True,
-                capture_output=True,
-                text=True
-            )
-            print(f"✅ Installed: {', '.join(requirements)}")
-            return True  # Add explicit return True
-        except subprocess.CalledProcessError as e:
-            print(f"❌ Failed to install {', '.join(requirements)}: {e}")
-            # Access stderr from the result object
-            if e.stderr:
-                print(f"Error output: {e.stderr}")
+        # a guessed distribution that doesn't exist shouldn't sink what the model declared
+        declared = [r for r in requirements if r not in (run.inferred if run else ())]
+        if len(declared) == len(requirements):
             return False
+        print("↩️  Retrying without the requirements inferred from imports")
+        return self.engine.pip_install(declared)
 
 
-    def execute_code(self, filepath: Path) -> tuple[bool, str]:
-        """Execute the Python script."""
+    def check_syntax(self, run: VibeRun, code: str, filename: str) -> ValidationResult | None:
+        """Compile locally; on SyntaxError log it for repair and return a failed validation."""
+        try:
+            compile(code, filename or '<vibe>', 'exec')
+            return None
+        except (SyntaxError, ValueError) as e:
+            print(f"❌ Syntax error: {e}")
+            run.console.note('stderr', f"SyntaxError: {e}\n", label='syntax')
+            return ValidationResult(
+                correct=False, 
+                risk=RiskLevel.CHECK, 
+                reasoning=f'Local compile failed: {e}'
+                )
+
+    def validate_and_install(self, run: VibeRun, code_gen: CodeGeneration) -> tuple[ValidationResult, bool | None]:
+        """Pipelined: pip install in a thread while validation LLM call runs.
+        Venv is isolated, so installing for a script that gets rejected later is harmless.
+        Returns (validation, requirements installed?) - None when install never started."""
+        failed = self.check_syntax(run, code_gen.code, code_gen.filename)
+        if failed:
+            return failed, None
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            install = pool.submit(self.install_requirements, code_gen.requirements, run)
+            validation = self.validate_code(run, code_gen.code)
+            return validation, install.result()
+
+    def record_execution(self, run: VibeRun, attempt, returncode: int, usage: dict = None, timed_out=False) -> tuple[bool, str]:
+        """Close the attempt's capture, keep its resource usage and turn return code into (ok, message)."""
+        attempt.close(returncode)
+        cost = RunUsage(returncode=returncode, timed_out=timed_out, **(usage or {}))
+        run.usage.append(cost)
+        run.metrics.executions.append(cost)
+
+        if not run.on_output:  # already streamed otherwise
+            print("Latest console dump: ")
+            print(attempt.render(RESPONSE_TOKEN_BUDGET * 4))
+
+        summary = f"{cost.elapsed_s:.2f}s wall"
+        if cost.cpu_user_s is not None:
+            summary += f", {cost.cpu_user_s + cost.cpu_system_s:.2f}s CPU, {cost.max_rss_kb // 1024} MB peak RSS"
+        print(f"⏱️  {summary}")
+
+        if timed_out:
+            print(f"⏰ Execution timed out ({self.exec_timeout}s limit)")
+            return (False, f"⏰ Execution timed out ({self.exec_timeout}s limit)")
+        if returncode == 0:
+            print("✅ Execution completed successfully")
+            return (True, "✅ Execution completed successfully")
+        reason = signal_reason(returncode)
+        message = f"❌ Execution failed with code: {returncode}" + (f" ({reason})" if reason else "")
+        print(message)
+        return (False, message)
+
+    def missing_dependency(self, run: VibeRun) -> tuple[str, str] | None:
+        """Last execution died importing something pip can provide => (module, distribution), else None."""
+        if not self.fast_repair or len(run.fast_repaired) >= MAX_FAST_REPAIRS or not run.console.attempts:
+            return None
+        attempt = run.console.attempts[-1]
+        if attempt.label != 'exec' or not attempt.returncode:
+            return None
+        module = missing_module(attempt.streams['stderr'].text(FAST_REPAIR_SCAN_CHARS))
+        distribution = distribution_for(module, self.engine.known_distributions())
+        if module and not distribution and not is_stdlib(module):
+            fast_repairs.inc('unknown_package')
+            print(f"🤷 Missing module {module!r} is no package we know, leaving it to the LLM repair")
+        if not distribution or module in run.fast_repaired or distribution in run.inferred:
+            return None
+        # already there => the import is broken some other way, that's a job for the LLM
+        if not self.engine.requirements_index.missing([distribution]):
+            return None
+        run.fast_repaired.append(module)
+        run.metrics.fast_repairs.append(module)
+        print(f"🩹 Missing module {module!r} => installing {distribution} and re-running, no LLM repair")
+        return module, distribution
+
+    def note_fast_repair(self, run: VibeRun, module: str, distribution: str, installed: bool):
+        if not installed:
+            fast_repairs.inc('install_failed')
+            return
+        run.console.note('stdout', f"📦 Installed {distribution} for missing module {module}, same script re-run below\n", label='fast-repair')
+
+    def execute_with_repair(self, run: VibeRun, filepath: Path) -> tuple[bool, str]:
+        """execute_code, plus the local fix for missing modules (pip install, run again)."""
+        code_run, message = self.execute_code(run, filepath)
+        while not code_run and (missing := self.missing_dependency(run)):
+            module, distribution = missing
+            installed = self.install_requirements([distribution], run)
+            self.note_fast_repair(run, module, distribution, installed)
+            if not installed:
+                break
+            code_run, message = self.execute_code(run, filepath)
+            fast_repairs.inc('ok' if code_run else 'still_failing')
+        return code_run, message
+
+    def script_env(self, run: VibeRun) -> dict:
+        """Env for generated scripts: unbuffered utf-8 output, so chunks arrive as they are printed,
+        temp files in the run's own scratch dir."""
+        env = dict(os.environ)
+        env['PYTHONUNBUFFERED'] = '1'
+        env['PYTHONIOENCODING'] = 'utf-8'
+        env['AUTOVIBE_RUN_DIR'] = str(run.run_dir.resolve())
+        for name in ('TMPDIR', 'TEMP', 'TMP'):
+            env[name] = env['AUTOVIBE_RUN_DIR']
+        return env
+
+    def emit_output(self, run: VibeRun, stream: str, text: str):
+        """Forward an output chunk to on_output (sync path: coroutine callbacks not supported here)."""
+        if run.on_output and text:
+            run.on_output(stream, text)
+
+    def pump_output(self, run: VibeRun, pipe, stream: str, attempt):
+        """Reader thread: pipe => decoded chunks => attempt capture + on_output, until EOF."""
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        for chunk in iter(lambda: pipe.read1(4096), b''):
+            text = decoder.decode(chunk)
+            attempt.write(stream, text)
+            self.emit_output(run, stream, text)
+        tail = decoder.decode(b'', final=True)
+        if tail:
+            attempt.write(stream, tail)
+            self.emit_output(run, stream, tail)
+        pipe.close()
+
+    def execute_code(self, run: VibeRun, filepath: Path) -> tuple[bool, str]:
+        """Execute the Python script under run limits, streaming stdout/stderr to on_output as it runs."""
+        with timed(run.metrics, 'execute'):
+            return self.execute_code_timed(run, filepath)
+
+    def execute_code_timed(self, run: VibeRun, filepath: Path) -> tuple[bool, str]:
         try:
             print(f"🚀 Executing: {filepath}")
             print("=" * 50)
             
-            result = subprocess.run(
-                [str(self.venv_python), str(filepath)], 
-                capture_output=True, 
-                text=True, 
-                timeout=120
-            )
-            
-            execution_log = ""
-
-            if result.stdout:
-                execution_log += "📤 Output: \n" + result.stdout + "\n"
-                
-            if result.stderr:
-                execution_log += "⚠️  Errors: \n" + result.stderr + "\n"
+            # AUTOVIBE_MAX_EXECUTIONS scripts at once, the timeout only starts once we have a slot
+            with exec_slots:
+                started = time.monotonic()
+                proc = self.engine.popen_script(filepath, self.script_env(run), self.limits, run.script_args)
+                attempt = run.console.new_attempt()
+                readers = [
+                    threading.Thread(target=self.pump_output, args=(run, proc.stdout, 'stdout', attempt), daemon=True),
+                    threading.Thread(target=self.pump_output, args=(run, proc.stderr, 'stderr', attempt), daemon=True),
+                ]
+                for reader in readers:
+                    reader.start()
+
+                # wait4 has no timeout => reap in a thread, kill the whole group if it overstays
+                usage = {}
+                waiter = threading.Thread(target=lambda: usage.update(wait_usage(proc, started)), daemon=True)
+                waiter.start()
+                waiter.join(self.exec_timeout)
+                timed_out = waiter.is_alive()
+                if timed_out:
+                    kill_group(proc)
+                    waiter.join()
+
+                # keep what it printed even on timeout, repair wants to see it
+                for reader in readers:
+                    reader.join(PIPE_DRAIN_TIMEOUT)
+                return self.record_execution(run, attempt, usage.pop('returncode', proc.returncode), usage, timed_out)
                 
-            # Append to existing dump instead of replacing
-            self.current_console_dump += ("<console_log>\n" + execution_log + "</console_log>\n")
+        except Exception as e:
+            print(f"❌ Execution error: {e}")
+            return (False, f"❌ Execution error: {e}")
 
-            print("Latest console dump: ")
-            print(execution_log)
-            
 
-            if result.returncode == 0:
-                print("✅ Execution completed successfully")
-                return (True, "✅ Execution completed successfully")
-            else:
-                print(f"❌ Execution failed with code: {result.returncode}")
-                return (False, f"❌ Execution failed with code: {result.returncode}")
-                
-        except subprocess.TimeoutExpired:
-            print("⏰ Execution timed out (120s limit)")
-            return (False, "⏰ Execution timed out (120s limit)")
+    # ---- asyncio versions of the stages, used by as_tool_async ----
+    # a cold system_info() cache still probes the box synchronously, so code_gen_system goes to a thread
+
+    async def generate_code_async(self, user_prompt: str, run: VibeRun = None) -> CodeGeneration:
+        """Generate Python code from user prompt, without blocking the event loop."""
+        metrics = run.metrics if run else None
+        with timed(metrics, 'generate'):
+            system = await asyncio.to_thread(code_gen_system, venv_dir=self.venv_dir)
+            return await llm_request_async(CodeGeneration, system, user_prompt, model_generate, metrics, run and run.generations)
+
+    async def repair_code_async(self, user_request, current_script_text, current_console_dump, run: VibeRun = None):
+        user_prompt = repair_prompt(user_request, current_script_text, current_console_dump)
+        metrics = run.metrics if run else None
+        with timed(metrics, 'repair'):
+            system = await asyncio.to_thread(code_gen_system, venv_dir=self.venv_dir)
+            return await llm_request_async(CodeGeneration, system, user_prompt, model_generate, metrics, run and run.generations)
+
+    async def validate_code_async(self, run: VibeRun, code: str) -> ValidationResult:
+        """Validate generated code for safety and correctness."""
+        with timed(run.metrics, 'validate'):
+            return await self.validate_code_timed_async(run, code)
+
+    async def validate_code_timed_async(self, run: VibeRun, code: str) -> ValidationResult:
+        stored = await asyncio.to_thread(self.stored_verdict, code)
+        if stored:
+            run.verdict_source = 'verdict_store'
+            return stored
+
+        local = self.local_verdict(run, code)
+        if local:
+            run.verdict_source = 'local'
+            return local
+
+        run.verdict_source = 'llm'
+
+        result = await llm_request_async(ValidationResult, validation_system, code, model_validate, run.metrics)
+        await asyncio.to_thread(self.store_verdict, code, result)
+        if not result:
+            return ValidationResult(
+                correct=True, 
+                risk=RiskLevel.CHECK, 
+                reasoning='Validation failed, defaulting to CHECK'
+                )
+        
+        return result
+
+    async def auto_vibe_check_async(self, user_request, current_console_dump, run: VibeRun = None):
+        user_prompt = check_prompt(user_request, current_console_dump)
+        metrics = run.metrics if run else None
+        with timed(metrics, 'check'):
+            return await llm_request_async(AutoVibeCheck, check_system, user_prompt, model_validate, metrics)
+
+    async def install_requirements_async(self, requirements: list[str], run: VibeRun = None) -> bool:
+        """Install required packages in a worker thread (holds the venv lock, the loop keeps going)."""
+        with timed(run.metrics if run else None, 'install'):
+            return await asyncio.to_thread(self.pip_install, requirements, run)
+
+    async def validate_and_install_async(self, run: VibeRun, code_gen: CodeGeneration) -> tuple[ValidationResult, bool | None]:
+        """Pipelined: validation LLM call and pip install run side by side."""
+        failed = self.check_syntax(run, code_gen.code, code_gen.filename)
+        if failed:
+            return failed, None
+
+        validation, installed = await asyncio.gather(
+            self.validate_code_async(run, code_gen.code),
+            self.install_requirements_async(code_gen.requirements, run),
+        )
+        return validation, installed
+
+    async def emit_output_async(self, run: VibeRun, stream: str, text: str):
+        """Forward an output chunk to on_output, awaiting it if it's a coroutine function."""
+        if run.on_output and text:
+            result = run.on_output(stream, text)
+            if inspect.isawaitable(result):
+                await result
+
+    async def pump_output_async(self, run: VibeRun, reader: asyncio.StreamReader, stream: str, attempt):
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        while chunk := await reader.read(4096):
+            text = decoder.decode(chunk)
+            attempt.write(stream, text)
+            await self.emit_output_async(run, stream, text)
+        tail = decoder.decode(b'', final=True)
+        if tail:
+            attempt.write(stream, tail)
+            await self.emit_output_async(run, stream, tail)
+
+    async def spawn_script_async(self, run: VibeRun, filepath: Path):
+        """Start the script => (proc, stdout reader, stderr reader, wait coroutine fn, pipe transports).
+        Warm pool: the fork handshake runs in a thread, pipes hooked into the loop. Cold: an asyncio
+        subprocess through the limits helper, which reports the rusage, so nothing waits in a thread."""
+        started = time.monotonic()
+        env = self.script_env(run)
+        proc = None
+        if self.engine.exec_pool:
+            proc = await asyncio.to_thread(self.engine.popen_pooled, filepath, env, self.limits, run.script_args)
+        if not proc:
+            proc = await self.limits.spawn_async(
+                [str(self.venv_python), str(filepath), *run.script_args],
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env=env,
+            )
+            return proc, proc.stdout, proc.stderr, lambda: wait_usage_async(proc, started), []
+
+        loop = asyncio.get_running_loop()
+        readers, transports = [], []
+        for pipe in (proc.stdout, proc.stderr):
+            reader = asyncio.StreamReader()
+            transport, _ = await loop.connect_read_pipe(lambda reader=reader: asyncio.StreamReaderProtocol(reader), pipe)
+            readers.append(reader)
+            transports.append(transport)
+        return proc, readers[0], readers[1], lambda: wait_usage_async(proc, started), transports
+
+    async def execute_code_async(self, run: VibeRun, filepath: Path) -> tuple[bool, str]:
+        """Execute the script as a child of the event loop, streaming output to on_output."""
+        with timed(run.metrics, 'execute'):
+            return await self.execute_code_timed_async(run, filepath)
+
+    async def execute_code_timed_async(self, run: VibeRun, filepath: Path) -> tuple[bool, str]:
+        try:
+            print(f"🚀 Executing: {filepath}")
+            print("=" * 50)
+
+            async with exec_slots:
+                proc, stdout, stderr, wait, transports = await self.spawn_script_async(run, filepath)
+                attempt = run.console.new_attempt()
+                pumps = asyncio.gather(
+                    self.pump_output_async(run, stdout, 'stdout', attempt),
+                    self.pump_output_async(run, stderr, 'stderr', attempt),
+                )
+                waiter = asyncio.ensure_future(wait())
+                timed_out = False
+                try:
+                    await asyncio.wait_for(asyncio.shield(waiter), timeout=self.exec_timeout)
+                except asyncio.TimeoutError:
+                    timed_out = True
+                    kill_group(proc)
+                usage = await waiter
+
+                # keep what it printed even on timeout, repair wants to see it
+                try:
+                    await asyncio.wait_for(pumps, timeout=PIPE_DRAIN_TIMEOUT)
+                except asyncio.TimeoutError:
+                    pass
+                for transport in transports:
+                    transport.close()
+
+                return await asyncio.to_thread(self.record_execution, run, attempt, usage.pop('returncode'), usage, timed_out)
+
         except Exception as e:
             print(f"❌ Execution error: {e}")
             return (False, f"❌ Execution error: {e}")
-
     
+    async def execute_with_repair_async(self, run: VibeRun, filepath: Path) -> tuple[bool, str]:
+        """execute_code_async, plus the local fix for missing modules (pip install, run again)."""
+        code_run, message = await self.execute_code_async(run, filepath)
+        while not code_run and (missing := await asyncio.to_thread(self.missing_dependency, run)):
+            module, distribution = missing
+            installed = await self.install_requirements_async([distribution], run)
+            self.note_fast_repair(run, module, distribution, installed)
+            if not installed:
+                break
+            code_run, message = await self.execute_code_async(run, filepath)
+            fast_repairs.inc('ok' if code_run else 'still_failing')
+        return code_run, message
+
     def get_auto_validate(self, code_gen: CodeGeneration, validation: ValidationResult):
         if not validation.correct:
             return False
@@ -544,34 +1355,41 @@ class AutoVibe:
         print("🦾 SIGMA VIBER HERE")
         print("Type 'quit' or 'exit' to stop\n")
         
-        self.user_request = input("💬 State your request: ").strip()
+        user_request = input("💬 State your request: ").strip()
     
-        if self.user_request.lower() in ['quit', 'exit', 'q']:
+        if user_request.lower() in ['quit', 'exit', 'q']:
             print("👋 Ok see ya next time!")
             exit()
         
-        if not self.user_request:
+        if not user_request:
             print("👋 Ok see ya next time!")
             exit()
-        
+
+        run = self.new_run(user_request)
+        try:
+            self.repl_loop(run)
+        finally:
+            self.end_run(run)
+
+    def repl_loop(self, run: VibeRun):
         while True:
             try:
-                if self.current_retry >= self.max_retry:
+                if run.retry >= self.max_retry:
                     print("❌ Max attempts !")
                     print("❌ Trying hard but thats too much bro, lets go chill for a bit...")
                     exit()
 
-                if self.current_stage == 'START':
+                if run.stage == 'START':
                     print("🧠 ⌨️ Vibing up code...")
-                    code_gen = self.generate_code(self.user_request)
+                    code_gen = self.generate_code(run.user_request, run=run)
 
-                elif self.current_stage == 'REPAIR':
-                    self.current_retry += 1
+                elif run.stage == 'REPAIR':
+                    run.retry += 1
                     print("🧠 ⌨️ Trying to re-vibe code...")
-                    code_gen = self.repair_code(self.user_request, self.current_script_text, self.current_console_dump)
+                    code_gen = self.repair_code(run.user_request, run.script_text, run.console_dump, run=run)
 
                 else:
-                    print(f"❌ We are cooked => Unknown stage: {self.current_stage}")
+                    print(f"❌ We are cooked => Unknown stage: {run.stage}")
                     exit()
 
                 if not code_gen:
@@ -581,35 +1399,36 @@ class AutoVibe:
 
                 # filename only on first gen...
                 if (code_gen.filename):
-                    self.current_script_name = code_gen.filename
+                    run.script_name = code_gen.filename
                 
-                self.current_script_text = code_gen.code
+                run.script_text = code_gen.code
 
                 # Save/overwrite code
                 code_gen_obj = CodeGeneration(
-                    filename=self.current_script_name,
-                    code=self.current_script_text, 
+                    filename=run.script_name,
+                    code=run.script_text, 
                     requirements=code_gen.requirements
                 )
+                code_gen_obj.requirements = self.script_requirements(run, code_gen_obj)
                 filepath = self.save_code(code_gen_obj)
                     
                 print("🔍 Validating code...")
-                validation = self.validate_code(self.current_script_text)
+                validation = self.validate_code(run, run.script_text)
                 
                 if not self.get_user_validate_confirmation(code_gen, validation):
                     print("⏹️  Execution cancelled")
                     exit()
                 
                 # Install requirements
-                if code_gen.requirements and not self.install_requirements(code_gen.requirements):
+                if code_gen_obj.requirements and not self.install_requirements(code_gen_obj.requirements, run):
                     print("❌ Failed to install requirements")
                     continue
                 
                 # Execute
-                self.execute_code(filepath)
+                self.execute_with_repair(run, filepath)
 
                 if (self.auto_check):
-                    vibe_checked = self.auto_vibe_check(self.user_request, self.current_console_dump)
+                    vibe_checked = self.auto_vibe_check(run.user_request, run.console_dump, run=run)
                     print("⚖️ AUTO VIBE CHECK:")
                     print("🤔 Reasoning: ", vibe_checked.reasoning)
                     print("📜 Message: ", vibe_checked.message)
@@ -619,16 +1438,17 @@ class AutoVibe:
                         print("❌ Check NOT passed!")
                         print("😎 Calling sigma for help again...")
                         
-                        self.current_stage = "REPAIR"
+                        run.stage = "REPAIR"
                         continue
 
                 # Validate output result:
                 user_vibe_check_passed = self.get_user_success_check()
                 if (user_vibe_check_passed):
                     print("\n🤗 YA WE DID IT!")
+                    self.settle_generations(run, ok=True)
                     exit()
                 else:
-                    self.current_stage = "REPAIR"
+                    run.stage = "REPAIR"
                 
             except KeyboardInterrupt:
                 print("\n👋 Goodbye!")
@@ -636,91 +1456,341 @@ class AutoVibe:
             except Exception as e:
                 print(f"❌ Unexpected error: {e}")
 
-    def as_tool(self, user_request: str):
-        """Main execution loop for api/too use"""
-        
-        self.user_request = user_request
-        
-        if not self.user_request:
+    def as_tool(self, user_request: str, on_output=None):
+        """Main execution loop for api/too use. Safe to call from many threads on one instance."""
+        if not user_request:
             return ToolReturn(is_error=True, content="Input is empty", results=[])
-        
+
+        run = self.new_run(user_request, on_output)
+        try:
+            return self.finish_run(run, self.tool_loop(run))
+        finally:
+            self.end_run(run)
+
+    def tool_loop(self, run: VibeRun) -> ToolReturn:
         while True:
             try:
-                if self.current_retry >= self.max_retry:
-                    return ToolReturn(is_error=True, content="Max retry reached", results=self.check_results)
+                if run.retry >= self.max_retry:
+                    return ToolReturn(is_error=True, content="Max retry reached", results=run.check_results, usage=run.usage, log_id=run.console.log_id, metrics=run.metrics)
                 
-                if self.current_stage == 'START':
-                    code_gen = self.generate_code(self.user_request)
+                if run.stage == 'START':
+                    self.report_progress(run, 'GENERATE')
+                    code_gen = self.generate_code(run.user_request, run=run)
 
-                elif self.current_stage == 'REPAIR':
-                    self.current_retry += 1
-                    code_gen = self.repair_code(self.user_request, self.current_script_text, self.current_console_dump)
+                elif run.stage == 'REPAIR':
+                    run.retry += 1
+                    self.report_progress(run, 'REPAIR')
+                    code_gen = self.repair_code(run.user_request, run.script_text, run.console_dump, run=run)
 
 
                 if not code_gen:
-                    return ToolReturn(is_error=True, content="Code gen error", results=self.check_results)
+                    return ToolReturn(is_error=True, content="Code gen error", results=run.check_results, usage=run.usage, log_id=run.console.log_id, metrics=run.metrics)
 
                 # filename only on first gen...
                 if (code_gen.filename):
-                    self.current_script_name = code_gen.filename
+                    run.script_name = code_gen.filename
                 
-                self.current_script_text = code_gen.code
+                run.script_text = code_gen.code
 
                 # Save/overwrite code
                 code_gen_obj = CodeGeneration(
-                    filename=self.current_script_name,
-                    code=self.current_script_text, 
+                    filename=run.script_name,
+                    code=run.script_text, 
                     requirements=code_gen.requirements
                 )
+                code_gen_obj.requirements = self.script_requirements(run, code_gen_obj)
                 filepath = self.save_code(code_gen_obj)
                     
-                validation = self.validate_code(self.current_script_text)
+                self.report_progress(run, 'VALIDATE')
+                if self.pipeline:
+                    validation, requirements_ok = self.validate_and_install(run, code_gen_obj)
+                else:
+                    validation, requirements_ok = self.validate_code(run, run.script_text), None
                 
                 if not self.get_auto_validate(code_gen, validation):
-                    self.current_stage = 'REPAIR'
+                    run.stage = 'REPAIR'
                     continue
+                run.script_path, run.requirements, run.validation = filepath, code_gen_obj.requirements, validation
                 
-                # Install requirements
-                if code_gen.requirements and not self.install_requirements(code_gen.requirements):
+                # Install requirements (already done alongside validation when pipelined)
+                if requirements_ok is None:
+                    requirements_ok = self.install_requirements(code_gen_obj.requirements, run)
+                if not requirements_ok:
                     return ToolReturn(
                         is_error=True, 
                         content="Failed to install requirements", 
-                        results=self.check_results
+                        results=run.check_results,
+                        usage=run.usage,
+                        log_id=run.console.log_id,
+                        metrics=run.metrics
                     )
                 
                 # Execute
-                code_run, message = self.execute_code(filepath)
+                self.report_progress(run, 'EXECUTE')
+                code_run, message = self.execute_with_repair(run, filepath)
 
                 if (self.auto_check):
-                    vibe_checked = self.auto_vibe_check(self.user_request, self.current_console_dump)
+                    self.report_progress(run, 'CHECK')
+                    vibe_checked = self.auto_vibe_check(run.user_request, run.console_dump, run=run)
 
                     if vibe_checked:
-                        self.check_results.append(vibe_checked)
+                        run.check_results.append(vibe_checked)
                         
                         if (vibe_checked.success):
                             return ToolReturn(
                                 is_error=False, 
                                 content=vibe_checked.message, 
-                                results=self.check_results
+                                results=run.check_results,
+                                usage=run.usage,
+                                log_id=run.console.log_id,
+                                metrics=run.metrics
                             )
                         else:
-                            self.current_stage = "REPAIR"
+                            run.stage = "REPAIR"
                             continue
                 else:
                     return ToolReturn(
                         is_error=(not code_run), 
-                        content=f"{message} \n {self.current_console_dump}", 
-                        results=self.check_results
+                        content=f"{message} \n {run.console.render(RESPONSE_TOKEN_BUDGET)}", 
+                        results=run.check_results,
+                        usage=run.usage,
+                        log_id=run.console.log_id,
+                        metrics=run.metrics
                     )
 
             except Exception as e:
                 return ToolReturn(
                     is_error=True, 
                     content=f"Unknown error: {str(e)}", 
-                    results=self.check_results
+                    results=run.check_results,
+                    usage=run.usage,
+                    log_id=run.console.log_id,
+                    metrics=run.metrics
+                )
+
+    async def as_tool_async(self, user_request: str, on_output=None):
+        """Same loop as as_tool, but every LLM call and child process is awaited,
+        so one event loop can keep many vibes in flight."""
+        if not user_request:
+            return ToolReturn(is_error=True, content="Input is empty", results=[])
+
+        # run dir, library and cache writes: filesystem + sqlite, kept off the event loop
+        run = await asyncio.to_thread(self.new_run, user_request, on_output)
+        try:
+            return await asyncio.to_thread(self.finish_run, run, await self.tool_loop_async(run))
+        finally:
+            await asyncio.to_thread(self.end_run, run)
+
+    async def tool_loop_async(self, run: VibeRun) -> ToolReturn:
+        while True:
+            try:
+                if run.retry >= self.max_retry:
+                    return ToolReturn(is_error=True, content="Max retry reached", results=run.check_results, usage=run.usage, log_id=run.console.log_id, metrics=run.metrics)
+                
+                if run.stage == 'START':
+                    self.report_progress(run, 'GENERATE')
+                    code_gen = await self.generate_code_async(run.user_request, run=run)
+
+                elif run.stage == 'REPAIR':
+                    run.retry += 1
+                    self.report_progress(run, 'REPAIR')
+                    code_gen = await self.repair_code_async(run.user_request, run.script_text, run.console_dump, run=run)
+
+
+                if not code_gen:
+                    return ToolReturn(is_error=True, content="Code gen error", results=run.check_results, usage=run.usage, log_id=run.console.log_id, metrics=run.metrics)
+
+                # filename only on first gen...
+                if (code_gen.filename):
+                    run.script_name = code_gen.filename
+                
+                run.script_text = code_gen.code
+
+                # Save/overwrite code
+                code_gen_obj = CodeGeneration(
+                    filename=run.script_name,
+                    code=run.script_text, 
+                    requirements=code_gen.requirements
                 )
+                code_gen_obj.requirements = await asyncio.to_thread(self.script_requirements, run, code_gen_obj)
+                filepath = await asyncio.to_thread(self.save_code, code_gen_obj)
+                    
+                self.report_progress(run, 'VALIDATE')
+                if self.pipeline:
+                    validation, requirements_ok = await self.validate_and_install_async(run, code_gen_obj)
+                else:
+                    validation, requirements_ok = await self.validate_code_async(run, run.script_text), None
+                
+                if not self.get_auto_validate(code_gen, validation):
+                    run.stage = 'REPAIR'
+                    continue
+                run.script_path, run.requirements, run.validation = filepath, code_gen_obj.requirements, validation
+                
+                # Install requirements (already done alongside validation when pipelined)
+                if requirements_ok is None:
+                    requirements_ok = await self.install_requirements_async(code_gen_obj.requirements, run)
+                if not requirements_ok:
+                    return ToolReturn(
+                        is_error=True, 
+                        content="Failed to install requirements", 
+                        results=run.check_results,
+                        usage=run.usage,
+                        log_id=run.console.log_id,
+                        metrics=run.metrics
+                    )
+                
+                # Execute
+                self.report_progress(run, 'EXECUTE')
+                code_run, message = await self.execute_with_repair_async(run, filepath)
+
+                if (self.auto_check):
+                    self.report_progress(run, 'CHECK')
+                    vibe_checked = await self.auto_vibe_check_async(run.user_request, run.console_dump, run=run)
+
+                    if vibe_checked:
+                        run.check_results.append(vibe_checked)
+                        
+                        if (vibe_checked.success):
+                            return ToolReturn(
+                                is_error=False, 
+                                content=vibe_checked.message, 
+                                results=run.check_results,
+                                usage=run.usage,
+                                log_id=run.console.log_id,
+                                metrics=run.metrics
+                            )
+                        else:
+                            run.stage = "REPAIR"
+                            continue
+                else:
+                    return ToolReturn(
+                        is_error=(not code_run), 
+                        content=f"{message} \n {run.console.render(RESPONSE_TOKEN_BUDGET)}", 
+                        results=run.check_results,
+                        usage=run.usage,
+                        log_id=run.console.log_id,
+                        metrics=run.metrics
+                    )
+
+            except Exception as e:
+                return ToolReturn(
+                    is_error=True, 
+                    content=f"Unknown error: {str(e)}", 
+                    results=run.check_results,
+                    usage=run.usage,
+                    log_id=run.console.log_id,
+                    metrics=run.metrics
+                )
+
+    # ---- script library: scripts that worked before, run again by id, no LLM ----
+
+    def remember_script(self, run: VibeRun):
+        """Successful vibe => its script goes into the library, approved if the verdict was a clean ALLOW
+        from the LLM or the verdict store (a local pre-validation ALLOW never approves on its own)."""
+        if not script_library or not run.script_path or not run.validation or run.script_args:
+            return
+        try:
+            script_library.remember(
+                run.script_path.name, run.user_request, run.script_text, run.requirements, run.validation,
+                approved=self.approves(run.validation) and run.verdict_source in ('llm', 'verdict_store'),
+                elapsed_s=run.usage[-1].elapsed_s if run.usage else 0.0,
+            )
+        except Exception as e:  # the vibe itself worked, the library is a bonus
+            print(f"⚠️  Could not add script to the library: {e}")
+
+    @staticmethod
+    def approves(validation: ValidationResult | None) -> bool:
+        return bool(validation) and validation.correct and validation.risk == RiskLevel.ALLOW
+
+    def review_script(self, script_id: str) -> dict | None:
+        """(Re)validate a library script as it is on disk now => updated entry, None if unknown.
+        Stored verdict for the exact code, else the LLM: approving a script to run with no LLM later
+        is not left to the local pre-validation heuristic."""
+        entry = script_library.get(script_id) if script_library else None
+        if not entry:
+            return None
+        code = (self.scripts_dir / entry['filename']).read_text(encoding='utf-8')
+        run = VibeRun(user_request=entry['request'] or script_id, run_dir=self.engine.runs_dir, script_name=entry['filename'])
+        with timed(run.metrics, 'validate'):
+            validation = self.stored_verdict(code) or self.llm_verdict(run, code)
+        script_library.set_verdict(script_id, code_hash(code), validation, self.approves(validation))
+        return script_library.get(script_id)
+
+    def library_run(self, script_id: str, args, on_output=None) -> tuple[VibeRun, dict]:
+        """Checks before a direct run => (run, entry), raises ScriptRefused when it can't run."""
+        entry = script_library.get(script_id) if script_library else None
+        if not entry:
+            raise ScriptRefused('unknown', f"Unknown script: {script_id}")
+        if not entry['approved']:
+            raise ScriptRefused('not_approved', f"Script {script_id} is not approved, review it first")
+        if not isinstance(args, (list, tuple)) or not all(isinstance(a, str) for a in args):
+            raise ScriptRefused('bad_args', "args must be a list of strings")
+        path = self.scripts_dir / entry['filename']
+        try:
+            code = path.read_text(encoding='utf-8')
+        except OSError:
+            raise ScriptRefused('gone', f"Script file is gone: {entry['filename']}")
+        if code_hash(code) != entry['code_hash']:
+            raise ScriptRefused('changed', f"Script {script_id} changed since it was reviewed, review it again")
+
+        run = self.new_run(entry['request'] or script_id, on_output)
+        run.script_name, run.script_text, run.script_path, run.script_args = entry['filename'], code, path, list(args)
+        return run, entry
+
+    def library_result(self, run: VibeRun, script_id: str, code_run: bool, message: str) -> ToolReturn:
+        script_library.record_run(script_id, code_run, run.usage[-1].elapsed_s if run.usage else 0.0)
+        return ToolReturn(
+            is_error=(not code_run),
+            content=f"{message} \n {run.console.render(RESPONSE_TOKEN_BUDGET)}",
+            results=[],
+            usage=run.usage,
+            log_id=run.console.log_id,
+            metrics=run.metrics
+        )
+
+    def run_script(self, script_id: str, args=(), on_output=None) -> ToolReturn:
+        """Run an approved library script as is: no generation, no validation call, no auto check.
+        Raises ScriptRefused (reason: unknown, not_approved, bad_args, gone, changed) instead of running."""
+        run, entry = self.library_run(script_id, args, on_output)
+        try:
+            if not self.install_requirements(entry['requirements'], run):
+                return self.finish_run(run, ToolReturn(is_error=True, content="Failed to install requirements", results=[], usage=run.usage, log_id=run.console.log_id, metrics=run.metrics))
+            self.report_progress(run, 'EXECUTE')
+            code_run, message = self.execute_with_repair(run, run.script_path)
+            return self.finish_run(run, self.library_result(run, script_id, code_run, message))
+        finally:
+            self.end_run(run)
+
+    async def run_script_async(self, script_id: str, args=(), on_output=None) -> ToolReturn:
+        """run_script, awaited."""
+        run, entry = await asyncio.to_thread(self.library_run, script_id, args, on_output)
+        try:
+            if not await self.install_requirements_async(entry['requirements'], run):
+                return await asyncio.to_thread(self.finish_run, run, ToolReturn(is_error=True, content="Failed to install requirements", results=[], usage=run.usage, log_id=run.console.log_id, metrics=run.metrics))
+            self.report_progress(run, 'EXECUTE')
+            code_run, message = await self.execute_with_repair_async(run, run.script_path)
+            result = await asyncio.to_thread(self.library_result, run, script_id, code_run, message)
+            return await asyncio.to_thread(self.finish_run, run, result)
+        finally:
+            await asyncio.to_thread(self.end_run, run)
+
+    async def stream_tool(self, user_request: str):
+        """as_tool_async as an async iterator:
+        yields ('stdout' | 'stderr', text) while scripts run, then ('result', ToolReturn) last."""
+        queue = asyncio.Queue()
+        on_output = lambda stream, text: queue.put((stream, text))
+        
+        task = asyncio.create_task(self.as_tool_async(user_request, on_output))
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+        try:
+            while (item := await queue.get()) is not None:
+                yield item
+            yield ('result', await task)
+        finally:
+            if not task.done():
+                task.cancel()
 
 
 if __name__ == "__main__":
-    executor = AutoVibe(auto_check=True)
+    executor = AutoVibe(auto_check=True, on_output=print_output)
     executor.as_repl()
\ No newline at end of file
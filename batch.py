@@ -0,0 +1,59 @@
+"""
+Many vibes at once (POST /autovibe/batch, /autovibe/batch/stream, auto_vibe_batch MCP tool).
+
+All items start together; what actually limits them is concurrency.py (LLM calls, pip, script runs),
+so a batch of 50 port checks doesn't turn into 50 parallel LLM calls + 50 processes.
+Results come back in input order with per-item timings; on_item sees each one as it finishes.
+"""
+
+import asyncio
+import inspect
+import os
+import time
+
+from autovibe import AutoVibe, ToolReturn
+from single_flight import LEADER, request_key
+
+BATCH_MAX_ITEMS = int(os.environ.get('AUTOVIBE_BATCH_MAX') or 50)
+
+
+async def run_item(index: int, content: str, options: dict, batch_started: float, coalescer=None) -> dict:
+    started = time.monotonic()
+    try:
+        autovibe = AutoVibe(**options)
+        if coalescer:
+            result, how = await coalescer.do_async(request_key(content, options), lambda: autovibe.as_tool_async(content))
+        else:
+            result, how = await autovibe.as_tool_async(content), LEADER
+    except Exception as e:
+        result, how = ToolReturn(is_error=True, content=f"Error processing request: {str(e)}", results=[]), None
+
+    return {
+        'index': index,
+        'content': content,
+        'started_s': started - batch_started,
+        'elapsed_s': time.monotonic() - started,
+        'coalesced': how,
+        'result': result.model_dump(mode='json'),
+    }
+
+
+async def run_batch(items: list[tuple[str, dict]], coalescer=None, on_item=None) -> dict:
+    """items = [(content, AutoVibe kwargs)] => {'results': [...in input order], 'elapsed_s', 'errors'}.
+    on_item(item) (may be async) is called as each item finishes, in finish order."""
+    batch_started = time.monotonic()
+
+    async def one(index, content, options):
+        item = await run_item(index, content, options, batch_started, coalescer)
+        if on_item:
+            reported = on_item(item)
+            if inspect.isawaitable(reported):
+                await reported
+        return item
+
+    results = await asyncio.gather(*(one(i, content, options) for i, (content, options) in enumerate(items)))
+    return {
+        'results': results,
+        'elapsed_s': time.monotonic() - batch_started,
+        'errors': sum(1 for item in results if item['result']['is_error']),
+    }
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Cold interpreter vs warm executor pool (executor_pool.py) on the quick checks from vibe_scripts/.
+No LLM involved: the scripts are run straight through VibeEngine.popen_script, same pipes and limits.
+Also checks that failing scripts leave the same stderr and return code both ways (exit 1 when not).
+
+    python benchmarks/exec_pool.py                     # 10 runs per script and mode
+    python benchmarks/exec_pool.py --runs 30 --json
+    python benchmarks/exec_pool.py --preload json,os,socket,psutil
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# stdlib only, so a fresh venv runs them
+SCRIPTS = (
+    'check_disk_space_0458bbd0.py',
+    'check_port_3122_9b9b4343.py',
+    'get_system_uptime.py',
+)
+
+# scripts that fail: a pooled run must print what `python script.py` prints (no runpy / zygote frames)
+FAILING = {
+    'raises.py': 'def parse(text):\n    return int(text)\n\nprint("parsing")\nparse("x")\n',
+    'chained.py': 'try:\n    {}["key"]\nexcept KeyError as e:\n    raise RuntimeError("lookup failed") from e\n',
+    'syntax_error.py': 'print("never"\n',
+    'exit_message.py': 'import sys\nsys.exit("giving up")\n',
+    'paths.py': 'import sys\nsys.exit(f"{sys.argv[0]} {__file__}")\n',
+}
+
+
+def run_output(engine, script: Path, env: dict, limits) -> tuple[int, str]:
+    from run_limits import wait_usage
+
+    proc = engine.popen_script(script, env, limits)
+    proc.stdout.read()
+    stderr = proc.stderr.read().decode('utf-8', errors='replace')
+    usage = wait_usage(proc, time.monotonic())
+    proc.stdout.close()
+    proc.stderr.close()
+    return usage['returncode'], stderr
+
+
+def fidelity(engine, pool, env: dict, limits) -> dict:
+    """Per failing script: same (returncode, stderr) cold and pooled? The diff when not.
+    Relative script paths, like autovibe runs them."""
+    result = {}
+    for name, code in FAILING.items():
+        script = engine.scripts_dir / name
+        script.write_text(code)
+        script = Path(os.path.relpath(script))
+        outputs = {}
+        for mode in ('cold', 'pool'):
+            engine.exec_pool = pool if mode == 'pool' else None
+            outputs[mode] = run_output(engine, script, env, limits)
+        result[name] = {'same': outputs['cold'] == outputs['pool'], **({} if outputs['cold'] == outputs['pool'] else outputs)}
+    return result
+
+
+def run_once(engine, script: Path, env: dict, limits) -> tuple[float, int]:
+    from run_limits import wait_usage
+
+    started = time.monotonic()
+    proc = engine.popen_script(script, env, limits)
+    proc.stdout.read()
+    proc.stderr.read()
+    usage = wait_usage(proc, started)
+    proc.stdout.close()
+    proc.stderr.close()
+    return time.monotonic() - started, usage['returncode']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--preload', help='AUTOVIBE_EXEC_POOL_PRELOAD for the pool')
+    parser.add_argument('--json', action='store_true', help='machine-readable output')
+    args = parser.parse_args()
+
+    os.environ['AUTOVIBE_EXEC_POOL'] = '1'
+    os.environ.setdefault('OPEN_ROUTER_KEY', 'unused')
+    if args.preload is not None:
+        os.environ['AUTOVIBE_EXEC_POOL_PRELOAD'] = args.preload
+
+    tmp = tempfile.TemporaryDirectory(prefix='autovibe_pool_')
+    os.chdir(tmp.name)
+    try:
+        from autovibe import VibeEngine
+        from run_limits import RunLimits
+
+        engine = VibeEngine(Path(tmp.name) / 'vibe_scripts')
+        pool = engine.exec_pool
+        limits = RunLimits.from_env(60)
+        env = {**os.environ, 'PYTHONUNBUFFERED': '1', 'PYTHONIOENCODING': 'utf-8'}
+
+        report = {'runs': args.runs, 'preloaded': pool.stats()['preloaded'], 'scripts': {}}
+        for name in SCRIPTS:
+            source = ROOT / 'vibe_scripts' / name
+            if not source.exists():
+                continue
+            script = engine.scripts_dir / name
+            script.write_bytes(source.read_bytes())
+            result = {}
+            for mode in ('cold', 'pool'):
+                engine.exec_pool = pool if mode == 'pool' else None
+                run_once(engine, script, env, limits)  # warmup (page cache, zygote)
+                times, failures = [], 0
+                for _ in range(args.runs):
+                    elapsed, returncode = run_once(engine, script, env, limits)
+                    times.append(elapsed)
+                    failures += returncode != 0
+                result[mode] = {'p50_s': statistics.median(times), 'mean_s': statistics.mean(times), 'failures': failures}
+            result['saved_s'] = result['cold']['p50_s'] - result['pool']['p50_s']
+            report['scripts'][name] = result
+        report['fidelity'] = fidelity(engine, pool, env, limits)
+        engine.exec_pool = pool
+        report['pool'] = pool.stats()
+        pool.close()
+    finally:
+        os.chdir(ROOT)
+        tmp.cleanup()
+
+    mismatched = [name for name, result in report['fidelity'].items() if not result['same']]
+    if args.json:
+        print(json.dumps(report, indent=2))
+        sys.exit(1 if mismatched else 0)
+    print(f"{args.runs} runs each, preloaded: {', '.join(report['preloaded']) or '-'}")
+    for name, result in report['scripts'].items():
+        print(f"{name:<32} cold p50={result['cold']['p50_s'] * 1000:7.1f}ms  pool p50={result['pool']['p50_s'] * 1000:7.1f}ms  "
+              f"saved {result['saved_s'] * 1000:6.1f}ms/run  failures {result['cold']['failures']}/{result['pool']['failures']}")
+    print(f"failing scripts, same stderr and return code cold and pooled: {len(report['fidelity']) - len(mismatched)}/{len(report['fidelity'])}")
+    for name in mismatched:
+        result = report['fidelity'][name]
+        print(f"❌ {name}")
+        for mode in ('cold', 'pool'):
+            returncode, stderr = result[mode]
+            print(f"  {mode} ({returncode}):\n" + ''.join(f"    {line}\n" for line in stderr.splitlines()))
+    if mismatched:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
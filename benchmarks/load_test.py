@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Load test: serv_rest in production mode against the stub LLM (benchmarks/stub_llm.py), POST /autovibe at
+increasing concurrency. Reports p50/p99 latency, throughput and how many requests were turned away (429/503).
+
+Every request has its own content, so coalescing doesn't hide the load. The server runs in a temp dir
+(fresh vibe_scripts + venv), so the first level also pays for venv creation unless --warmup.
+
+    python benchmarks/load_test.py --levels 1,2,4,8,16,32 --latency 0.5
+    python benchmarks/load_test.py --workers 4 --max-inflight 8 --max-queued 8     # see backpressure
+    python benchmarks/load_test.py --url http://127.0.0.1:51551                    # already running server
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import stub_llm
+
+
+def percentile(values: list[float], pct: float) -> float | None:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, round(pct / 100 * (len(values) - 1)))]
+
+
+def post(url: str, payload: dict, timeout: float) -> tuple[int, float]:
+    """(http status, seconds); 0 = connection failed."""
+    data = json.dumps(payload).encode('utf-8')
+    req = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            resp.read()
+            status = resp.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except (urllib.error.URLError, OSError):
+        status = 0
+    return status, time.perf_counter() - start
+
+
+def wait_ready(url: str, server: subprocess.Popen | None, timeout: float = 120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server and server.poll() is not None:
+            raise SystemExit(f"server exited with {server.returncode}")
+        try:
+            with urllib.request.urlopen(url + '/', timeout=2):
+                return
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.3)
+    raise SystemExit(f"server at {url} not ready after {timeout}s")
+
+
+def start_server(args, llm_url: str, workdir: str) -> tuple[subprocess.Popen, str]:
+    env = {
+        **os.environ,
+        'OPEN_ROUTER_KEY': 'stub',
+        'AUTOVIBE_LLM_BASE_URL': llm_url,
+        'AUTOVIBE_MAX_INFLIGHT': str(args.max_inflight),
+        'AUTOVIBE_MAX_QUEUED': str(args.max_queued),
+        'AUTOVIBE_QUEUE_TIMEOUT': str(args.queue_timeout),
+        'PYTHONUNBUFFERED': '1',
+    }
+    env.pop('AUTOVIBE_LLM_CACHE', None)  # cached answers would make the stub latency moot
+    cmd = [sys.executable, str(ROOT / 'serv_rest.py'), '--prod', '--host', '127.0.0.1', '--port', str(args.port),
+           '--workers', str(args.workers)]
+    if args.threads:
+        cmd += ['--threads', str(args.threads)]
+    log = open(Path(workdir) / 'server.log', 'w')
+    server = subprocess.Popen(cmd, cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT)
+    return server, f"http://127.0.0.1:{args.port}"
+
+
+def run_level(url: str, concurrency: int, count: int, options: dict, timeout: float) -> dict:
+    results = []
+    lock = threading.Lock()
+    next_index = iter(range(count))
+
+    def client():
+        while True:
+            with lock:
+                index = next(next_index, None)
+            if index is None:
+                return
+            payload = {'content': f"load test c{concurrency} #{index}: print the platform name", **options}
+            outcome = post(url + '/autovibe', payload, timeout)
+            with lock:
+                results.append(outcome)
+
+    start = time.perf_counter()
+    clients = [threading.Thread(target=client) for _ in range(concurrency)]
+    for t in clients:
+        t.start()
+    for t in clients:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    ok = [seconds for status, seconds in results if status == 200]
+    return {
+        'concurrency': concurrency,
+        'requests': count,
+        'ok': len(ok),
+        'rejected_429': sum(1 for status, _ in results if status == 429),
+        'rejected_503': sum(1 for status, _ in results if status == 503),
+        'errors': sum(1 for status, _ in results if status not in (200, 429, 503)),
+        'p50_s': percentile(ok, 50),
+        'p99_s': percentile(ok, 99),
+        'mean_s': statistics.mean(ok) if ok else None,
+        'throughput_rps': len(ok) / elapsed if elapsed else None,
+        'elapsed_s': elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--levels', default='1,2,4,8,16,32', help='client concurrency levels')
+    parser.add_argument('--per-client', type=int, default=4, help='requests per client per level')
+    parser.add_argument('--latency', type=float, default=0.5, help='stub LLM seconds per call')
+    parser.add_argument('--url', help='test this server instead of starting one (stub LLM is not started either)')
+    parser.add_argument('--port', type=int, default=51661)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=0)
+    parser.add_argument('--max-inflight', type=int, default=16)
+    parser.add_argument('--max-queued', type=int, default=32)
+    parser.add_argument('--queue-timeout', type=float, default=30)
+    parser.add_argument('--auto-check', action='store_true', help='one more LLM call per request')
+    parser.add_argument('--warmup', action='store_true', help='one untimed request first (venv, imports)')
+    parser.add_argument('--timeout', type=float, default=300, help='client timeout per request')
+    parser.add_argument('--json', action='store_true', help='machine-readable output')
+    args = parser.parse_args()
+
+    options = {'max_retry': 1, 'auto_check': args.auto_check, 'exec_timeout': 30}
+    server = stub = None
+    workdir = tempfile.TemporaryDirectory(prefix='autovibe_load_')
+    try:
+        if args.url:
+            url = args.url.rstrip('/')
+        else:
+            stub = stub_llm.start(latency=args.latency)
+            llm_url = f"http://127.0.0.1:{stub.server_address[1]}/v1"
+            server, url = start_server(args, llm_url, workdir.name)
+        wait_ready(url, server)
+        if args.warmup:
+            post(url + '/autovibe', {'content': 'warmup', **options}, args.timeout)
+
+        levels = []
+        for concurrency in [int(c) for c in args.levels.split(',') if c.strip()]:
+            level = run_level(url, concurrency, concurrency * args.per_client, options, args.timeout)
+            levels.append(level)
+            if not args.json:
+                fmt = lambda v: f"{v:7.2f}" if v is not None else "      -"
+                print(f"c={concurrency:<3} n={level['requests']:<4} ok={level['ok']:<4} "
+                      f"429={level['rejected_429']:<3} 503={level['rejected_503']:<3} err={level['errors']:<3} "
+                      f"p50={fmt(level['p50_s'])}s p99={fmt(level['p99_s'])}s "
+                      f"throughput={fmt(level['throughput_rps'])} req/s")
+        if args.json:
+            print(json.dumps({
+                'config': {**vars(args), 'stub_calls': stub_llm.StubHandler.calls if stub else None},
+                'levels': levels,
+            }, indent=2))
+    finally:
+        if server:
+            server.terminate()
+            try:
+                server.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                server.kill()
+        if stub:
+            stub.shutdown()
+        workdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
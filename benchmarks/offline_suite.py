@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark: the whole vibe loop against the stub LLM (benchmarks/stub_llm.py), no OpenRouter, no network.
+
+Corpus = requests modeled on vibe_scripts/ (the stub hands back the recorded script for each) + synthetic ones.
+Entry points:  tool = AutoVibe.as_tool,  rest = POST /autovibe through the Flask app,  mcp = serv_mcp.auto_vibe.
+Per entry: end-to-end p50/p95/p99, throughput, per-stage time (run_metrics), LLM calls, memory.
+
+Runs in a temp work dir (own vibe_scripts + venv), one untimed warmup request first.
+Byte-identical scripts come back every round, so after round 1 validation is mostly the verdict store.
+
+    python benchmarks/offline_suite.py                                 # all entries, human readable
+    python benchmarks/offline_suite.py --json --out bench.json         # machine readable
+    python benchmarks/offline_suite.py --baseline bench.json           # exit 1 on regression
+    python benchmarks/offline_suite.py --entries tool --latency 0 --rounds 5 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.append(str(Path(__file__).resolve().parent))
+
+import stub_llm
+
+# request => recorded script in vibe_scripts/ (stdlib only, so nothing has to be pip installed)
+RECORDED = {
+    'check free disk space on the system drive': 'check_disk_space_0458bbd0.py',
+    'is anything listening on port 3122': 'check_port_3122_9b9b4343.py',
+    'how long has this machine been up': 'get_system_uptime.py',
+    'create a sqlite db with some geo data': 'create_db.py',
+    'is the clock ntp synced': 'check_ntp_sync_a5977f80.py',
+}
+# no recorded script => stub's synthetic one
+SYNTHETIC = [
+    'print the platform name',
+    'what python version is the venv on',
+    'show the current user',
+]
+
+ENTRIES = ('tool', 'rest', 'mcp')
+
+# relative change that counts as a regression against --baseline
+COMPARED = {'p50_s': 'lower', 'p95_s': 'lower', 'throughput_rps': 'higher'}
+
+
+def percentile(values: list[float], pct: float) -> float | None:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, round(pct / 100 * (len(values) - 1)))]
+
+
+def rss_kb() -> int | None:
+    """Current RSS of this process (Linux), else peak (ru_maxrss)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak // 1024 if sys.platform == 'darwin' else peak
+    except ImportError:
+        return None
+
+
+def load_corpus() -> tuple[list[str], dict[str, str]]:
+    scripts = {}
+    for request, filename in RECORDED.items():
+        path = ROOT / 'vibe_scripts' / filename
+        if path.exists():
+            scripts[request] = path.read_text(encoding='utf-8', errors='replace')
+    return list(scripts) + SYNTHETIC, scripts
+
+
+def make_runner(entry: str, options: dict):
+    """entry => fn(content) -> (ok, seconds). Imports happen here, after the env points at the stub."""
+    if entry == 'tool':
+        from autovibe import AutoVibe
+
+        def run(content):
+            started = time.perf_counter()
+            result = AutoVibe(**options).as_tool(content)
+            return not result.is_error, time.perf_counter() - started
+        return run
+
+    if entry == 'rest':
+        import serv_rest
+        client = serv_rest.app.test_client()
+
+        def run(content):
+            started = time.perf_counter()
+            response = client.post('/autovibe', json={'content': content, **options})
+            ok = response.status_code == 200 and not response.get_json()['is_error']
+            return ok, time.perf_counter() - started
+        return run
+
+    if entry == 'mcp':
+        import serv_mcp
+
+        def run(content):
+            started = time.perf_counter()
+            try:
+                asyncio.run(serv_mcp.auto_vibe(content, **options))
+                ok = True
+            except Exception:
+                ok = False
+            return ok, time.perf_counter() - started
+        return run
+
+    raise ValueError(f"unknown entry point: {entry}")
+
+
+def run_entry(entry: str, corpus: list[str], rounds: int, concurrency: int, options: dict, trace_memory: bool) -> dict:
+    from run_metrics import run_stats
+
+    run = make_runner(entry, options)
+    run(corpus[0])  # warmup: imports, venv, system probe
+    run_stats.reset()
+
+    # unique text per request, or single-flight would fold identical concurrent ones together
+    work = [f"{content} (#{entry}-{r}-{i})" for r in range(rounds) for i, content in enumerate(corpus)]
+    results = []
+    lock = threading.Lock()
+    pending = iter(work)
+
+    def client():
+        while True:
+            with lock:
+                content = next(pending, None)
+            if content is None:
+                return
+            outcome = run(content)
+            with lock:
+                results.append(outcome)
+
+    rss_before = rss_kb()
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    clients = [threading.Thread(target=client) for _ in range(concurrency)]
+    for t in clients:
+        t.start()
+    for t in clients:
+        t.join()
+    elapsed = time.perf_counter() - started
+    heap_peak = None
+    if trace_memory:
+        heap_peak = tracemalloc.get_traced_memory()[1] // 1024
+        tracemalloc.stop()
+
+    latencies = [seconds for _, seconds in results]
+    stats = run_stats.snapshot()
+    return {
+        'requests': len(results),
+        'errors': sum(1 for ok, _ in results if not ok),
+        'elapsed_s': elapsed,
+        'throughput_rps': len(results) / elapsed if elapsed else None,
+        'p50_s': percentile(latencies, 50),
+        'p95_s': percentile(latencies, 95),
+        'p99_s': percentile(latencies, 99),
+        'mean_s': statistics.mean(latencies) if latencies else None,
+        'mean_attempts': stats['mean_attempts'],
+        'bottleneck': stats['bottleneck'],
+        'stages': {name: {k: stage[k] for k in ('count', 'mean_s', 'max_s', 'share')} for name, stage in stats['stages'].items()},
+        'llm_calls': sum(model['calls'] for model in stats['models'].values()),
+        'memory': {
+            'rss_kb_before': rss_before,
+            'rss_kb_after': rss_kb(),
+            'heap_peak_kb': heap_peak,
+            'script_max_rss_kb': stats['executions']['max_rss_kb'],
+        },
+    }
+
+
+def library_check() -> dict:
+    """Script library after the runs. A local pre-validation ALLOW must never approve a script on its own
+    (approved = runnable by id with no LLM ever looking at it)."""
+    import autovibe
+    if not autovibe.script_library:
+        return {}
+    entries = autovibe.script_library.list(limit=1000)
+    local = [e for e in entries if (e['verdict'] or {}).get('reasoning', '').startswith('Local check')]
+    return {
+        'scripts': len(entries),
+        'approved': sum(e['approved'] for e in entries),
+        'locally_allowed': len(local),
+        'approved_by_local_check': [e['id'] for e in local if e['approved']],
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Regressions of report vs baseline, as readable lines."""
+    regressions = []
+    for entry, now in report['entries'].items():
+        before = baseline.get('entries', {}).get(entry)
+        if not before:
+            continue
+        for key, better in COMPARED.items():
+            old, new = before.get(key), now.get(key)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (better == 'lower' and change > tolerance) or (better == 'higher' and -change > tolerance):
+                regressions.append(f"{entry}.{key}: {old:.4f} -> {new:.4f} ({change:+.0%})")
+        if now['errors'] > before.get('errors', 0):
+            regressions.append(f"{entry}.errors: {before.get('errors', 0)} -> {now['errors']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', default=','.join(ENTRIES), help='tool,rest,mcp')
+    parser.add_argument('--rounds', type=int, default=3, help='passes over the corpus per entry')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=0.2, help='stub seconds per LLM call')
+    parser.add_argument('--generate-latency', type=float, help='stub seconds for code generation (default: --latency)')
+    parser.add_argument('--auto-check', action='store_true', help='one more LLM call per request')
+    parser.add_argument('--trace-memory', action='store_true', help='tracemalloc heap peak (slows everything down)')
+    parser.add_argument('--workdir', help='keep vibe_scripts/venv here between runs instead of a temp dir')
+    parser.add_argument('--json', action='store_true', help='machine-readable output')
+    parser.add_argument('--out', help='also write the JSON report here')
+    parser.add_argument('--baseline', help='earlier JSON report; exit 1 when something got worse')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative change vs baseline')
+    args = parser.parse_args()
+
+    corpus, scripts = load_corpus()
+    latencies = {}
+    if args.generate_latency is not None:
+        latencies = {'CodeGeneration': args.generate_latency, 'CodeReGeneration': args.generate_latency}
+    stub = stub_llm.start(latency=args.latency, latencies=latencies, scripts=scripts)
+
+    # before anything imports autovibe: talk to the stub, no response cache to hide the loop
+    os.environ['AUTOVIBE_LLM_BASE_URL'] = f"http://127.0.0.1:{stub.server_address[1]}/v1"
+    os.environ['OPEN_ROUTER_KEY'] = 'stub'
+    os.environ.pop('AUTOVIBE_LLM_CACHE', None)
+
+    tmp = None
+    workdir = args.workdir
+    if not workdir:
+        tmp = tempfile.TemporaryDirectory(prefix='autovibe_bench_')
+        workdir = tmp.name
+    Path(workdir).mkdir(parents=True, exist_ok=True)
+    os.chdir(workdir)
+
+    options = {'max_retry': 2, 'auto_check': args.auto_check, 'exec_timeout': 30}
+    report = {
+        'config': {
+            'rounds': args.rounds,
+            'concurrency': args.concurrency,
+            'latency': args.latency,
+            'latencies': latencies,
+            'auto_check': args.auto_check,
+            'corpus': len(corpus),
+            'recorded_scripts': len(scripts),
+            'python': sys.version.split()[0],
+        },
+        'entries': {},
+    }
+    try:
+        # the loop's own chatter goes to stderr, stdout is the report
+        with contextlib.redirect_stdout(sys.stderr):
+            for entry in [e.strip() for e in args.entries.split(',') if e.strip()]:
+                report['entries'][entry] = run_entry(entry, corpus, args.rounds, args.concurrency, options, args.trace_memory)
+            report['library'] = library_check()
+    finally:
+        stub.shutdown()
+        os.chdir(ROOT)
+        if tmp:
+            tmp.cleanup()
+
+    regressions = None
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare(report, baseline, args.tolerance)
+        report['regressions'] = regressions
+        if baseline.get('config') != report['config']:
+            print("⚠️ baseline was run with a different config, comparison is apples to oranges", file=sys.stderr)
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2))
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for entry, result in report['entries'].items():
+            print(f"{entry:<5} n={result['requests']:<4} err={result['errors']:<3} "
+                  f"p50={result['p50_s']:.3f}s p95={result['p95_s']:.3f}s p99={result['p99_s']:.3f}s "
+                  f"{result['throughput_rps']:.2f} req/s  llm calls={result['llm_calls']}  "
+                  f"rss={result['memory']['rss_kb_after'] // 1024 if result['memory']['rss_kb_after'] else '-'} MB")
+            for name, stage in sorted(result['stages'].items(), key=lambda item: -item[1]['share']):
+                print(f"        {name:<9} x{stage['count']:<4} mean={stage['mean_s']:.3f}s max={stage['max_s']:.3f}s {stage['share']:.0%}")
+        library = report['library']
+        if library:
+            print(f"library: {library['scripts']} scripts, {library['approved']} approved, "
+                  f"{library['locally_allowed']} allowed by the local check, "
+                  f"{len(library['approved_by_local_check'])} of those approved {library['approved_by_local_check'] or ''}")
+        if regressions is not None:
+            print("\n".join(["", "regressions:"] + regressions) if regressions else "\nno regressions vs baseline")
+
+    if regressions or report['library'].get('approved_by_local_check'):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
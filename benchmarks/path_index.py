@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark: PATH probing in system_info, old (iterdir + shutil.which per command) vs single scandir index.
+
+    python benchmarks/path_index.py --dirs 32 --files 800
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import system_info
+
+
+def legacy_probe():
+    """What system_info() did before the index: iterdir + os.access, then which() twice per command."""
+    found_commands = set()
+    for path_dir in os.environ.get('PATH', '').split(os.pathsep):
+        try:
+            path_obj = Path(path_dir)
+            if path_obj.exists() and path_obj.is_dir():
+                for file in path_obj.iterdir():
+                    if file.is_file() and os.access(file, os.X_OK):
+                        found_commands.add(file.stem.lower())
+        except (PermissionError, OSError):
+            continue
+
+    hits = set()
+    for cmd in {cmd for cmds in system_info.COMMAND_PATTERNS.values() for cmd in cmds}:
+        if cmd.lower() in found_commands or shutil.which(cmd):
+            hits.add(cmd)
+    # second round: the ✅/❓ indicator
+    return {cmd: bool(shutil.which(cmd)) for cmd in hits}
+
+
+def indexed_probe():
+    index = system_info.scan_path_executables()
+    categories = system_info.categorize_commands(index)
+    categories.pop('Other Tools')
+    return {cmd: cmd.lower() in index for cmds in categories.values() for cmd in cmds}
+
+
+def make_fake_path(root: Path, dirs: int, files: int) -> str:
+    """dirs x files executables, no pattern command among them => which() walks the whole PATH every time."""
+    path_dirs = []
+    for d in range(dirs):
+        bin_dir = root / f"bin{d:02d}"
+        bin_dir.mkdir()
+        for f in range(files):
+            exe = bin_dir / f"tool_{d}_{f}"
+            exe.touch()
+            exe.chmod(0o755)
+        path_dirs.append(str(bin_dir))
+    return os.pathsep.join(path_dirs + [os.environ.get('PATH', '')])
+
+
+def timeit(fn, rounds):
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dirs', type=int, default=32, help='fake PATH dirs to prepend')
+    parser.add_argument('--files', type=int, default=800, help='executables per fake dir')
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['PATH'] = make_fake_path(Path(tmp), args.dirs, args.files)
+        n_dirs = len(os.environ['PATH'].split(os.pathsep))
+
+        legacy = timeit(legacy_probe, args.rounds)
+        indexed = timeit(indexed_probe, args.rounds)
+
+        assert legacy_probe() == indexed_probe(), "indexed probe disagrees with which()"
+
+    print(f"PATH dirs: {n_dirs} ({args.dirs} fake x {args.files} executables)")
+    print(f"legacy  (iterdir + which): {legacy * 1000:8.1f} ms")
+    print(f"indexed (one scandir)    : {indexed * 1000:8.1f} ms")
+    print(f"speedup: {legacy / indexed:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
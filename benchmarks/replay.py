@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Replay a recorded cassette (llm_cassette.py) through AutoVibe.as_tool: same requests, same LLM answers,
+no network, so what's left to measure is save / install / execute / loop bookkeeping.
+
+Record one first, e.g. with the REST server or the offline suite:
+    AUTOVIBE_CASSETTE=run.jsonl AUTOVIBE_CASSETTE_MODE=record python serv_rest.py
+
+    python benchmarks/replay.py run.jsonl                          # zero LLM latency, 3 rounds
+    python benchmarks/replay.py run.jsonl --latency recorded       # paced like the recording
+    python benchmarks/replay.py run.jsonl --profile replay.prof    # + cProfile (sequential), top functions printed
+    python benchmarks/replay.py run.jsonl --json
+
+Scripts really run (in a temp work dir unless --workdir); recorded requirements get pip installed.
+"""
+
+import argparse
+import contextlib
+import cProfile
+import io
+import json
+import os
+import pstats
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def percentile(values: list[float], pct: float) -> float | None:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, round(pct / 100 * (len(values) - 1)))]
+
+
+def run_round(autovibe, requests: list[str], concurrency: int) -> list[tuple[bool, float]]:
+    from autovibe import AutoVibe
+
+    results = []
+    lock = threading.Lock()
+    pending = iter(requests)
+
+    def client():
+        while True:
+            with lock:
+                content = next(pending, None)
+            if content is None:
+                return
+            started = time.perf_counter()
+            result = AutoVibe(**autovibe).as_tool(content)
+            with lock:
+                results.append((not result.is_error, time.perf_counter() - started))
+
+    if concurrency == 1:
+        client()
+        return results
+    clients = [threading.Thread(target=client) for _ in range(concurrency)]
+    for t in clients:
+        t.start()
+    for t in clients:
+        t.join()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('cassette')
+    parser.add_argument('--latency', choices=('zero', 'recorded'), default='zero')
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--auto-check', action='store_true', help='only if the recording had auto_check on')
+    parser.add_argument('--profile', help='write cProfile stats here (forces --concurrency 1)')
+    parser.add_argument('--top', type=int, default=25, help='functions to print from the profile')
+    parser.add_argument('--workdir', help='keep vibe_scripts/venv here between runs instead of a temp dir')
+    parser.add_argument('--json', action='store_true', help='machine-readable output')
+    args = parser.parse_args()
+
+    cassette_path = Path(args.cassette).resolve()
+    os.environ['AUTOVIBE_CASSETTE'] = str(cassette_path)
+    os.environ['AUTOVIBE_CASSETTE_MODE'] = 'replay'
+    os.environ['AUTOVIBE_CASSETTE_LATENCY'] = args.latency
+    os.environ.pop('AUTOVIBE_LLM_CACHE', None)
+    os.environ.setdefault('OPEN_ROUTER_KEY', 'replay')
+
+    tmp = None
+    workdir = args.workdir
+    if not workdir:
+        tmp = tempfile.TemporaryDirectory(prefix='autovibe_replay_')
+        workdir = tmp.name
+    Path(workdir).mkdir(parents=True, exist_ok=True)
+    os.chdir(workdir)
+    concurrency = 1 if args.profile else args.concurrency
+
+    results, rounds = [], []
+    profiler = cProfile.Profile() if args.profile else None
+    try:
+        # the loop's own chatter goes to stderr, stdout is the report
+        with contextlib.redirect_stdout(sys.stderr):
+            import autovibe
+            from run_metrics import run_stats
+
+            requests = autovibe.cassette.requests()
+            if not requests:
+                raise SystemExit(f"{cassette_path}: no recorded runs (no first CodeGeneration calls)")
+            options = {'max_retry': 3, 'auto_check': args.auto_check, 'exec_timeout': 60}
+            autovibe.VibeEngine.shared()  # venv + system probe outside the timed rounds
+            for _ in range(args.rounds):
+                autovibe.cassette.rewind()
+                started = time.perf_counter()
+                if profiler:
+                    profiler.enable()
+                round_results = run_round(options, requests, concurrency)
+                if profiler:
+                    profiler.disable()
+                rounds.append(time.perf_counter() - started)
+                results.extend(round_results)
+            stats = run_stats.snapshot()
+            cassette_stats = autovibe.cassette.stats()
+    finally:
+        os.chdir(ROOT)
+        if tmp:
+            tmp.cleanup()
+
+    latencies = [seconds for _, seconds in results]
+    report = {
+        'cassette': str(cassette_path),
+        'latency': args.latency,
+        'requests_per_round': len(requests),
+        'rounds': args.rounds,
+        'concurrency': concurrency,
+        'errors': sum(1 for ok, _ in results if not ok),
+        'round_s': rounds,
+        'p50_s': percentile(latencies, 50),
+        'p95_s': percentile(latencies, 95),
+        'mean_s': statistics.mean(latencies),
+        'throughput_rps': len(results) / sum(rounds),
+        'bottleneck': stats['bottleneck'],
+        'stages': {name: {k: stage[k] for k in ('count', 'mean_s', 'max_s', 'share')} for name, stage in stats['stages'].items()},
+        'cassette_misses': cassette_stats['misses'],
+    }
+
+    profile_text = None
+    if profiler:
+        profiler.dump_stats(args.profile)
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(args.top)
+        profile_text = out.getvalue()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{report['requests_per_round']} requests x {args.rounds} rounds, LLM latency {args.latency}: "
+          f"p50={report['p50_s']:.3f}s p95={report['p95_s']:.3f}s {report['throughput_rps']:.2f} req/s, "
+          f"errors={report['errors']}, cassette misses={report['cassette_misses']}")
+    for name, stage in sorted(report['stages'].items(), key=lambda item: -item[1]['share']):
+        print(f"    {name:<9} x{stage['count']:<4} mean={stage['mean_s']:.4f}s max={stage['max_s']:.4f}s {stage['share']:.0%}")
+    if profile_text:
+        print(profile_text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Stub OpenAI-compatible LLM for load tests and benchmarks: POST /v1/chat/completions answers with a canned
+structured output (picked by the response_format schema name) after a configurable latency. No tokens spent.
+
+Code generation can be given recorded scripts (scripts={request text: code}): a prompt mentioning one of
+those requests gets that script back, anything else gets a tiny synthetic one.
+
+    python benchmarks/stub_llm.py --port 18080 --latency 0.5
+    AUTOVIBE_LLM_BASE_URL=http://127.0.0.1:18080/v1 OPEN_ROUTER_KEY=stub python serv_rest.py --prod
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SCRIPT = "import platform\nprint(f'stub vibe on {platform.system()}')\n"
+
+CANNED = {
+    'CodeGeneration': {'filename': 'stub_vibe.py', 'code': SCRIPT, 'requirements': []},
+    'CodeReGeneration': {'code': SCRIPT, 'requirements': []},
+    'ValidationResult': {'correct': True, 'risk': 'ALLOW', 'reasoning': 'stub: looks fine'},
+    'AutoVibeCheck': {'success': True, 'reasoning': 'stub: output looks right', 'message': 'stub vibe ran'},
+}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # keep-alive like a real endpoint, so clients reuse pooled connections (and their loop bugs show up)
+    protocol_version = 'HTTP/1.1'
+    latency = 0.5
+    # schema name => seconds, overrides latency (generation is usually the slow one)
+    latencies: dict[str, float] = {}
+    scripts: dict[str, str] = {}
+    calls = 0
+    calls_lock = threading.Lock()
+
+    def answer(self, schema_name: str, body: dict) -> dict | None:
+        answer = CANNED.get(schema_name)
+        if answer and 'code' in answer and self.scripts:
+            prompt = ' '.join(str(m.get('content', '')) for m in body.get('messages', []) if m.get('role') == 'user')
+            for request, code in self.scripts.items():
+                if request in prompt:
+                    filename = '_'.join(request.lower().split()[:4]) + '.py'
+                    return {**answer, 'code': code, **({'filename': filename} if 'filename' in answer else {})}
+        return answer
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+        schema = (body.get('response_format') or {}).get('json_schema') or {}
+        answer = self.answer(schema.get('name'), body)
+        if answer is None:
+            return self.reply(400, {'error': {'message': f"stub has no answer for {schema.get('name')!r}"}})
+
+        with StubHandler.calls_lock:
+            StubHandler.calls += 1
+        time.sleep(self.latencies.get(schema.get('name'), self.latency))
+        content = json.dumps(answer)
+        # rough token counts (~4 chars each), so usage accounting has something to add up
+        prompt_tokens = sum(len(str(m.get('content', ''))) for m in body.get('messages', [])) // 4
+        completion_tokens = len(content) // 4
+        self.reply(200, {
+            'id': 'chatcmpl-stub',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model', 'stub'),
+            'choices': [{
+                'index': 0,
+                'finish_reason': 'stop',
+                'message': {'role': 'assistant', 'content': content},
+            }],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens,
+            },
+        })
+
+    def reply(self, status: int, payload: dict):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def start(port: int = 0, latency: float = 0.5, latencies: dict = None, scripts: dict = None) -> ThreadingHTTPServer:
+    """Serve in a background thread; server.server_address[1] is the port."""
+    StubHandler.latency = latency
+    StubHandler.latencies = dict(latencies or {})
+    StubHandler.scripts = dict(scripts or {})
+    server = ThreadingHTTPServer(('127.0.0.1', port), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='stub-llm', daemon=True).start()
+    return server
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=18080)
+    parser.add_argument('--latency', type=float, default=0.5, help="seconds per LLM call")
+    args = parser.parse_args()
+    server = start(args.port, args.latency)
+    print(f"stub LLM on http://127.0.0.1:{server.server_address[1]}/v1 ({args.latency}s per call)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,219 @@
+"""
+Process-wide concurrency limits, shared by threads and by every event loop in the process
+(Flask runs each async view in its own loop, so asyncio.Semaphore won't do).
+
+    AUTOVIBE_MAX_LLM_CALLS    LLM requests in flight (cache hits don't count), default 8
+    AUTOVIBE_MAX_EXECUTIONS   generated scripts running at once, default 4
+    AUTOVIBE_MAX_PIP          pip installs at once, default 1 (one venv => more makes no sense)
+
+Admission (per server process, serv_rest): vibe requests running at once / allowed to wait for a turn.
+    AUTOVIBE_MAX_INFLIGHT     default 16
+    AUTOVIBE_MAX_QUEUED       default 32, beyond that => 429
+    AUTOVIBE_QUEUE_TIMEOUT    seconds a queued request waits before giving up => 503, default 30
+
+    with exec_slots: ...          # threads
+    async with exec_slots: ...    # coroutines, waiting doesn't block the loop
+"""
+
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import deque
+
+
+class Limiter:
+    """Counting semaphore usable from threads and from any event loop. Slots are handed over FIFO."""
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = max(1, limit)
+        self.lock = threading.Lock()
+        self.active = 0
+        self.waiters = deque()  # (loop or None, asyncio future or threading.Event)
+        self.acquired = 0
+        self.waited = 0
+
+    def try_acquire(self) -> bool:
+        """Call with lock held."""
+        if self.active < self.limit and not self.waiters:
+            self.active += 1
+            self.acquired += 1
+            return True
+        return False
+
+    def acquire(self, timeout: float = None) -> bool:
+        with self.lock:
+            if self.try_acquire():
+                return True
+            waiter = (None, threading.Event())
+            self.waiters.append(waiter)
+            self.waited += 1
+        if waiter[1].wait(timeout):  # release() hands its slot straight to us
+            return True
+        with self.lock:
+            if waiter in self.waiters:
+                self.waiters.remove(waiter)
+                return False
+        return True  # handed over just as we timed out
+
+    async def acquire_async(self, timeout: float = None) -> bool:
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            if self.try_acquire():
+                return True
+            waiter = (loop, loop.create_future())
+            self.waiters.append(waiter)
+            self.waited += 1
+        try:
+            await asyncio.wait_for(waiter[1], timeout)
+            return True
+        except (asyncio.CancelledError, asyncio.TimeoutError) as e:
+            with self.lock:
+                if waiter in self.waiters:
+                    self.waiters.remove(waiter)
+            # else: a slot is already on its way, handed_over() sees the cancel and passes it on
+            if isinstance(e, asyncio.TimeoutError):
+                return False
+            raise
+
+    def release(self):
+        with self.lock:
+            while self.waiters:
+                loop, waiter = self.waiters.popleft()
+                self.acquired += 1
+                if loop is None:
+                    waiter.set()
+                    return
+                try:
+                    loop.call_soon_threadsafe(self.handed_over, waiter)
+                    return
+                except RuntimeError:  # that loop is gone, try the next waiter
+                    continue
+            self.active -= 1
+
+    def handed_over(self, future):
+        if future.done():  # cancelled meanwhile => slot goes to the next one
+            self.release()
+        else:
+            future.set_result(None)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    async def __aenter__(self):
+        await self.acquire_async()
+        return self
+
+    async def __aexit__(self, *exc):
+        self.release()
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                'limit': self.limit,
+                'active': self.active,
+                'waiting': len(self.waiters),
+                'acquired': self.acquired,
+                'had_to_wait': self.waited,
+            }
+
+
+class Admission:
+    """Bounded admission for request handlers: up to max_inflight run, up to max_queued wait for a turn
+    (at most queue_timeout), the rest is turned away right away. enter() => None when admitted,
+    else (http status, retry after seconds) to answer with. Every admitted request must leave()."""
+
+    def __init__(self, max_inflight: int, max_queued: int, queue_timeout: float):
+        self.slots = Limiter('admission', max_inflight)
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.lock = threading.Lock()
+        self.queued = 0
+        self.rejected = {429: 0, 503: 0}
+        self.service_time = 1.0  # EWMA of seconds per admitted request, for Retry-After
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_inflight=env_limit('AUTOVIBE_MAX_INFLIGHT', 16),
+            max_queued=env_limit('AUTOVIBE_MAX_QUEUED', 32),
+            queue_timeout=float(os.environ.get('AUTOVIBE_QUEUE_TIMEOUT') or 30),
+        )
+
+    def retry_after(self) -> int:
+        """Rough time until a slot frees up for someone at the back of the queue."""
+        backlog = self.queued + 1
+        return max(1, math.ceil(self.service_time * backlog / self.slots.limit))
+
+    def reject(self, status: int) -> tuple[int, int]:
+        with self.lock:
+            self.rejected[status] += 1
+        return status, self.retry_after()
+
+    def join_queue(self) -> bool:
+        with self.lock:
+            if self.queued >= self.max_queued and self.slots.stats()['active'] >= self.slots.limit:
+                return False
+            self.queued += 1
+            return True
+
+    def leave_queue(self):
+        with self.lock:
+            self.queued -= 1
+
+    def enter(self):
+        if not self.join_queue():
+            return self.reject(429)
+        try:
+            admitted = self.slots.acquire(self.queue_timeout)
+        finally:
+            self.leave_queue()
+        return None if admitted else self.reject(503)
+
+    async def enter_async(self):
+        if not self.join_queue():
+            return self.reject(429)
+        try:
+            admitted = await self.slots.acquire_async(self.queue_timeout)
+        finally:
+            self.leave_queue()
+        return None if admitted else self.reject(503)
+
+    def leave(self, started: float = None):
+        if started is not None:
+            with self.lock:
+                self.service_time = 0.8 * self.service_time + 0.2 * (time.monotonic() - started)
+        self.slots.release()
+
+    def stats(self) -> dict:
+        slots = self.slots.stats()
+        with self.lock:
+            return {
+                'max_inflight': slots['limit'],
+                'inflight': slots['active'],
+                'max_queued': self.max_queued,
+                'queued': self.queued,
+                'queue_timeout': self.queue_timeout,
+                'rejected': dict(self.rejected),
+                'service_time_s': self.service_time,
+                'retry_after_s': self.retry_after(),
+            }
+
+
+def env_limit(name: str, default: int) -> int:
+    return int(os.environ.get(name) or default)
+
+
+llm_slots = Limiter('llm', env_limit('AUTOVIBE_MAX_LLM_CALLS', 8))
+exec_slots = Limiter('exec', env_limit('AUTOVIBE_MAX_EXECUTIONS', 4))
+pip_slots = Limiter('pip', env_limit('AUTOVIBE_MAX_PIP', 1))
+
+
+def limits_stats() -> dict:
+    return {limiter.name: limiter.stats() for limiter in (llm_slots, exec_slots, pip_slots)}
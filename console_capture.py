@@ -0,0 +1,238 @@
+"""
+Console capture for script runs, bounded in memory no matter how much a script prints.
+
+Per attempt and per stream (stdout/stderr): first HEAD_CHARS kept as is, last TAIL_CHARS in a ring buffer,
+full stream spilled to <tmp>/autovibe_console/<log_id>/ once it outgrows that. LLM stages get a
+truncated view that fits a token budget; the full log can be paged later with read_log(log_id, ...).
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections import deque
+from pathlib import Path
+
+HEAD_CHARS = 32 * 1024
+TAIL_CHARS = 32 * 1024
+# rough, good enough for budgeting prompt size
+CHARS_PER_TOKEN = 4
+# truncated view sizes: what repair/check prompts see, and what goes back in ToolReturn.content
+LLM_TOKEN_BUDGET = 6000
+RESPONSE_TOKEN_BUDGET = 4000
+
+LOG_ROOT = Path(tempfile.gettempdir()) / "autovibe_console"
+LOG_RETENTION = 24 * 3600  # seconds, older log dirs are swept when a new capture starts
+
+STREAM_LABELS = {
+    'stdout': "📤 Output: \n",
+    'stderr': "⚠️  Errors: \n",
+}
+
+
+class StreamCapture:
+    """One stream of one attempt: head + tail in memory, everything on disk once it gets big."""
+
+    def __init__(self, spill_path: Path, head_chars=HEAD_CHARS, tail_chars=TAIL_CHARS):
+        self.spill_path = spill_path
+        self.head_chars = head_chars
+        self.tail_chars = tail_chars
+
+        self.head = []          # chunks, total <= head_chars
+        self.head_size = 0
+        self.tail = deque()     # chunks after head, trimmed from the left to ~tail_chars
+        self.tail_size = 0
+        self.dropped = 0        # chars that fell out of the tail (they're only in the spill file)
+        self.spill = None       # open file once spilled
+
+        self.chars = 0
+        self.bytes = 0
+        self.lines = 0
+        self.lock = threading.Lock()
+
+    def write(self, text: str):
+        if not text:
+            return
+        with self.lock:
+            self.chars += len(text)
+            self.bytes += len(text.encode('utf-8', errors='replace'))
+            self.lines += text.count('\n')
+
+            if self.spill:
+                self.spill.write(text)
+            elif self.chars > self.head_chars + self.tail_chars:
+                # about to drop stuff: put everything so far on disk first (nothing lost yet at this point)
+                self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+                self.spill = open(self.spill_path, 'w', encoding='utf-8', errors='replace', newline='')
+                self.spill.write(''.join(self.head) + ''.join(self.tail) + text)
+
+            room = self.head_chars - self.head_size
+            if room > 0:
+                self.head.append(text[:room])
+                self.head_size += len(text[:room])
+                text = text[room:]
+            if text:
+                self.tail.append(text)
+                self.tail_size += len(text)
+                while self.tail and self.tail_size - len(self.tail[0]) >= self.tail_chars:
+                    first = self.tail.popleft()
+                    self.tail_size -= len(first)
+                    self.dropped += len(first)
+
+    def close(self):
+        """Make sure the full stream is on disk for paging later."""
+        with self.lock:
+            if self.spill:
+                self.spill.close()
+                self.spill = None
+            elif self.chars and not self.spill_path.exists():
+                self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.spill_path, 'w', encoding='utf-8', errors='replace', newline='') as f:
+                    f.write(''.join(self.head) + ''.join(self.tail))
+
+    def text(self, max_chars: int | None = None) -> str:
+        """Head + tail; when something is cut, a marker says how much and where the full log is."""
+        with self.lock:
+            head = ''.join(self.head)
+            tail = ''.join(self.tail)[-self.tail_chars:]
+            gap = self.dropped > 0
+            total = self.chars
+
+        if max_chars is None or max_chars >= len(head) + len(tail):
+            shown_head, shown_tail = head, tail
+        else:
+            # keep a bit more of the end, that's where the traceback lives
+            keep_head = min(len(head), max_chars * 2 // 5)
+            keep_tail = max_chars - keep_head
+            rest = tail if gap else (head + tail)[keep_head:]
+            shown_head = head[:keep_head]
+            shown_tail = rest[-keep_tail:] if keep_tail > 0 else ''
+
+        cut = total - len(shown_head) - len(shown_tail)
+        if cut <= 0:
+            return shown_head + shown_tail
+        marker = f"\n... [{cut} chars truncated, full log: {self.spill_path}] ...\n"
+        return shown_head + marker + shown_tail
+
+    def stats(self) -> dict:
+        return {'chars': self.chars, 'bytes': self.bytes, 'lines': self.lines, 'truncated_in_memory': self.dropped > 0}
+
+
+class AttemptCapture:
+    """Output of one attempt (a script run, or a note like a syntax error)."""
+
+    def __init__(self, log_dir: Path, index: int, label: str = 'exec'):
+        self.index = index
+        self.label = label
+        self.streams = {
+            name: StreamCapture(log_dir / f"attempt{index}_{name}.log") for name in STREAM_LABELS
+        }
+        self.returncode = None
+
+    def write(self, stream: str, text: str):
+        self.streams[stream].write(text)
+
+    def close(self, returncode=None):
+        self.returncode = returncode
+        for stream in self.streams.values():
+            stream.close()
+
+    @property
+    def chars(self) -> int:
+        return sum(s.chars for s in self.streams.values())
+
+    def render(self, max_chars: int | None = None) -> str:
+        """<console_log> block, same shape the prompts always had."""
+        present = [(name, s) for name, s in self.streams.items() if s.chars]
+        body = ""
+        for name, stream in present:
+            share = None if max_chars is None else max(max_chars // len(present), 200)
+            body += STREAM_LABELS[name] + stream.text(share) + "\n"
+        return "<console_log>\n" + body + "</console_log>\n"
+
+    def stats(self) -> dict:
+        return {
+            'attempt': self.index,
+            'label': self.label,
+            'returncode': self.returncode,
+            **{name: s.stats() for name, s in self.streams.items()},
+        }
+
+
+class ConsoleCapture:
+    """All attempts of one vibe run. Replaces the ever-growing console dump string."""
+
+    def __init__(self, root: Path = LOG_ROOT):
+        sweep_logs(root)
+        self.log_id = uuid.uuid4().hex[:16]
+        self.log_dir = Path(root) / self.log_id
+        self.attempts: list[AttemptCapture] = []
+
+    def new_attempt(self, label='exec') -> AttemptCapture:
+        attempt = AttemptCapture(self.log_dir, len(self.attempts), label)
+        self.attempts.append(attempt)
+        return attempt
+
+    def note(self, stream: str, text: str, label='note'):
+        """Whole-text entry (syntax error etc) as its own attempt."""
+        attempt = self.new_attempt(label)
+        attempt.write(stream, text)
+        attempt.close()
+        return attempt
+
+    def render(self, token_budget: int | None = LLM_TOKEN_BUDGET) -> str:
+        """All attempts as <console_log> blocks, fitted into ~token_budget tokens (None => no limit).
+        Small attempts keep everything, big ones share what's left evenly."""
+        if token_budget is None:
+            return "".join(a.render() for a in self.attempts)
+        budget = token_budget * CHARS_PER_TOKEN
+        caps = {}
+        remaining = budget
+        pending = sorted(self.attempts, key=lambda a: a.chars)
+        while pending:
+            share = remaining // len(pending)
+            attempt = pending.pop(0)
+            caps[attempt.index] = min(attempt.chars, share)
+            remaining -= caps[attempt.index]
+        return "".join(a.render(caps[a.index]) for a in self.attempts)
+
+    def __str__(self):
+        return self.render(None)
+
+    def stats(self) -> dict:
+        return {'log_id': self.log_id, 'attempts': [a.stats() for a in self.attempts]}
+
+
+def read_log(log_id: str, attempt: int, stream: str = 'stdout', offset: int = 0, limit: int = 64 * 1024) -> dict:
+    """Page through a full captured stream: chars [offset, offset + limit)."""
+    if stream not in STREAM_LABELS or not log_id.isalnum():
+        raise ValueError(f"bad log reference: {log_id}/{attempt}/{stream}")
+    path = LOG_ROOT / log_id / f"attempt{int(attempt)}_{stream}.log"
+    if not path.exists():
+        raise FileNotFoundError(f"no such log: {log_id}/{attempt}/{stream}")
+    with open(path, 'r', encoding='utf-8', errors='replace', newline='') as f:
+        f.seek(0)
+        if offset:
+            f.read(offset)  # text mode can't seek by char, read past it
+        text = f.read(limit)
+        more = bool(f.read(1))
+    return {'log_id': log_id, 'attempt': attempt, 'stream': stream, 'offset': offset,
+            'text': text, 'next_offset': offset + len(text) if more else None}
+
+
+def sweep_logs(root: Path = LOG_ROOT, max_age: float = LOG_RETENTION):
+    """Remove log dirs older than max_age."""
+    try:
+        with os.scandir(root) as it:
+            entries = list(it)
+    except OSError:
+        return
+    cutoff = time.time() - max_age
+    for entry in entries:
+        try:
+            if entry.is_dir() and entry.stat().st_mtime < cutoff:
+                shutil.rmtree(entry.path, ignore_errors=True)
+        except OSError:
+            continue
@@ -0,0 +1,298 @@
+"""
+Warm executor pool for generated scripts (optional, POSIX only).
+
+A cold run pays for interpreter startup + imports every time; for the quick checks (ports, uptime,
+disk) that's most of the run. Here a zygote process (executor_zygote.py) sits on the venv python with
+common modules already imported and forks a fresh child per script. Output goes through real pipes
+into the same capture as before, the child gets its own session (timeout kills its group), the run
+limits and the script env; rusage comes back from the zygote, which is the one reaping it.
+
+    AUTOVIBE_EXEC_POOL=1                 turn it on (off by default)
+    AUTOVIBE_EXEC_POOL_SIZE              zygotes, round robin (default 1, forking is cheap)
+    AUTOVIBE_EXEC_POOL_PRELOAD           modules to import up front (default: PRELOAD)
+
+Zygotes restart when the venv's site-packages change (pip install), so scripts never see stale modules.
+Differences from a cold interpreter: same hash seed as the zygote, preloaded modules already in
+sys.modules. Anything going wrong here => the caller falls back to the cold path.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+from system_info import venv_site_packages
+
+ZYGOTE = Path(__file__).resolve().with_name('executor_zygote.py')
+PRELOAD = ('json', 'os', 'platform', 're', 'shutil', 'socket', 'sqlite3', 'subprocess', 'datetime',
+           'pathlib', 'urllib.request', 'psutil', 'requests')
+# zygote warm up (imports) / pid handshake, seconds
+READY_TIMEOUT = 60
+HANDSHAKE_TIMEOUT = 10
+
+
+class PoolError(RuntimeError):
+    pass
+
+
+def read_line(sock: socket.socket) -> bytes:
+    """One JSON line, byte by byte (what follows belongs to someone else: wait_usage, the next reply)."""
+    line = b''
+    while not line.endswith(b'\n'):
+        chunk = sock.recv(1)
+        if not chunk:
+            raise PoolError("zygote hung up")
+        line += chunk
+    return line
+
+
+class PooledProcess:
+    """Popen look-alike for a script forked by a zygote: pid, stdout/stderr pipes, returncode.
+    Not our child, so run_limits.wait_usage asks the zygote (wait_usage below) instead of os.wait4."""
+
+    def __init__(self, pid: int, stdout, stderr, channel: socket.socket):
+        self.pid = pid
+        self.stdout = stdout
+        self.stderr = stderr
+        self.channel = channel
+        self.returncode = None
+
+    def wait_usage(self, started: float) -> dict:
+        try:
+            line = self.channel.makefile('rb').readline()
+        finally:
+            self.channel.close()
+        return self.usage(line, started)
+
+    async def wait_usage_async(self, started: float) -> dict:
+        """wait_usage on the event loop: the zygote's report is read off the channel without a thread."""
+        reader, writer = await asyncio.open_connection(sock=self.channel)
+        try:
+            line = await reader.readline()
+        finally:
+            writer.close()
+        return self.usage(line, started)
+
+    def usage(self, line: bytes, started: float) -> dict:
+        elapsed = time.monotonic() - started
+        # zygote side died without a word => report it like a SIGKILL
+        result = json.loads(line) if line else {'returncode': -9}
+        self.returncode = result.pop('returncode')
+        return {'returncode': self.returncode, 'elapsed_s': elapsed, **result}
+
+
+class Zygote:
+    def __init__(self, venv_python: Path, preload: list[str]):
+        self.control, theirs = socket.socketpair()
+        self.lock = threading.Lock()
+        started = time.monotonic()
+        self.proc = subprocess.Popen(
+            [str(venv_python), str(ZYGOTE), str(theirs.fileno()), ','.join(preload)],
+            pass_fds=[theirs.fileno()],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+        )
+        theirs.close()
+        self.control.settimeout(READY_TIMEOUT)
+        try:
+            self.preloaded = json.loads(read_line(self.control))['ready']
+        except (OSError, ValueError, KeyError) as e:
+            self.close()
+            raise PoolError(f"zygote did not come up: {e}")
+        self.control.settimeout(None)
+        self.warmup_s = time.monotonic() - started
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def spawn(self, script: str, cwd: str, env: dict, rlimits: list, args: list[str] = ()) -> PooledProcess:
+        out_r, out_w = os.pipe()
+        err_r, err_w = os.pipe()
+        mine, theirs = socket.socketpair()
+        try:
+            stdin = 0
+            try:
+                os.fstat(0)
+            except OSError:
+                stdin = os.open(os.devnull, os.O_RDONLY)
+            try:
+                with self.lock:
+                    socket.send_fds(self.control, [b'R'], [theirs.fileno(), stdin, out_w, err_w])
+            finally:
+                if stdin:
+                    os.close(stdin)
+                for fd in (out_w, err_w):
+                    os.close(fd)
+                theirs.close()
+
+            request = {'script': script, 'args': list(args), 'cwd': cwd, 'env': env, 'rlimits': rlimits}
+            mine.settimeout(HANDSHAKE_TIMEOUT)
+            mine.sendall(json.dumps(request).encode() + b'\n')
+            pid = json.loads(read_line(mine))['pid']
+            mine.settimeout(None)
+        except (OSError, ValueError, KeyError, PoolError) as e:
+            mine.close()
+            for fd in (out_r, err_r):
+                os.close(fd)
+            raise PoolError(f"zygote spawn failed: {e}")
+        return PooledProcess(pid, open(out_r, 'rb'), open(err_r, 'rb'), mine)
+
+    def close(self):
+        self.control.close()  # zygote exits on EOF
+        try:
+            self.proc.wait(5)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.wait()
+
+
+class ExecutorPool:
+    def __init__(self, venv_python: Path, venv_dir: Path, size: int = 1, preload=PRELOAD):
+        self.venv_python = Path(venv_python)
+        self.venv_dir = Path(venv_dir)
+        self.size = max(1, size)
+        self.preload = list(preload)
+        self.lock = threading.Lock()
+        self.zygotes: list[Zygote] = []
+        self.venv_key = None
+        self.next = 0
+        self.spawned = 0
+        self.fallbacks = 0
+        self.restarts = 0
+        self.spawn_s = 0.0
+        # measured once in the background: a cold `python -c "import <preload>"` vs a warm fork of an empty script
+        self.cold_start_s = None
+        self.warm_start_s = None
+
+    @classmethod
+    def from_env(cls, venv_python: Path, venv_dir: Path):
+        """ExecutorPool if AUTOVIBE_EXEC_POOL is on (POSIX only), else None."""
+        if os.environ.get('AUTOVIBE_EXEC_POOL', '').strip().lower() not in ('1', 'true', 'yes', 'on'):
+            return None
+        if os.name != 'posix' or not hasattr(socket, 'send_fds'):
+            print("⚠️  AUTOVIBE_EXEC_POOL needs POSIX (fork + fd passing), running scripts cold")
+            return None
+        preload = os.environ.get('AUTOVIBE_EXEC_POOL_PRELOAD')
+        return cls(
+            venv_python,
+            venv_dir,
+            size=int(os.environ.get('AUTOVIBE_EXEC_POOL_SIZE') or 1),
+            preload=[m.strip() for m in preload.split(',') if m.strip()] if preload is not None else PRELOAD,
+        )
+
+    def site_key(self):
+        stamps = []
+        for site in venv_site_packages(self.venv_dir):
+            try:
+                stamps.append(site.stat().st_mtime_ns)
+            except OSError:
+                continue
+        return tuple(stamps)
+
+    def start(self):
+        """Bring the zygotes up (also after pip touched the venv) and calibrate in the background."""
+        with self.lock:
+            self.ensure()
+        if self.cold_start_s is None:
+            threading.Thread(target=self.calibrate, name='autovibe-exec-pool-calibrate', daemon=True).start()
+
+    def ensure(self):
+        """Call with lock held: right number of live zygotes, matching the current venv."""
+        key = self.site_key()
+        if key != self.venv_key and self.zygotes:
+            self.restarts += 1
+            for zygote in self.zygotes:
+                zygote.close()
+            self.zygotes = []
+        self.venv_key = key
+        self.zygotes = [z for z in self.zygotes if z.alive()]
+        while len(self.zygotes) < self.size:
+            zygote = Zygote(self.venv_python, self.preload)
+            print(f"🧬 Executor zygote up in {zygote.warmup_s:.2f}s, preloaded: {', '.join(zygote.preloaded) or '-'}")
+            self.zygotes.append(zygote)
+
+    def pick(self) -> Zygote:
+        with self.lock:
+            self.ensure()
+            self.next += 1
+            return self.zygotes[self.next % len(self.zygotes)]
+
+    def spawn_on_zygote(self, script: str, cwd: str, env: dict, rlimits: list, args: list[str] = ()) -> PooledProcess:
+        zygote = self.pick()
+        try:
+            return zygote.spawn(script, cwd, env, rlimits, args)
+        except PoolError:
+            with self.lock:
+                replaced = zygote not in self.zygotes
+            if not replaced:
+                raise
+            # restarted under us (venv changed), the new one will do
+            return self.pick().spawn(script, cwd, env, rlimits, args)
+
+    def spawn(self, script: str, cwd: str, env: dict, rlimits: list, args: list[str] = ()) -> PooledProcess:
+        started = time.monotonic()
+        proc = self.spawn_on_zygote(script, cwd, env, rlimits, args)
+        with self.lock:
+            self.spawned += 1
+            self.spawn_s += time.monotonic() - started
+        return proc
+
+    def popen(self, script: str, cwd: str, env: dict, rlimits: list, cold, args: list[str] = ()):
+        """Forked from a zygote, or cold() (the normal Popen) when the pool can't."""
+        try:
+            return self.spawn(script, cwd, env, rlimits, args)
+        except (PoolError, OSError) as e:
+            with self.lock:
+                self.fallbacks += 1
+            print(f"⚠️  Executor pool: {e}, running cold")
+            return cold()
+
+    def calibrate(self):
+        """One cold start (interpreter + the preloaded imports) vs one warm fork, for stats()."""
+        try:
+            with self.lock:
+                if not self.zygotes:
+                    return
+                modules = self.zygotes[0].preloaded
+            started = time.monotonic()
+            subprocess.run([str(self.venv_python), '-c', ';'.join(f'import {m}' for m in modules) or 'pass'],
+                           check=True, capture_output=True)
+            cold = time.monotonic() - started
+
+            started = time.monotonic()
+            proc = self.spawn_on_zygote(os.devnull, os.getcwd(), dict(os.environ), [])
+            proc.wait_usage(started)
+            proc.stdout.close()
+            proc.stderr.close()
+            self.cold_start_s, self.warm_start_s = cold, time.monotonic() - started
+        except Exception as e:
+            print(f"⚠️  Executor pool calibration failed: {e}", file=sys.stderr)
+
+    def stats(self) -> dict:
+        with self.lock:
+            saved = None
+            if self.cold_start_s is not None:
+                saved = max(0.0, self.cold_start_s - self.warm_start_s)
+            return {
+                'zygotes': len(self.zygotes),
+                'preloaded': self.zygotes[0].preloaded if self.zygotes else [],
+                'spawned': self.spawned,
+                'fallbacks': self.fallbacks,
+                'restarts': self.restarts,
+                'mean_spawn_s': self.spawn_s / self.spawned if self.spawned else None,
+                'cold_start_s': self.cold_start_s,
+                'warm_start_s': self.warm_start_s,
+                'saved_s_per_run': saved,
+                'saved_s_total': saved * self.spawned if saved is not None else None,
+            }
+
+    def close(self):
+        with self.lock:
+            for zygote in self.zygotes:
+                zygote.close()
+            self.zygotes = []
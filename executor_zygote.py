@@ -0,0 +1,222 @@
+"""
+Zygote for executor_pool.py: runs under the vibe_scripts venv python, imports the preload modules once,
+then forks a child per script. Stdlib only, nothing from autovibe gets imported in here.
+
+    <venv python> executor_zygote.py <control fd> <comma separated modules to preload>
+
+Control socket (AF_UNIX stream from the parent): one byte b'R' per script, carrying 4 fds = request socket,
+stdin, stdout, stderr (one byte per sendmsg keeps each set of fds with its own message).
+Per script the zygote forks a monitor (so the zygote never blocks), the monitor reads the request
+(JSON line: script, args, cwd, env, rlimits), forks the runner, reports {"pid": ...}, reaps it with wait4
+and reports {"returncode", "cpu_user_s", "cpu_system_s", "max_rss_kb"}.
+"""
+
+import array
+import atexit
+import builtins
+import importlib.machinery
+import io
+import json
+import os
+import resource
+import signal
+import socket
+import sys
+import threading
+import types
+
+
+def preload(modules: list[str]) -> list[str]:
+    loaded = []
+    for name in modules:
+        try:
+            __import__(name)
+            loaded.append(name)
+        except Exception:
+            pass  # not installed (yet), scripts will import it the slow way
+    return loaded
+
+
+def receive(control: socket.socket):
+    """One request: (b'R', [request, stdin, stdout, stderr]) or None when the parent is gone."""
+    fds = array.array('i')
+    try:
+        message, ancdata, _, _ = control.recvmsg(1, socket.CMSG_LEN(4 * fds.itemsize))
+    except InterruptedError:
+        return b'', []
+    if not message:
+        return None
+    for level, kind, data in ancdata:
+        if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+            fds.frombytes(data[:len(data) - (len(data) % fds.itemsize)])
+    return message, list(fds)
+
+
+def apply_rlimits(limits: list):
+    for res, soft, hard in limits:
+        # never raise above what we have ourselves (unprivileged setrlimit would fail)
+        cur_soft, cur_hard = resource.getrlimit(res)
+        if cur_hard != resource.RLIM_INFINITY:
+            hard = min(hard, cur_hard)
+            soft = min(soft, hard)
+        resource.setrlimit(res, (soft, hard))
+
+
+def reset_stdio():
+    """What a cold `python script.py` with PYTHONUNBUFFERED=1 PYTHONIOENCODING=utf-8 would have."""
+    sys.stdin = sys.__stdin__ = io.TextIOWrapper(io.BufferedReader(io.FileIO(0, 'r', closefd=False)), encoding='utf-8')
+    sys.stdout = sys.__stdout__ = io.TextIOWrapper(io.FileIO(1, 'w', closefd=False), encoding='utf-8', write_through=True)
+    sys.stderr = sys.__stderr__ = io.TextIOWrapper(
+        io.FileIO(2, 'w', closefd=False), encoding='utf-8', errors='backslashreplace', write_through=True)
+
+
+def reseed():
+    """Forked children share the zygote's RNG state; a cold interpreter would start fresh."""
+    if 'random' in sys.modules:
+        sys.modules['random'].seed()
+    if 'numpy.random' in sys.modules:
+        try:
+            sys.modules['numpy.random'].seed()
+        except Exception:
+            pass
+    if 'tempfile' in sys.modules:
+        sys.modules['tempfile'].tempdir = None  # TMPDIR comes with the request env
+
+
+def run_main(path: str):
+    """What `python script.py` does with the file: compiled under its absolute path (__file__, tracebacks),
+    run in a fresh __main__. Not runpy.run_path, that would also set argv[0] to the absolute path."""
+    with io.open_code(path) as source:
+        code = compile(source.read(), path, 'exec', dont_inherit=True)
+    main = types.ModuleType('__main__')
+    main.__file__, main.__cached__, main.__builtins__, main.__annotations__ = path, None, builtins, {}
+    main.__loader__ = importlib.machinery.SourceFileLoader('__main__', path)
+    sys.modules['__main__'] = main
+    exec(code, main.__dict__)
+
+
+def script_traceback(tb, script: str):
+    """tb from the script's own frame on, minus run_script and run_main above it, like `python script.py` prints.
+    None when the script never got to run (SyntaxError while compiling it): cold python shows no frames either."""
+    while tb is not None and tb.tb_frame.f_code.co_filename != script:
+        tb = tb.tb_next
+    return tb
+
+
+def run_script(request: dict, stdio: list[int]) -> int:
+    """In the runner child: become `python script.py`, return its exit code."""
+    os.setsid()
+    for target, fd in enumerate(stdio):
+        os.dup2(fd, target)
+        os.close(fd)
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    apply_rlimits(request.get('rlimits') or [])
+
+    os.chdir(request['cwd'])
+    os.environ.clear()
+    os.environ.update(request['env'])
+    reset_stdio()
+    reseed()
+
+    script = request['script']
+    sys.argv = [script, *request.get('args', [])]
+    # cold python: argv[0] as given, __file__ and traceback paths absolute
+    path = os.path.abspath(script)
+    sys.path.insert(0, os.path.dirname(path))
+
+    code = 0
+    try:
+        run_main(path)
+    except SystemExit as e:
+        if e.code is None:
+            code = 0
+        elif isinstance(e.code, int):
+            code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            code = 1
+    except BaseException as e:
+        # the hook prints e.__traceback__, not its tb argument
+        e.__traceback__ = script_traceback(e.__traceback__, path)
+        sys.excepthook(type(e), e, e.__traceback__)
+        code = 1
+
+    # interpreter shutdown, minus the parts that belong to the zygote
+    for thread in threading.enumerate():
+        if thread is not threading.main_thread() and not thread.daemon:
+            thread.join()
+    try:
+        atexit._run_exitfuncs()
+    except Exception:
+        pass
+    for stream in (sys.stdout, sys.stderr):
+        try:
+            stream.flush()
+        except Exception:
+            pass
+    return code
+
+
+def monitor(request_fd: int, stdio: list[int]):
+    """Forked per script: start the runner, tell the parent its pid, reap it, send back the usage."""
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    channel = socket.socket(fileno=request_fd)
+    reader = channel.makefile('rb')
+    request = json.loads(reader.readline())
+
+    pid = os.fork()
+    if pid == 0:
+        channel.close()
+        code = 1
+        try:
+            code = run_script(request, stdio)
+        finally:
+            os._exit(code & 0xFF)
+
+    for fd in stdio:
+        os.close(fd)
+    channel.sendall(json.dumps({'pid': pid}).encode() + b'\n')
+    _, status, usage = os.wait4(pid, 0)
+    max_rss_kb = usage.ru_maxrss // 1024 if sys.platform == 'darwin' else usage.ru_maxrss
+    channel.sendall(json.dumps({
+        'returncode': os.waitstatus_to_exitcode(status),
+        'cpu_user_s': usage.ru_utime,
+        'cpu_system_s': usage.ru_stime,
+        'max_rss_kb': max_rss_kb,
+    }).encode() + b'\n')
+
+
+def main():
+    control = socket.socket(fileno=int(sys.argv[1]))
+    modules = [m.strip() for m in (sys.argv[2] if len(sys.argv) > 2 else '').split(',') if m.strip()]
+    # our own dir is not something scripts would see (runner puts the script's dir first)
+    del sys.path[0]
+    loaded = preload(modules)
+    # monitors are reaped by the kernel; they restore SIGCHLD before forking the runner
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    control.sendall(json.dumps({'ready': loaded}).encode() + b'\n')
+
+    while True:
+        received = receive(control)
+        if received is None:
+            return  # parent closed the control socket
+        message, fds = received
+        if message != b'R' or len(fds) != 4:
+            for fd in fds:
+                os.close(fd)
+            continue
+        request_fd, stdio = fds[0], fds[1:]
+        if os.fork() == 0:
+            control.close()
+            try:
+                monitor(request_fd, stdio)
+            finally:
+                os._exit(0)
+        for fd in fds:
+            os.close(fd)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,204 @@
+"""
+Import name => pip distribution, locally, no LLM.
+
+Used twice: before a generated script runs, its imports (AST) fix up the requirements the model declared;
+when it still dies on ModuleNotFoundError, figure out what to pip install and run the same script again
+instead of asking for a repair.
+
+Only distributions we know get installed this way (IMPORT_TO_DIST, KNOWN_DISTRIBUTIONS, or already known to
+the venv / requirements index): a made up or misspelled import must not turn into an unseen pip install of
+whatever squats that name on PyPI. Anything else stays with the LLM repair.
+"""
+
+import ast
+import re
+import sys
+
+from requirements_index import requirement_name
+from system_info import normalize_package_name
+
+# import names whose distribution is called something else; anything not here is its own name (when we know it)
+IMPORT_TO_DIST = {
+    'attr': 'attrs',
+    'Bio': 'biopython',
+    'bs4': 'beautifulsoup4',
+    'cairo': 'pycairo',
+    'Crypto': 'pycryptodome',
+    'cv2': 'opencv-python',
+    'dateutil': 'python-dateutil',
+    'discord': 'discord.py',
+    'dns': 'dnspython',
+    'docx': 'python-docx',
+    'dotenv': 'python-dotenv',
+    'fitz': 'PyMuPDF',
+    'gi': 'PyGObject',
+    'git': 'GitPython',
+    'github': 'PyGithub',
+    'google.protobuf': 'protobuf',
+    'jose': 'python-jose',
+    'jwt': 'PyJWT',
+    'kafka': 'kafka-python',
+    'ldap': 'python-ldap',
+    'Levenshtein': 'python-Levenshtein',
+    'magic': 'python-magic',
+    'markdown': 'Markdown',
+    'MySQLdb': 'mysqlclient',
+    'nmap': 'python-nmap',
+    'OpenSSL': 'pyOpenSSL',
+    'PIL': 'Pillow',
+    'pkg_resources': 'setuptools',
+    'pptx': 'python-pptx',
+    'psycopg2': 'psycopg2-binary',
+    'serial': 'pyserial',
+    'skimage': 'scikit-image',
+    'sklearn': 'scikit-learn',
+    'slugify': 'python-slugify',
+    'speedtest': 'speedtest-cli',
+    'telegram': 'python-telegram-bot',
+    'usb': 'pyusb',
+    'whois': 'python-whois',
+    'win32api': 'pywin32',
+    'win32con': 'pywin32',
+    'wx': 'wxPython',
+    'yaml': 'PyYAML',
+    'zmq': 'pyzmq',
+    '_cffi_backend': 'cffi',
+    'cpuinfo': 'py-cpuinfo',
+    'nacl': 'PyNaCl',
+    'speech_recognition': 'SpeechRecognition',
+    'websocket': 'websocket-client',
+    'send2trash': 'Send2Trash',
+    'ping3': 'ping3',
+}
+
+# well known distributions imported under their own name (compared normalized)
+KNOWN_DISTRIBUTIONS = {
+    'aiohttp', 'arrow', 'bcrypt', 'boto3', 'botocore', 'cachetools', 'certifi', 'chardet', 'click', 'colorama',
+    'cryptography', 'distro', 'docker', 'duckdb', 'emoji', 'fastapi', 'feedparser', 'filelock', 'flask', 'geopy',
+    'gputil', 'h5py', 'html5lib', 'httpx', 'humanize', 'idna', 'jinja2', 'keyboard', 'kubernetes', 'loguru', 'lxml',
+    'markupsafe', 'matplotlib', 'mouse', 'mss', 'netaddr', 'netifaces', 'networkx', 'nltk', 'ntplib', 'numpy',
+    'openai', 'openpyxl', 'orjson', 'packaging', 'pandas', 'paramiko', 'pendulum', 'pexpect', 'pip', 'platformdirs',
+    'plotly', 'plyer', 'polars', 'prettytable', 'psutil', 'pyarrow', 'pyaudio', 'pyautogui', 'pydantic', 'pyfiglet',
+    'pygame', 'pymongo', 'pymysql', 'pynput', 'pyperclip', 'pypdf', 'pypdf2', 'pytesseract', 'pyttsx3', 'pytz',
+    'pywinauto', 'qrcode', 'redis', 'reportlab', 'requests', 'rich', 'schedule', 'scapy', 'scipy', 'screeninfo',
+    'seaborn', 'selenium', 'setuptools', 'simplejson', 'six', 'sounddevice', 'soundfile', 'sqlalchemy', 'statsmodels',
+    'sympy', 'tabulate', 'tenacity', 'termcolor', 'toml', 'tomli', 'torch', 'tqdm', 'typer', 'tzlocal', 'ujson',
+    'urllib3', 'uvicorn', 'watchdog', 'websockets', 'wheel', 'wmi', 'xlrd', 'xlsxwriter', 'xmltodict',
+}
+
+_missing_module = re.compile(r"(?:ModuleNotFoundError|ImportError): No module named '?([A-Za-z_][\w.]*)'?")
+_import_name = re.compile(r'^[A-Za-z_]\w*(\.[A-Za-z_]\w*)*$')
+
+
+def missing_module(text: str) -> str | None:
+    """Module a traceback says could not be imported (the last one mentioned), or None."""
+    found = _missing_module.findall(text or '')
+    return found[-1] if found else None
+
+
+def is_stdlib(module: str) -> bool:
+    return module.split('.')[0] in sys.stdlib_module_names
+
+
+def distribution_for(module: str, known: set[str] = frozenset()) -> str | None:
+    """Distribution that provides module, None when pip can't help (stdlib, weird names) or when it's
+    not a distribution we know (known = normalized dist names the venv / requirements index already have)."""
+    if not module or not _import_name.match(module) or is_stdlib(module):
+        return None
+    # dotted entries first (google.protobuf), then the top level package
+    parts = module.split('.')
+    for depth in range(len(parts), 0, -1):
+        name = '.'.join(parts[:depth])
+        if name in IMPORT_TO_DIST:
+            return IMPORT_TO_DIST[name]
+    top = parts[0]
+    if top.startswith('_'):
+        return None  # private extension module of something else, the real package is the one to fix
+    name = normalize_package_name(top)
+    if name in KNOWN_DISTRIBUTIONS or name in known:
+        return top
+    return None
+
+
+# except clauses that make an import optional (try: import x / except ImportError: fallback)
+_optional_import_errors = {'ImportError', 'ModuleNotFoundError', 'Exception', 'BaseException'}
+
+
+def guards_import(handler: ast.ExceptHandler) -> bool:
+    if handler.type is None:
+        return True
+    types = handler.type.elts if isinstance(handler.type, ast.Tuple) else [handler.type]
+    return any(isinstance(t, ast.Name) and t.id in _optional_import_errors for t in types)
+
+
+def imported_modules(code: str) -> list[str]:
+    """Absolute imports of the code (full dotted names, first seen order), minus optional ones
+    inside try/except ImportError. Unparseable code => []."""
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return []
+
+    optional = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Try) and any(guards_import(h) for h in node.handlers):
+            for statement in node.body:
+                optional.update(id(n) for n in ast.walk(statement))
+
+    modules = []
+    for node in ast.walk(tree):
+        if id(node) in optional:
+            continue
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and not node.level and node.module:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            if name != '__future__' and name not in modules:
+                modules.append(name)
+    return modules
+
+
+def covers(requirement: str, module: str, distribution: str) -> bool:
+    """Does a declared requirement (probably) provide module? Same dist, same name as the import,
+    or a variant of the dist (opencv-python-headless for cv2)."""
+    name = requirement_name(requirement)
+    if not name:
+        return False
+    wanted = normalize_package_name(distribution)
+    return name in (wanted, normalize_package_name(module.split('.')[0])) or name.startswith(wanted + '-')
+
+
+def infer_requirements(code: str, declared: list[str], importable: set[str], installed: set[str] = frozenset(),
+                       local: set[str] = frozenset(), known: set[str] = frozenset()) -> tuple[list[str], list[str], list[str], list[str]]:
+    """Declared requirements checked against what the code imports => (requirements, added, dropped, skipped).
+
+    dropped: stdlib names the model listed (pip either fails on them or installs some old backport).
+    added:   distributions for third-party imports the venv can't satisfy and nothing declared covers.
+    skipped: such imports whose distribution we don't know (see distribution_for), left out on purpose.
+    importable = top level names the venv has, installed = its normalized dist names,
+    local = sibling modules next to the script, known = dist names distribution_for may trust.
+    A declared requirement that matches none of the imports and isn't installed may well be the one
+    providing an odd import name, so nothing gets added then (the ModuleNotFoundError fast path is still there)."""
+    dropped = [r for r in declared if (requirement_name(r) or '').replace('-', '_') in sys.stdlib_module_names]
+    kept = [r for r in declared if r not in dropped]
+
+    needed, unknown = [], []
+    for module in imported_modules(code):
+        top = module.split('.')[0]
+        if top in importable or top in local:
+            continue
+        distribution = distribution_for(module, known)
+        if distribution:
+            if all(distribution != d for _, d in needed):
+                needed.append((module, distribution))
+        elif _import_name.match(top) and not top.startswith('_') and not is_stdlib(top) and top not in unknown:
+            unknown.append(top)
+
+    uncovered = [(m, d) for m, d in needed if not any(covers(r, m, d) for r in kept)]
+    unclaimed = [r for r in kept if requirement_name(r) not in installed and not any(covers(r, m, d) for m, d in needed)]
+    added = [] if unclaimed else [d for _, d in uncovered]
+    skipped = [m for m in unknown if not any(covers(r, m, m) for r in kept)]
+    return kept + added, added, dropped, skipped
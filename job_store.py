@@ -0,0 +1,210 @@
+"""
+Background vibe jobs: POST /jobs answers with an id right away, GET /jobs/<id> shows how far it got.
+
+Jobs live in SQLite (vibe_scripts/jobs.sqlite3, AUTOVIBE_JOB_DB to move it) so they survive restarts,
+and run on a bounded thread pool (AUTOVIBE_JOB_WORKERS, default 4). At most AUTOVIBE_JOB_QUEUE_MAX
+(default 1000) may wait; submit() refuses more with QueueFull.
+On startup, recover() puts queued jobs back on the pool; jobs that were mid-run are marked
+interrupted instead of re-run (their script may already have done half its thing).
+With several server processes on one DB: mark_interrupted() once before they start, resume_queued()
+in each; a job runs in whichever process claims it first.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+DEFAULT_PATH = Path("./vibe_scripts/jobs.sqlite3")
+DEFAULT_WORKERS = 4
+DEFAULT_QUEUE_MAX = 1000
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+INTERRUPTED = 'interrupted'
+
+
+class QueueFull(Exception):
+    pass
+
+
+class JobStore:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                content TEXT NOT NULL,
+                options TEXT NOT NULL,
+                stage TEXT NOT NULL DEFAULT '',
+                attempt INTEGER NOT NULL DEFAULT 0,
+                results TEXT NOT NULL DEFAULT '[]',
+                result TEXT,
+                error TEXT,
+                created REAL NOT NULL,
+                started REAL,
+                finished REAL
+            )
+        """)
+        self.db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status, created)")
+        self.db.commit()
+
+    @classmethod
+    def from_env(cls):
+        return cls(os.environ.get('AUTOVIBE_JOB_DB') or DEFAULT_PATH)
+
+    def create(self, content: str, options: dict) -> str:
+        job_id = uuid.uuid4().hex
+        with self.lock:
+            self.db.execute(
+                "INSERT INTO jobs (id, status, content, options, created) VALUES (?, ?, ?, ?, ?)",
+                (job_id, QUEUED, content, json.dumps(options), time.time())
+            )
+            self.db.commit()
+        return job_id
+
+    def update(self, job_id: str, **fields):
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self.lock:
+            self.db.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+            self.db.commit()
+
+    def claim(self, job_id: str) -> bool:
+        """queued => running, unless someone else got there first."""
+        with self.lock:
+            claimed = self.db.execute(
+                "UPDATE jobs SET status = ?, started = ? WHERE id = ? AND status = ?",
+                (RUNNING, time.time(), job_id, QUEUED)
+            ).rowcount
+            self.db.commit()
+        return claimed == 1
+
+    def count(self, status: str) -> int:
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (status,)).fetchone()[0]
+
+    def get(self, job_id: str) -> dict | None:
+        with self.lock:
+            row = self.db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self.to_dict(row) if row else None
+
+    def recent(self, status: str = None, limit: int = 50) -> list[dict]:
+        sql, params = "SELECT * FROM jobs", []
+        if status:
+            sql += " WHERE status = ?"
+            params.append(status)
+        sql += " ORDER BY created DESC LIMIT ?"
+        params.append(limit)
+        with self.lock:
+            rows = self.db.execute(sql, params).fetchall()
+        return [self.to_dict(row, full=False) for row in rows]
+
+    def ids_with_status(self, status: str) -> list[str]:
+        with self.lock:
+            rows = self.db.execute("SELECT id FROM jobs WHERE status = ? ORDER BY created", (status,)).fetchall()
+        return [row['id'] for row in rows]
+
+    def to_dict(self, row, full=True) -> dict:
+        job = {
+            'id': row['id'],
+            'status': row['status'],
+            'stage': row['stage'],
+            'attempt': row['attempt'],
+            'created': row['created'],
+            'started': row['started'],
+            'finished': row['finished'],
+            'error': row['error'],
+        }
+        if full:
+            job['content'] = row['content']
+            job['options'] = json.loads(row['options'])
+            job['results'] = json.loads(row['results'])
+            job['result'] = json.loads(row['result']) if row['result'] else None
+        return job
+
+    def stats(self) -> dict:
+        with self.lock:
+            rows = self.db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+
+class JobRunner:
+    """Runs stored jobs on a bounded pool. run_job(job_id, content, options, progress) does the actual work
+    and returns a pydantic ToolReturn; progress(run) is meant to be passed as on_progress."""
+
+    def __init__(self, store: JobStore, run_job, workers: int = DEFAULT_WORKERS, queue_max: int = DEFAULT_QUEUE_MAX):
+        self.store = store
+        self.run_job = run_job
+        self.workers = workers
+        self.queue_max = queue_max
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='autovibe-job')
+
+    @classmethod
+    def from_env(cls, run_job):
+        workers = int(os.environ.get('AUTOVIBE_JOB_WORKERS') or DEFAULT_WORKERS)
+        queue_max = int(os.environ.get('AUTOVIBE_JOB_QUEUE_MAX') or DEFAULT_QUEUE_MAX)
+        return cls(JobStore.from_env(), run_job, workers, queue_max)
+
+    def submit(self, content: str, options: dict) -> str:
+        if self.store.count(QUEUED) >= self.queue_max:
+            raise QueueFull(f"{self.queue_max} jobs already waiting")
+        job_id = self.store.create(content, options)
+        self.pool.submit(self.run, job_id)
+        return job_id
+
+    def recover(self) -> dict:
+        """After a restart: re-queue what never started, give up on what was mid-run."""
+        interrupted = self.mark_interrupted()
+        return {'requeued': self.resume_queued(), 'interrupted': interrupted}
+
+    def mark_interrupted(self) -> int:
+        interrupted = self.store.ids_with_status(RUNNING)
+        for job_id in interrupted:
+            self.store.update(job_id, status=INTERRUPTED, error="server restarted while the job was running",
+                              finished=time.time())
+        return len(interrupted)
+
+    def resume_queued(self) -> int:
+        queued = self.store.ids_with_status(QUEUED)
+        for job_id in queued:
+            self.pool.submit(self.run, job_id)
+        return len(queued)
+
+    def progress(self, job_id: str):
+        def report(run):
+            self.store.update(
+                job_id,
+                stage=run.step,
+                attempt=run.retry,
+                results=json.dumps([r.model_dump(mode='json') for r in run.check_results]),
+            )
+        return report
+
+    def run(self, job_id: str):
+        if not self.store.claim(job_id):
+            return
+        job = self.store.get(job_id)
+        try:
+            result = self.run_job(job_id, job['content'], job['options'], self.progress(job_id))
+            self.store.update(
+                job_id,
+                status=DONE,  # ran to the end; whether the vibe worked is result.is_error
+                results=json.dumps([r.model_dump(mode='json') for r in result.results]),
+                result=result.model_dump_json(),
+                finished=time.time(),
+            )
+        except Exception as e:
+            self.store.update(job_id, status=FAILED, error=str(e), finished=time.time())
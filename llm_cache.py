@@ -0,0 +1,177 @@
+"""
+Opt-in, on-disk cache for llm_request responses.
+
+Key = sha256(model, response schema, system prompt hash, user prompt) => same question, same answer, no network.
+Stored in SQLite, LRU-evicted by total size, with TTL per stage (generate / validate / check).
+Code generations are put here by autovibe only once their script ran fine (AutoVibe.settle_generations).
+
+Enable with AUTOVIBE_LLM_CACHE=1 (default file) or AUTOVIBE_LLM_CACHE=/path/to/cache.sqlite3
+Size cap AUTOVIBE_LLM_CACHE_MB, TTLs AUTOVIBE_LLM_CACHE_TTL_GENERATE / _VALIDATE / _CHECK (seconds)
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_PATH = Path("./vibe_scripts/llm_cache.sqlite3")
+DEFAULT_MAX_MB = 64
+
+# seconds; generation/check get shorter life than validation verdicts
+DEFAULT_TTLS = {
+    'generate': 24 * 3600,
+    'validate': 7 * 24 * 3600,
+    'check': 3600,
+}
+
+# schema class name => stage
+SCHEMA_STAGES = {
+    'CodeGeneration': 'generate',
+    'CodeReGeneration': 'generate',
+    'ValidationResult': 'validate',
+    'AutoVibeCheck': 'check',
+}
+
+# system prompts carry a clock line (system_info); mask it or generation would never hit
+_volatile_lines = re.compile(r'^.*Current Time:.*$', re.MULTILINE)
+
+
+def stage_of(schema) -> str:
+    return SCHEMA_STAGES.get(schema.__name__, 'other')
+
+
+class LLMCache:
+    def __init__(self, path=DEFAULT_PATH, max_bytes=DEFAULT_MAX_MB * 1024 * 1024, ttls=None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                stage TEXT NOT NULL,
+                model TEXT NOT NULL,
+                schema TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self.db.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses(last_used)")
+        self.db.commit()
+
+        # per stage: {'hits': n, 'misses': n}
+        self.counters: dict[str, dict[str, int]] = {}
+
+    @classmethod
+    def from_env(cls):
+        """LLMCache if AUTOVIBE_LLM_CACHE is set, else None (cache is opt-in)."""
+        setting = os.environ.get('AUTOVIBE_LLM_CACHE', '').strip()
+        if not setting or setting.lower() in ('0', 'false', 'no', 'off'):
+            return None
+        path = DEFAULT_PATH if setting.lower() in ('1', 'true', 'yes', 'on') else Path(setting)
+        max_mb = float(os.environ.get('AUTOVIBE_LLM_CACHE_MB', DEFAULT_MAX_MB))
+        # AUTOVIBE_LLM_CACHE_TTL_VALIDATE=600 etc, 0 turns a stage off
+        ttls = {
+            stage: float(os.environ[f'AUTOVIBE_LLM_CACHE_TTL_{stage.upper()}'])
+            for stage in DEFAULT_TTLS
+            if os.environ.get(f'AUTOVIBE_LLM_CACHE_TTL_{stage.upper()}')
+        }
+        return cls(path, max_bytes=int(max_mb * 1024 * 1024), ttls=ttls)
+
+    def key(self, schema, system: str, user: str, model: str) -> str:
+        system_hash = hashlib.sha256(_volatile_lines.sub('', system).encode('utf-8')).hexdigest()
+        material = "\x00".join([model, schema.__name__, system_hash, user])
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def count(self, stage: str, outcome: str):
+        stage_counters = self.counters.setdefault(stage, {'hits': 0, 'misses': 0})
+        stage_counters[outcome] += 1
+
+    def get(self, schema, system: str, user: str, model: str):
+        """Parsed schema instance or None on miss/expired."""
+        stage = stage_of(schema)
+        key = self.key(schema, system, user, model)
+        now = time.time()
+        with self.lock:
+            row = self.db.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row and now - row[1] < self.ttls.get(stage, 0):
+                try:
+                    response = schema.model_validate_json(row[0])
+                except ValueError:
+                    response = None  # schema changed under us, treat as miss
+                if response is not None:
+                    self.db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+                    self.db.commit()
+                    self.count(stage, 'hits')
+                    return response
+            elif row:
+                self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.db.commit()
+            self.count(stage, 'misses')
+        return None
+
+    def put(self, schema, system: str, user: str, model: str, response):
+        stage = stage_of(schema)
+        if self.ttls.get(stage, 0) <= 0:
+            return
+        key = self.key(schema, system, user, model)
+        payload = response.model_dump_json()
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, stage, model, schema.__name__, payload, len(payload), now, now)
+            )
+            self.evict()
+            self.db.commit()
+
+    def delete(self, schema, system: str, user: str, model: str):
+        """Forget one answer (e.g. a generated script that turned out broken)."""
+        key = self.key(schema, system, user, model)
+        with self.lock:
+            self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.db.commit()
+
+    def evict(self):
+        """Drop least recently used rows until total size fits max_bytes. Call with lock held."""
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        while total > self.max_bytes:
+            rows = self.db.execute("SELECT key, size FROM responses ORDER BY last_used LIMIT 64").fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                total -= size
+                if total <= self.max_bytes:
+                    break
+
+    def clear(self):
+        with self.lock:
+            self.db.execute("DELETE FROM responses")
+            self.db.commit()
+
+    def stats(self) -> dict:
+        with self.lock:
+            entries, size = self.db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+            counters = {stage: dict(c) for stage, c in self.counters.items()}
+        hits = sum(c['hits'] for c in counters.values())
+        misses = sum(c['misses'] for c in counters.values())
+        return {
+            'path': str(self.path),
+            'entries': entries,
+            'bytes': size,
+            'max_bytes': self.max_bytes,
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / (hits + misses) if hits + misses else 0.0,
+            'stages': counters,
+        }
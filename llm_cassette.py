@@ -0,0 +1,175 @@
+"""
+Record / replay of llm_request calls, to benchmark and profile everything around the LLM offline.
+
+    AUTOVIBE_CASSETTE=run.jsonl AUTOVIBE_CASSETTE_MODE=record python serv_rest.py    # real calls, written down
+    AUTOVIBE_CASSETTE=run.jsonl AUTOVIBE_CASSETTE_MODE=replay ...                    # no network at all
+    AUTOVIBE_CASSETTE_LATENCY=recorded (default) | zero                              # replay pacing
+
+Cassette = JSON lines (gzip when the name ends in .gz). System prompts are stored once and referenced by hash,
+each call line has schema, model, user prompt, parsed response, token usage and the latency seen while recording.
+
+Replay matches on (model, schema, user prompt); when that's not there (console output differs between runs,
+repair prompts carry it) it falls back to the next unused call of the same schema, in recorded order.
+Nothing left => CassetteMiss. Cache hits are recorded too (with their ~0 latency), so replays follow the same path.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import deque
+from pathlib import Path
+from types import SimpleNamespace
+
+RECORD = 'record'
+REPLAY = 'replay'
+
+# system prompts carry a clock line (system_info), not worth a new system entry every minute
+_volatile_lines = re.compile(r'^.*Current Time:.*$', re.MULTILINE)
+
+
+class CassetteMiss(LookupError):
+    pass
+
+
+def prompt_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
+def open_cassette(path: Path, mode: str):
+    if path.suffix == '.gz':
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+class LLMCassette:
+    def __init__(self, path, mode: str = REPLAY, latency: str = 'recorded'):
+        self.path = Path(path)
+        self.mode = mode
+        self.replay_latency = latency != 'zero'
+        self.lock = threading.Lock()
+        self.systems: dict[str, str] = {}
+        # replay: (model, schema, user) => calls, schema => calls (fallback), in recorded order
+        self.by_prompt: dict[tuple, deque] = {}
+        self.by_schema: dict[str, deque] = {}
+        self.used: set[int] = set()
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+
+        if mode == RECORD:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.file = open_cassette(self.path, 'a')
+        else:
+            self.file = None
+            self.load()
+
+    @classmethod
+    def from_env(cls):
+        """LLMCassette if AUTOVIBE_CASSETTE is set, else None."""
+        path = os.environ.get('AUTOVIBE_CASSETTE', '').strip()
+        if not path:
+            return None
+        mode = (os.environ.get('AUTOVIBE_CASSETTE_MODE') or REPLAY).strip().lower()
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"AUTOVIBE_CASSETTE_MODE must be {RECORD} or {REPLAY}, not {mode!r}")
+        latency = (os.environ.get('AUTOVIBE_CASSETTE_LATENCY') or 'recorded').strip().lower()
+        return cls(path, mode, latency)
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == REPLAY
+
+    def load(self):
+        with open_cassette(self.path, 'r') as f:
+            for index, line in enumerate(f):
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if entry['t'] == 'system':
+                    self.systems[entry['id']] = entry['text']
+                    continue
+                entry['index'] = index
+                self.by_prompt.setdefault((entry['model'], entry['schema'], entry['user']), deque()).append(entry)
+                self.by_schema.setdefault(entry['schema'], deque()).append(entry)
+
+    def rewind(self):
+        """Replay from the start again (next benchmark round)."""
+        with self.lock:
+            self.by_prompt.clear()
+            self.by_schema.clear()
+            self.used.clear()
+            self.load()
+
+    def requests(self) -> list[str]:
+        """The user requests that started runs: first generation prompts (repairs wrap theirs in <user_request>)."""
+        return [entry['user'] for entry in self.by_schema.get('CodeGeneration', ()) if '<user_request>' not in entry['user']]
+
+    def write(self, entry: dict):
+        self.file.write(json.dumps(entry, separators=(',', ':')) + '\n')
+
+    def record(self, schema, system: str, user: str, model: str, response, usage=None, latency_s: float = 0.0):
+        system_id = prompt_hash(_volatile_lines.sub('', system))
+        details = getattr(usage, 'prompt_tokens_details', None)
+        entry = {
+            't': 'call',
+            'schema': schema.__name__,
+            'model': model,
+            'system': system_id,
+            'user': user,
+            'response': response.model_dump(mode='json') if response is not None else None,
+            'usage': {
+                'prompt_tokens': getattr(usage, 'prompt_tokens', None) or 0,
+                'completion_tokens': getattr(usage, 'completion_tokens', None) or 0,
+                'cached_tokens': getattr(details, 'cached_tokens', None) or 0,
+            },
+            'latency_s': round(latency_s, 4),
+        }
+        with self.lock:
+            if system_id not in self.systems:
+                self.systems[system_id] = system
+                self.write({'t': 'system', 'id': system_id, 'text': system})
+            self.write(entry)
+            self.file.flush()
+            self.recorded += 1
+
+    def take(self, queue: deque) -> dict | None:
+        while queue:
+            entry = queue.popleft()
+            if entry['index'] not in self.used:
+                self.used.add(entry['index'])
+                return entry
+        return None
+
+    def play(self, schema, system: str, user: str, model: str) -> tuple[object, SimpleNamespace, float]:
+        """=> (parsed response or None, usage like completion.usage, seconds to wait)."""
+        with self.lock:
+            entry = self.take(self.by_prompt.get((model, schema.__name__, user), deque()))
+            if entry is None:
+                entry = self.take(self.by_schema.get(schema.__name__, deque()))
+            if entry is None:
+                self.misses += 1
+                raise CassetteMiss(f"{self.path}: no recorded {schema.__name__} call left for this prompt")
+            self.replayed += 1
+
+        usage = entry['usage']
+        usage = SimpleNamespace(
+            prompt_tokens=usage['prompt_tokens'],
+            completion_tokens=usage['completion_tokens'],
+            prompt_tokens_details=SimpleNamespace(cached_tokens=usage['cached_tokens']),
+        )
+        response = schema.model_validate(entry['response']) if entry['response'] is not None else None
+        return response, usage, entry['latency_s'] if self.replay_latency else 0.0
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                'path': str(self.path),
+                'mode': self.mode,
+                'recorded': self.recorded,
+                'replayed': self.replayed,
+                'misses': self.misses,
+                'left': sum(1 for q in self.by_schema.values() for e in q if e['index'] not in self.used),
+            }
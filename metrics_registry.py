@@ -0,0 +1,206 @@
+"""
+Prometheus text-format metrics, in process, no client library needed.
+
+serv_rest serves them at GET /metrics; serv_mcp on http://127.0.0.1:$AUTOVIBE_METRICS_PORT/metrics when set.
+Numbers are per process (gunicorn workers each have their own, scrape them with a per-worker label
+or run one worker per port if that matters).
+
+Hot path cost is a lock + dict lookup per observation; everything expensive (cache stats, limiter
+usage) is read through callbacks at scrape time only.
+"""
+
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# seconds; vibes go from sub-second cache hits to multi-minute scripts
+SECONDS_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+ATTEMPT_BUCKETS = (1, 2, 3, 4, 5, 8)
+
+
+def escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def label_text(names: tuple, values: tuple, extra: str = '') -> str:
+    pairs = [f'{name}="{escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def number(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.lock = threading.Lock()
+        self.values: dict[tuple, float] = {}
+
+    def inc(self, *label_values, amount: float = 1):
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def samples(self):
+        with self.lock:
+            values = dict(self.values)
+        for label_values, value in sorted(values.items()):
+            yield f"{self.name}{label_text(self.labels, label_values)} {number(value)}"
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = SECONDS_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self.lock = threading.Lock()
+        # label values => [per bucket counts (+ overflow), sum, count]
+        self.values: dict[tuple, list] = {}
+
+    def observe(self, value: float, *label_values):
+        slot = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.values.get(label_values)
+            if series is None:
+                series = self.values[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][slot] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        with self.lock:
+            values = {key: (list(counts), total, count) for key, (counts, total, count) in self.values.items()}
+        for label_values, (counts, total, count) in sorted(values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = f'le="{number(float(bound))}"'
+                yield f"{self.name}_bucket{label_text(self.labels, label_values, le)} {cumulative}"
+            yield f"{self.name}_sum{label_text(self.labels, label_values)} {number(total)}"
+            yield f"{self.name}_count{label_text(self.labels, label_values)} {count}"
+
+
+class Callback:
+    """Read at scrape time: fn() => {label values tuple: value} (or a plain number when there are no labels)."""
+
+    def __init__(self, name: str, help: str, fn, labels: tuple = (), kind: str = 'gauge'):
+        self.name = name
+        self.help = help
+        self.fn = fn
+        self.labels = tuple(labels)
+        self.kind = kind
+
+    def samples(self):
+        try:
+            values = self.fn()
+        except Exception:
+            return  # a broken source shouldn't take the whole scrape down
+        if not isinstance(values, dict):
+            values = {(): values}
+        for label_values, value in sorted(values.items()):
+            yield f"{self.name}{label_text(self.labels, label_values)} {number(value)}"
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics: dict[str, object] = {}
+
+    def add(self, metric):
+        """Same name twice => the first one wins (modules imported by both servers register once)."""
+        with self.lock:
+            return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help: str, labels: tuple = ()) -> Counter:
+        return self.add(Counter(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: tuple = (), buckets: tuple = SECONDS_BUCKETS) -> Histogram:
+        return self.add(Histogram(name, help, labels, buckets))
+
+    def callback(self, name: str, help: str, fn, labels: tuple = (), kind: str = 'gauge') -> Callback:
+        with self.lock:
+            metric = self.metrics[name] = Callback(name, help, fn, labels, kind)
+        return metric
+
+    def render(self) -> str:
+        with self.lock:
+            metrics = list(self.metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+vibe_requests = registry.counter('autovibe_requests_total', "Finished vibe runs by outcome", ('outcome',))
+vibe_seconds = registry.histogram('autovibe_request_seconds', "Wall time of a whole vibe run", ('outcome',))
+vibe_attempts = registry.histogram('autovibe_attempts', "Generate/repair attempts per vibe run", buckets=ATTEMPT_BUCKETS)
+stage_seconds = registry.histogram('autovibe_stage_seconds', "Wall time per stage", ('stage',))
+llm_seconds = registry.histogram('autovibe_llm_seconds', "LLM call latency incl. waiting for a slot", ('model', 'schema'))
+llm_tokens = registry.counter('autovibe_llm_tokens_total', "LLM tokens by model and kind", ('model', 'kind'))
+llm_errors = registry.counter('autovibe_llm_errors_total', "LLM calls that raised", ('model', 'error'))
+pip_seconds = registry.histogram('autovibe_pip_install_seconds', "pip install duration", ('outcome',))
+exec_seconds = registry.histogram('autovibe_exec_seconds', "Generated script wall time", ('outcome',))
+exec_timeouts = registry.counter('autovibe_exec_timeouts_total', "Generated scripts killed by exec_timeout")
+inferred_requirements = registry.counter('autovibe_inferred_requirements_total', "Requirements added from script imports / dropped as stdlib / skipped as unknown", ('kind',))
+fast_repairs = registry.counter('autovibe_fast_repairs_total', "Missing-module failures handled by pip install + re-run", ('outcome',))
+
+
+def observe_run(metrics):
+    """One finished run (run_metrics.RunMetrics) => request, stage, LLM and execution series."""
+    outcome = metrics.outcome or 'unknown'
+    vibe_requests.inc(outcome)
+    vibe_seconds.observe(metrics.total_s, outcome)
+    vibe_attempts.observe(metrics.attempt + 1)
+    for timing in metrics.stages:
+        stage_seconds.observe(timing.elapsed_s, timing.stage)
+    for call in metrics.llm_calls:
+        llm_seconds.observe(call.elapsed_s, call.model, call.schema_name)
+        for kind in ('prompt', 'completion', 'cached'):
+            tokens = getattr(call, f'{kind}_tokens')
+            if tokens:
+                llm_tokens.inc(call.model, kind, amount=tokens)
+    for usage in metrics.executions:
+        if usage.timed_out:
+            exec_timeouts.inc()
+        exec_seconds.observe(usage.elapsed_s, 'timeout' if usage.timed_out else 'ok' if usage.returncode == 0 else 'failed')
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        data = registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(port: int, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+    """/metrics on its own little server thread (for processes without a web app, like serv_mcp)."""
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='autovibe-metrics', daemon=True).start()
+    return server
@@ -0,0 +1,581 @@
+"""
+Local static pre-validator: look at the AST of a generated script and decide the obvious cases
+without a validation LLM round trip.
+
+    clearly broken   => syntax error, send straight to repair
+    clearly DENY     => shutdown/reboot/mkfs, rm -rf /, rmtree('/') ...
+    clearly ALLOW    => read-only: known imports, read-only commands, and every call a known read-only one
+                        (READ_ONLY_CALLS / READ_ONLY_MODULES, safe builtins, the script's own functions, READ_ONLY_METHODS)
+    everything else  => None, ask the LLM validator
+"""
+
+import ast
+import builtins
+import shlex
+import sys
+from dataclasses import dataclass, field
+
+# commands that only read/report. Some tools are read-only only for some subcommands => READ_ONLY_SUBCOMMANDS
+# (not here: sort -o / uniq in out write files, arp -d / -s edit the table)
+READ_ONLY_COMMANDS = {
+    'systeminfo', 'uptime', 'df', 'du', 'ps', 'tasklist', 'netstat', 'ss', 'ipconfig', 'whoami', 'uname', 'lsof',
+    'free', 'nvidia-smi', 'findstr', 'grep', 'where', 'which', 'lsusb', 'lspci', 'lsblk', 'v4l2-ctl',
+    'system_profiler', 'sw_vers', 'ver', 'vm_stat', 'top', 'vmstat', 'iostat', 'who', 'w', 'id', 'groups', 'cal',
+    'printenv', 'cat', 'head', 'tail', 'wc', 'ls', 'dir', 'stat', 'file', 'ntpq', 'getconf', 'nproc', 'lscpu',
+    'dmidecode', 'chcp', 'echo', 'type', 'cut', 'fc-list', 'locale',
+}
+# subcommand = first argument when it is listed (options like --version), else the first non-option one.
+# '' => running the tool with no args at all is fine too
+READ_ONLY_SUBCOMMANDS = {
+    'hostname': {'', '-i', '-I', '-f', '-s', '-d', '--fqdn'},
+    'timedatectl': {'', 'status', 'show', 'timesync-status', 'show-timesync', 'list-timezones'},
+    'hostnamectl': {'', 'status'},
+    'chronyc': {'tracking', 'sources', 'sourcestats'},
+    'ifconfig': {'', '-a'},
+    'w32tm': {'/query', '/monitor', '/tz', '/stripchart'},
+    'choco': {'list', 'search', 'info', 'outdated', '--version', '-v'},
+    'pip': {'list', 'show', 'freeze', '--version'},
+    'git': {'status', 'log', 'diff', 'branch', 'remote', 'rev-parse', 'show', '--version'},
+    'systemctl': {'status', 'is-active', 'is-enabled', 'list-units', 'list-unit-files', 'show'},
+    'sc': {'query', 'queryex', 'qc'},
+    'docker': {'ps', 'images', 'version', 'info', 'inspect', '--version'},
+    'php': {'-v', '-i', '-m', '--version', '--ini'},
+    'python': {'--version', '-V'},
+    'python3': {'--version', '-V'},
+    'node': {'--version', '-v'},
+    'java': {'-version', '--version'},
+    'wmic': {'get', 'list'},
+    'reg': {'query'},
+    'sysctl': {'-a', '-n'},
+    'arp': {'', '-a', '-n'},
+}
+WMIC_VERBS = {'get', 'list', 'call', 'set', 'delete', 'create', 'assoc'}
+# subcommands that change things as soon as they get more than these arguments (git branch -D x, git remote remove x)
+READ_ONLY_SUBCOMMAND_ARGS = {
+    ('git', 'branch'): {'-a', '-r', '-v', '-vv', '--all', '--remotes', '--list', '--show-current'},
+    ('git', 'remote'): {'-v', '--verbose'},
+}
+# flat out no: only reachable when user explicitly asks, and then the LLM will say CHECK/ALLOW on a retry anyway
+DENY_COMMANDS = {'shutdown', 'reboot', 'halt', 'poweroff', 'mkfs', 'format', 'diskpart', 'logoff', 'init'}
+KILL_COMMANDS = {'kill', 'pkill', 'killall', 'taskkill', 'skill'}
+NETWORK_COMMANDS = {'curl', 'wget', 'ping', 'nslookup', 'dig', 'ssh', 'scp', 'sftp', 'ftp', 'telnet', 'nc',
+                    'ncat', 'traceroute', 'tracert', 'rsync', 'invoke-webrequest', 'iwr', 'sntp'}
+# normalized by rootish(): lowercase, forward slashes, no trailing slash
+ROOTISH_PATHS = {'/', '/*', '~', '~/*', '/home', '/etc', '/usr', '/var', '/boot', 'c:', 'c:/*', 'c:/windows', '%systemroot%'}
+
+NETWORK_MODULES = {'requests', 'urllib.request', 'urllib3', 'http.client', 'httpx', 'aiohttp', 'ftplib', 'smtplib',
+                   'poplib', 'imaplib', 'paramiko', 'telnetlib', 'websocket', 'websockets', 'socketserver',
+                   'xmlrpc.client', 'http.server', 'pycurl', 'speedtest'}
+# stdlib modules that are a capability in themselves
+RISKY_STDLIB = {'ctypes', 'winreg', '_winreg', 'webbrowser', 'pickle', 'marshal', 'shelve', 'pty', 'msvcrt',
+                'winsound', 'code', 'runpy', 'importlib'}
+SAFE_THIRD_PARTY = {'psutil', 'distro', 'cpuinfo', 'GPUtil', 'tabulate', 'rich', 'colorama', 'humanize',
+                    'dateutil', 'pytz', 'packaging', 'wmi'}
+# network use is flagged separately by add_import, urllib.parse & co stay fine
+SAFE_MODULES = (set(getattr(sys, 'stdlib_module_names', ())) - RISKY_STDLIB - NETWORK_MODULES) | SAFE_THIRD_PARTY
+
+SUBPROCESS_CALLS = {
+    'subprocess.run', 'subprocess.call', 'subprocess.check_call', 'subprocess.check_output', 'subprocess.Popen',
+    'subprocess.getoutput', 'subprocess.getstatusoutput', 'os.system', 'os.popen', 'os.startfile',
+    'asyncio.create_subprocess_exec', 'asyncio.create_subprocess_shell',
+}
+# os.exec* / os.spawn* / os.posix_spawn*: name => (index of the argv argument, argv spread over the rest of the args)
+EXEC_CALLS = {
+    **{f'os.exec{v}': (1, False) for v in ('v', 've', 'vp', 'vpe')},
+    **{f'os.exec{v}': (1, True) for v in ('l', 'le', 'lp', 'lpe')},
+    **{f'os.spawn{v}': (2, False) for v in ('v', 've', 'vp', 'vpe')},
+    **{f'os.spawn{v}': (2, True) for v in ('l', 'le', 'lp', 'lpe')},
+    'os.posix_spawn': (1, False), 'os.posix_spawnp': (1, False),
+    'asyncio.create_subprocess_exec': (0, True),
+}
+DELETE_CALLS = {'os.remove', 'os.unlink', 'os.rmdir', 'os.removedirs', 'shutil.rmtree', 'send2trash.send2trash',
+                'os.removexattr'}
+WRITE_CALLS = {'os.rename', 'os.replace', 'os.makedirs', 'os.mkdir', 'os.chmod', 'os.chown', 'os.symlink', 'os.link',
+               'os.truncate', 'shutil.copy', 'shutil.copy2', 'shutil.copyfile', 'shutil.copytree', 'shutil.move',
+               'shutil.chown', 'sqlite3.connect', 'os.putenv', 'os.open', 'os.write', 'os.pwrite', 'os.writev',
+               'os.ftruncate', 'os.fdopen', 'os.mkfifo', 'os.mknod', 'os.utime', 'os.lchmod', 'os.lchown',
+               'os.fchmod', 'os.fchown', 'os.setxattr', 'shutil.make_archive', 'shutil.unpack_archive',
+               'shutil.copymode', 'shutil.copystat', 'dbm.open'}
+KILL_CALLS = {'os.kill', 'os.killpg', 'os.abort', 'signal.pthread_kill'}
+NETWORK_CALLS = {'asyncio.open_connection', 'asyncio.open_unix_connection', 'asyncio.start_server',
+                 'asyncio.start_unix_server', 'socket.create_server', 'socket.socketpair', 'socket.fromfd'}
+FILE_OPEN_CALLS = {'open', 'io.open', 'codecs.open', 'gzip.open', 'bz2.open', 'lzma.open'}
+# opened for reading unless the mode (2nd argument or mode=) says otherwise
+ARCHIVE_OPEN_CALLS = {'tarfile.open', 'tarfile.TarFile', 'zipfile.ZipFile'}
+DYNAMIC_CALLS = {'eval', 'exec', 'compile', '__import__', 'importlib.import_module', 'globals', 'locals', 'vars',
+                 'getattr', 'setattr', 'delattr', 'breakpoint'}
+# method names that mutate no matter what object they hang off (Path, DataFrame, psutil.Process...)
+WRITE_METHODS = {'write_text', 'write_bytes', 'touch', 'mkdir', 'rename', 'symlink_to', 'hardlink_to', 'chmod',
+                 'to_csv', 'to_excel', 'to_json', 'to_parquet', 'savefig', 'extractall', 'writestr', 'write',
+                 'writelines', 'dump', 'save'}
+DELETE_METHODS = {'unlink', 'rmdir'}
+KILL_METHODS = {'kill', 'terminate', 'send_signal', 'suspend', 'Terminate'}
+SOCKET_METHODS = {'connect', 'connect_ex', 'create_connection', 'sendto', 'bind'}
+# event loop / client methods that open connections (socket ones too, when it isn't a socket we can check)
+NETWORK_METHODS = {'open_connection', 'create_connection', 'create_datagram_endpoint', 'create_server', 'start_server',
+                   'sock_connect', 'urlopen', 'urlretrieve'}
+LOCAL_HOSTS = {'127.0.0.1', 'localhost', '::1', ''}
+
+# ALLOW needs every call to be one of these (or a builtin below, the script's own function, a method below);
+# anything else from an import goes to the LLM
+READ_ONLY_CALLS = {
+    'os.getcwd', 'os.listdir', 'os.scandir', 'os.walk', 'os.stat', 'os.lstat', 'os.getenv', 'os.cpu_count',
+    'os.getpid', 'os.getppid', 'os.getlogin', 'os.uname', 'os.getloadavg', 'os.access', 'os.get_terminal_size',
+    'os.fspath', 'os.fsencode', 'os.fsdecode', 'os.statvfs', 'os.times', 'os.getuid', 'os.geteuid', 'os.getgid',
+    'os.strerror', 'os.get_exec_path',
+    'shutil.disk_usage', 'shutil.which', 'shutil.get_terminal_size',
+    'socket.socket', 'socket.gethostname', 'socket.gethostbyname', 'socket.gethostbyname_ex', 'socket.getfqdn',
+    'socket.gethostbyaddr', 'socket.inet_aton', 'socket.inet_ntoa', 'socket.inet_pton', 'socket.inet_ntop',
+    'socket.htons', 'socket.ntohs', 'socket.getservbyname', 'socket.getservbyport', 'socket.setdefaulttimeout',
+    'pathlib.Path', 'pathlib.PurePath', 'pathlib.PosixPath', 'pathlib.WindowsPath', 'pathlib.PurePosixPath',
+    'pathlib.PureWindowsPath', 'pathlib.Path.home', 'pathlib.Path.cwd',
+    'asyncio.run', 'asyncio.gather', 'asyncio.sleep', 'asyncio.wait', 'asyncio.wait_for', 'asyncio.as_completed',
+    'asyncio.create_task', 'asyncio.get_event_loop', 'asyncio.get_running_loop', 'asyncio.Queue', 'asyncio.Event',
+    'asyncio.Lock', 'asyncio.Semaphore', 'asyncio.timeout',
+    'logging.getLogger', 'logging.debug', 'logging.info', 'logging.warning', 'logging.error', 'logging.exception',
+    'logging.critical',
+    'getpass.getuser', 'tempfile.gettempdir', 'signal.signal', 'signal.alarm', 'atexit.register',
+    'io.StringIO', 'io.BytesIO', 'csv.reader', 'csv.DictReader', 'csv.writer', 'csv.DictWriter',
+}
+# module (or class) + '.' + one more name => read-only: 'os.path.join', 'datetime.datetime.now'
+READ_ONLY_MODULES = (
+    'os.path.', 'os.environ.', 'sys.', 'sys.stdout.', 'sys.stderr.', 'platform.', 'math.', 're.', 'json.', 'time.',
+    'datetime.', 'datetime.datetime.', 'datetime.date.', 'datetime.timedelta.', 'datetime.timezone.', 'calendar.',
+    'zoneinfo.', 'statistics.', 'string.', 'textwrap.', 'collections.', 'itertools.', 'functools.', 'operator.',
+    'fnmatch.', 'glob.', 'shlex.', 'urllib.parse.', 'ipaddress.', 'uuid.', 'hashlib.', 'base64.', 'binascii.',
+    'struct.', 'decimal.', 'fractions.', 'random.', 'typing.', 'dataclasses.', 'enum.', 'traceback.', 'pprint.',
+    'copy.', 'heapq.', 'bisect.', 'unicodedata.', 'locale.', 'contextlib.', 'argparse.', 'html.', 'difflib.',
+    'threading.', 'queue.', 'concurrent.futures.', 'xml.etree.ElementTree.', 'getpass.',
+    'psutil.', 'distro.', 'cpuinfo.', 'GPUtil.', 'tabulate.', 'humanize.', 'dateutil.parser.', 'pytz.',
+    'packaging.version.', 'colorama.', 'rich.', 'rich.console.', 'rich.table.', 'wmi.',
+)
+SAFE_BUILTINS = {
+    'print', 'len', 'range', 'enumerate', 'zip', 'sorted', 'reversed', 'min', 'max', 'sum', 'abs', 'round', 'any',
+    'all', 'map', 'filter', 'str', 'int', 'float', 'bool', 'bytes', 'bytearray', 'list', 'dict', 'set', 'frozenset',
+    'tuple', 'isinstance', 'issubclass', 'hasattr', 'repr', 'format', 'chr', 'ord', 'hex', 'oct', 'bin', 'divmod',
+    'pow', 'hash', 'id', 'iter', 'next', 'type', 'super', 'object', 'property', 'staticmethod', 'classmethod',
+    'callable', 'slice', 'complex', 'ascii', 'memoryview', 'open',
+} | {name for name, value in vars(builtins).items() if isinstance(value, type) and issubclass(value, BaseException)}
+# methods called on values we can't type (str / bytes / list / dict results, re matches, datetimes, file objects
+# opened for reading, subprocess results, psutil getters...): read-only whatever they hang off. Any other method => LLM
+READ_ONLY_METHODS = {
+    'strip', 'lstrip', 'rstrip', 'split', 'rsplit', 'splitlines', 'join', 'format', 'lower', 'upper', 'title',
+    'capitalize', 'casefold', 'startswith', 'endswith', 'find', 'rfind', 'index', 'rindex', 'count', 'partition',
+    'rpartition', 'ljust', 'rjust', 'center', 'zfill', 'encode', 'decode', 'isdigit', 'isnumeric', 'isalpha',
+    'isalnum', 'isspace', 'isupper', 'islower', 'hex', 'removeprefix', 'removesuffix', 'expandtabs', 'translate',
+    'maketrans', 'format_map',
+    'get', 'items', 'keys', 'values', 'copy', 'append', 'extend', 'insert', 'sort', 'reverse', 'setdefault', 'update',
+    'pop', 'add', 'union', 'intersection', 'difference', 'issubset', 'issuperset', 'most_common', 'popleft',
+    'appendleft', 'put', 'put_nowait', 'get_nowait', 'task_done', 'empty', 'qsize',
+    'group', 'groups', 'groupdict', 'start', 'end', 'span', 'match', 'fullmatch', 'search', 'findall', 'finditer',
+    'sub', 'subn',
+    'strftime', 'isoformat', 'timestamp', 'total_seconds', 'date', 'time', 'weekday', 'isoweekday', 'astimezone',
+    'utcoffset', 'tzname', 'fromtimestamp', 'now', 'today',
+    'read', 'readline', 'readlines', 'read_text', 'read_bytes', 'seek', 'tell', 'close', 'flush', 'fileno',
+    'getvalue', 'exists', 'is_file', 'is_dir', 'is_symlink', 'iterdir', 'glob', 'rglob', 'resolve', 'absolute',
+    'expanduser', 'joinpath', 'with_name', 'with_suffix', 'relative_to', 'is_absolute', 'as_posix', 'samefile',
+    'stat', 'lstat', 'is_mount', 'owner', 'group', 'is_relative_to',
+    'communicate', 'wait', 'poll', 'writerow', 'writerows', 'writeheader',
+    'settimeout', 'setsockopt', 'recv', 'getsockname', 'getpeername',
+    'submit', 'result', 'done', 'join', 'is_alive', 'acquire', 'release', 'set', 'is_set',
+    'cpu_percent', 'cpu_times', 'memory_info', 'memory_percent', 'memory_full_info', 'name', 'cmdline', 'status',
+    'username', 'create_time', 'exe', 'cwd', 'ppid', 'parent', 'children', 'num_threads', 'threads', 'open_files',
+    'connections', 'net_connections', 'is_running', 'as_dict', 'oneshot', 'io_counters', 'num_fds',
+    'info', 'debug', 'warning', 'error', 'exception', 'critical', 'setLevel', 'addHandler', 'print', 'add_row',
+    'add_column', 'add_argument', 'parse_args', 'parse_known_args',
+}
+# modules handed around as values (o = os; o.system(...)) would dodge every check above
+RISKY_MODULE_NAMES = {'os', 'sys', 'subprocess', 'shutil', 'socket', 'builtins', 'importlib', 'ctypes', 'signal',
+                      'pty', 'asyncio', 'io', 'pathlib', 'tempfile', 'tarfile', 'zipfile', 'sqlite3', 'multiprocessing'}
+# dunders that are just data
+PLAIN_DUNDERS = {'__name__', '__doc__', '__file__', '__version__', '__init__', '__enter__', '__exit__', '__str__',
+                 '__repr__', '__main__'}
+
+
+@dataclass
+class StaticReport:
+    syntax_error: str | None = None
+    imports: set = field(default_factory=set)
+    commands: list = field(default_factory=list)       # resolved argv lists
+    unresolved: list = field(default_factory=list)     # command calls we could not resolve to literals
+    writes: list = field(default_factory=list)
+    deletes: list = field(default_factory=list)
+    network: list = field(default_factory=list)
+    kills: list = field(default_factory=list)
+    dynamic: list = field(default_factory=list)
+    unvetted: list = field(default_factory=list)       # calls not known to be read-only
+    deny: list = field(default_factory=list)
+    unknown_imports: set = field(default_factory=set)
+    non_read_only: list = field(default_factory=list)  # commands not on the read-only lists
+
+    def decision(self) -> tuple[str, bool, str] | None:
+        """(risk, correct, reasoning) when the case is clear, None => needs the LLM."""
+        if self.syntax_error:
+            return ('CHECK', False, f"Local check: code does not compile: {self.syntax_error}")
+        if self.deny:
+            return ('DENY', True, "Local check: destructive operation: " + "; ".join(self.deny[:5]))
+
+        doubts = (self.writes, self.deletes, self.network, self.kills, self.dynamic, self.unvetted, self.unresolved,
+                  self.non_read_only, self.unknown_imports)
+        if any(doubts):
+            return None
+
+        commands = ", ".join(sorted({argv[0] for argv in self.commands})) or "none"
+        return ('ALLOW', True, f"Local check: read-only script (imports: {', '.join(sorted(self.imports)) or 'none'}; commands: {commands})")
+
+    def summary(self) -> str:
+        parts = []
+        for name in ('writes', 'deletes', 'network', 'kills', 'dynamic', 'unvetted', 'unresolved', 'non_read_only', 'deny'):
+            values = getattr(self, name)
+            if values:
+                parts.append(f"{name}: {', '.join(map(str, values[:5]))}")
+        if self.unknown_imports:
+            parts.append(f"unknown imports: {', '.join(sorted(self.unknown_imports))}")
+        return "; ".join(parts) or "clean"
+
+
+def rootish(path: str) -> bool:
+    path = path.strip().lower().replace('\\', '/')
+    return (path.rstrip('/') or '/') in ROOTISH_PATHS
+
+
+def dotted_name(node) -> str:
+    """'os.path.join' for Attribute chains, '' when it isn't a plain name chain."""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if isinstance(node, ast.Name):
+        parts.append(node.id)
+        return ".".join(reversed(parts))
+    return ''
+
+
+def literal(node):
+    """str / list[str] for literal nodes, None otherwise (f-strings with holes etc)."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, (ast.List, ast.Tuple)):
+        items = [literal(elt) for elt in node.elts]
+        if all(isinstance(item, str) for item in items):
+            return items
+    return None
+
+
+def split_shell(command: str) -> tuple[list[list[str]], list[str]]:
+    """'a x && b | c > f' => ([['a','x'], ['b'], ['c']], ['f'])  - segments + redirect targets."""
+    for op in ('&&', '||', '|', ';', '&'):
+        command = command.replace(op, '\n')
+    segments, redirects = [], []
+    for chunk in command.split('\n'):
+        try:
+            tokens = shlex.split(chunk, posix=True)
+        except ValueError:
+            tokens = chunk.split()
+        argv = []
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            if token.lstrip('0123456789').startswith('>'):
+                target = token.lstrip('0123456789>') or (tokens[i + 1] if i + 1 < len(tokens) else '')
+                if not token.lstrip('0123456789>'):
+                    i += 1
+                redirects.append(target)
+            else:
+                argv.append(token)
+            i += 1
+        if argv:
+            segments.append(argv)
+    return segments, redirects
+
+
+def read_only(name: str) -> bool:
+    if name in READ_ONLY_CALLS:
+        return True
+    module, _, last = name.rpartition('.')
+    return bool(module) and f"{module}." in READ_ONLY_MODULES
+
+
+class Analyzer(ast.NodeVisitor):
+    def __init__(self):
+        self.report = StaticReport()
+        self.aliases = {}      # import alias => real module ('sp' => 'subprocess', 'rmtree' => 'shutil.rmtree')
+        self.modules = set()   # aliases bound by plain `import x` (module objects)
+        self.assigned = {}     # variable name => list of literal values assigned anywhere
+        self.local_defs = set()  # functions / classes the script defines itself
+        self.call_funcs = set()  # id() of nodes called directly, and of attribute bases: not "used as a value"
+
+    # -- pass 1: collect literal assignments so `command = [...]; run(command)` resolves --
+    def collect(self, tree):
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Assign):
+                value = literal(node.value)
+                for target in node.targets:
+                    if isinstance(target, ast.Name):
+                        self.assigned.setdefault(target.id, []).append(value)
+            elif isinstance(node, ast.Import):
+                for alias in node.names:
+                    if alias.asname:
+                        self.aliases[alias.asname] = alias.name
+                    else:
+                        top = alias.name.split('.')[0]
+                        self.aliases[top] = top
+                    self.modules.add(alias.asname or alias.name.split('.')[0])
+            elif isinstance(node, ast.ImportFrom) and node.module:
+                for alias in node.names:
+                    self.aliases[alias.asname or alias.name] = f"{node.module}.{alias.name}"
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                self.local_defs.add(node.name)
+            if isinstance(node, ast.Call):
+                self.call_funcs.add(id(node.func))
+            elif isinstance(node, ast.Attribute):
+                self.call_funcs.add(id(node.value))
+
+    def resolve(self, name: str) -> str:
+        head, _, rest = name.partition('.')
+        real = self.aliases.get(head, head)
+        return f"{real}.{rest}" if rest else real
+
+    def values_of(self, node) -> list | None:
+        """All literal values an argument can take, None if any of them is not literal."""
+        value = literal(node)
+        if value is not None:
+            return [value]
+        if isinstance(node, ast.Name) and node.id in self.assigned:
+            values = self.assigned[node.id]
+            return None if any(v is None for v in values) else values
+        return None
+
+    # -- pass 2 --
+    def visit_Import(self, node):
+        for alias in node.names:
+            self.add_import(alias.name)
+        self.generic_visit(node)
+
+    def visit_ImportFrom(self, node):
+        if node.module and not node.level:
+            self.add_import(node.module)
+            for alias in node.names:
+                self.add_import(f"{node.module}.{alias.name}", submodule_only=True)
+        self.generic_visit(node)
+
+    def add_import(self, module: str, submodule_only=False):
+        top = module.split('.')[0]
+        if not submodule_only:
+            self.report.imports.add(top)
+            if top not in SAFE_MODULES:
+                self.report.unknown_imports.add(top)
+        if module in NETWORK_MODULES or (not submodule_only and top in NETWORK_MODULES):
+            self.report.network.append(f"import {module}")
+
+    def visit_Name(self, node):
+        if isinstance(node.ctx, ast.Load) and id(node) not in self.call_funcs:
+            self.check_value(node.id, node.id)
+
+    def visit_Attribute(self, node):
+        if node.attr.startswith('__') and node.attr not in PLAIN_DUNDERS:
+            self.report.dynamic.append(f".{node.attr}")
+        raw = dotted_name(node)
+        if raw and raw.split('.')[0] in self.aliases:
+            name = self.resolve(raw)
+            if name == 'sys.modules':
+                self.report.dynamic.append(name)
+            elif isinstance(node.ctx, ast.Load) and id(node) not in self.call_funcs:
+                self.check_value(raw, name)
+        self.generic_visit(node)
+
+    def check_value(self, raw: str, name: str):
+        """A module / risky function used as a value (o = os, run = subprocess.run, f(shutil)): whatever
+        gets called through it later can't be told apart from a harmless method call."""
+        if '.' not in raw and raw not in self.aliases:
+            if raw in DYNAMIC_CALLS or raw == '__builtins__':
+                self.report.dynamic.append(f"{raw} as a value")
+            return
+        risky = (raw in self.modules or name.rpartition('.')[2] in RISKY_MODULE_NAMES
+                 or self.is_process_call(name) or name in DELETE_CALLS | WRITE_CALLS | KILL_CALLS | DYNAMIC_CALLS
+                 | NETWORK_CALLS)
+        if risky:
+            self.report.unresolved.append(f"{name} as a value")
+
+    @staticmethod
+    def is_process_call(name: str) -> bool:
+        return name in SUBPROCESS_CALLS or name in EXEC_CALLS
+
+    def vetted(self, func, raw: str, name: str) -> bool:
+        """Known read-only call? (everything risky has been caught by name before this)"""
+        imported = bool(raw) and raw.split('.')[0] in self.aliases
+        if imported:
+            return read_only(name)
+        if isinstance(func, ast.Name):
+            return func.id in self.local_defs or func.id in SAFE_BUILTINS
+        # method on a value we can't type: only the known read-only ones (or the script's own); getattr(...)(), table[i]() => no
+        return isinstance(func, ast.Attribute) and (func.attr in READ_ONLY_METHODS or func.attr in self.local_defs)
+
+    def visit_Call(self, node):
+        raw = dotted_name(node.func)
+        name = self.resolve(raw)
+        method = node.func.attr if isinstance(node.func, ast.Attribute) else ''
+        imported = bool(raw) and raw.split('.')[0] in self.aliases
+
+        if self.is_process_call(name):
+            self.check_command(name, node)
+        elif name in DELETE_CALLS:
+            self.report.deletes.append(name)
+            if name == 'shutil.rmtree' and node.args:
+                for value in self.values_of(node.args[0]) or []:
+                    if isinstance(value, str) and rootish(value):
+                        self.report.deny.append(f"shutil.rmtree({value!r})")
+        elif name in WRITE_CALLS:
+            self.report.writes.append(name)
+        elif name in KILL_CALLS:
+            self.report.kills.append(name)
+        elif name in NETWORK_CALLS:
+            self.report.network.append(name)
+        elif name in DYNAMIC_CALLS:
+            self.report.dynamic.append(name)
+        elif name in FILE_OPEN_CALLS or name in ARCHIVE_OPEN_CALLS:
+            self.check_open(name, node, mode_index=1)
+        elif imported and read_only(name):
+            pass  # sys.stdout.write, json.dump into a file whose open() mode was checked
+        elif method == 'open' and not imported:
+            # Path(...).open('w') - method on an object, mode is the first arg (Image.open etc are modules => vetted below)
+            self.check_open(name, node, mode_index=0)
+        elif method in WRITE_METHODS or (method == 'replace' and len(node.args) + len(node.keywords) == 1):
+            # Path.replace(target) takes one argument, str.replace(old, new) two
+            self.report.writes.append(f".{method}()")
+        elif method in DELETE_METHODS:
+            self.report.deletes.append(f".{method}()")
+        elif method in KILL_METHODS:
+            self.report.kills.append(f".{method}()")
+        elif method in SOCKET_METHODS and ('socket' in self.report.imports or name.startswith('socket.')):
+            self.check_socket(method, node)
+        elif method in NETWORK_METHODS:
+            self.report.network.append(f".{method}()")
+        elif not self.vetted(node.func, raw, name):
+            self.report.unvetted.append(name or ast.unparse(node.func)[:40])
+
+        self.generic_visit(node)
+
+    def check_open(self, name, node, mode_index):
+        if len(node.args) > mode_index:
+            mode_node = node.args[mode_index]
+        else:
+            mode_node = next((k.value for k in node.keywords if k.arg == 'mode'), None)
+        if mode_node is None:
+            return  # default 'r'
+        mode = literal(mode_node)
+        if not isinstance(mode, str) or set(mode) & set('wax+'):
+            self.report.writes.append(f"{name}(mode={mode!r})")
+
+    def check_socket(self, method, node):
+        if not node.args:
+            self.report.network.append(f"socket.{method}")
+            return
+        address = node.args[0]
+        host = literal(address.elts[0]) if isinstance(address, ast.Tuple) and address.elts else None
+        if isinstance(host, str) and host in LOCAL_HOSTS - {''}:
+            return  # binding localhost to see if a port is free / talking to ourselves
+        self.report.network.append(f"socket.{method}({host!r})")
+
+    def command_arg(self, name, node):
+        """The argv / command line argument of a process call, None if there is none."""
+        if name in EXEC_CALLS:
+            index, spread = EXEC_CALLS[name]
+            if spread:
+                return ast.List(elts=node.args[index:], ctx=ast.Load()) if len(node.args) > index else None
+            return node.args[index] if len(node.args) > index else None
+        return node.args[0] if node.args else next((k.value for k in node.keywords if k.arg == 'args'), None)
+
+    def check_command(self, name, node):
+        arg = self.command_arg(name, node)
+        values = self.values_of(arg) if arg is not None else None
+        if values is None:
+            self.report.unresolved.append(name)
+            return
+        if name == 'os.startfile':
+            self.report.non_read_only.append(f"startfile {values[0]!r}")
+            return
+
+        shell = name in ('os.system', 'os.popen', 'subprocess.getoutput', 'subprocess.getstatusoutput',
+                         'asyncio.create_subprocess_shell') or any(
+            k.arg == 'shell' and isinstance(k.value, ast.Constant) and k.value.value for k in node.keywords)
+
+        for value in values:
+            if isinstance(value, list):
+                if shell and value:
+                    segments, redirects = split_shell(" ".join(value))
+                else:
+                    segments, redirects = [value], []
+            elif shell:
+                segments, redirects = split_shell(value)
+            else:
+                segments, redirects = [value.split()], []
+
+            for target in redirects:
+                if target.lower() not in ('nul', '/dev/null', '&1', '&2'):
+                    self.report.writes.append(f"redirect > {target}")
+            for argv in segments:
+                self.check_argv(argv)
+
+    def check_argv(self, argv):
+        if not argv:
+            return
+        self.report.commands.append(argv)
+        program = argv[0].replace('\\', '/').rsplit('/', 1)[-1].lower()
+        if program.endswith('.exe'):
+            program = program[:-4]
+        args = [a.lower() for a in argv[1:]]
+        joined = " ".join(argv)
+
+        if program in DENY_COMMANDS or ':(){' in joined.replace(' ', ''):
+            self.report.deny.append(joined)
+        elif program in ('rm', 'del', 'rd', 'rmdir') and any(rootish(a) for a in args if not a.startswith(('-', '/s', '/q'))):
+            self.report.deny.append(joined)
+        elif program == 'dd' and any(a.startswith('of=/dev/') for a in args):
+            self.report.deny.append(joined)
+        elif program in KILL_COMMANDS:
+            self.report.kills.append(joined)
+        elif program in NETWORK_COMMANDS:
+            self.report.network.append(joined)
+        elif program in READ_ONLY_SUBCOMMANDS:
+            if not self.read_only_subcommand(program, args):
+                self.report.non_read_only.append(joined)
+        elif program not in READ_ONLY_COMMANDS:
+            self.report.non_read_only.append(joined)
+
+    @staticmethod
+    def read_only_subcommand(program, args) -> bool:
+        """docker ps / git status / pip list ... only the subcommand counts, not some later argument
+        (docker rm -f $(docker ps -aq), pip uninstall -y x list). No subcommand found => not read-only."""
+        allowed = READ_ONLY_SUBCOMMANDS[program]
+        if not args:
+            return '' in allowed
+        if program in ('hostname', 'ifconfig', 'arp'):
+            return all(a in allowed for a in args)  # 'hostname newname' renames the box
+        if program == 'sysctl' and any(a == '-w' or '=' in a for a in args):
+            return False
+        positional = [a for a in args if not a.startswith('-')]
+        if program == 'wmic':
+            # wmic [/node:x] <alias | path class> [where ...] <verb> ...
+            positional = [a for a in positional if a in WMIC_VERBS]
+        subcommand = args[0] if args[0] in allowed else next(iter(positional), None)
+        if subcommand not in allowed:
+            return False
+        rest = READ_ONLY_SUBCOMMAND_ARGS.get((program, subcommand))
+        if rest is not None:
+            return all(a in rest for a in args[args.index(subcommand) + 1:])
+        return True
+
+
+def analyze(code: str, filename: str = '<vibe>') -> StaticReport:
+    """Static report of what the script does. Never executes anything."""
+    try:
+        compile(code, filename, 'exec', dont_inherit=True)
+        tree = ast.parse(code, filename)
+    except (SyntaxError, ValueError) as e:
+        return StaticReport(syntax_error=str(e))
+
+    analyzer = Analyzer()
+    analyzer.collect(tree)
+    analyzer.visit(tree)
+    return analyzer.report
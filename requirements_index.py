@@ -0,0 +1,125 @@
+"""
+What the script venv already has, so install_requirements only calls pip for the rest.
+
+In memory: dist-info metadata of the venv (system_info.get_venv_packages, cached by dir mtime).
+On disk:   <venv>/autovibe_installed.json => requirement string pip installed OK -> {dist: version}
+           covers stuff we can't match by name alone (extras, urls, markers).
+"""
+
+import json
+import re
+import threading
+from pathlib import Path
+
+from system_info import get_venv_packages, normalize_package_name
+
+try:
+    from packaging.requirements import Requirement, InvalidRequirement
+except ImportError:  # no packaging => only bare names are matched locally, rest goes to pip
+    Requirement = None
+    InvalidRequirement = ValueError
+
+INDEX_FILENAME = "autovibe_installed.json"
+
+# plain 'name' or 'name==1.2' / 'name>=1,<2', nothing fancy
+_simple_requirement = re.compile(r'^\s*([A-Za-z0-9][A-Za-z0-9._-]*)\s*([<>=!~].*)?$')
+
+
+def parse_requirement(requirement: str):
+    """-> (normalized name, specifier str) or (None, None) if we can't judge it locally."""
+    match = _simple_requirement.match(requirement)
+    if not match:
+        return None, None
+    return normalize_package_name(match.group(1)), (match.group(2) or '').strip()
+
+
+def requirement_name(requirement: str):
+    """Normalized dist name of any requirement string pip accepts, None for urls/paths."""
+    name, _ = parse_requirement(requirement)
+    if name or Requirement is None:
+        return name
+    try:
+        return normalize_package_name(Requirement(requirement).name)
+    except InvalidRequirement:
+        return None
+
+
+def specifier_ok(specifier: str, version: str) -> bool:
+    if not specifier:
+        return True
+    if Requirement is None:
+        return False
+    try:
+        return Requirement(f"x{specifier}").specifier.contains(version, prereleases=True)
+    except InvalidRequirement:
+        return False
+
+
+class RequirementsIndex:
+    def __init__(self, venv_dir: Path):
+        self.venv_dir = Path(venv_dir)
+        self.path = self.venv_dir / INDEX_FILENAME
+        self.lock = threading.Lock()
+        self.known: dict[str, dict[str, str]] = self.load()
+
+    def load(self) -> dict:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        tmp = self.path.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.known, f, indent=2, sort_keys=True)
+        tmp.replace(self.path)
+
+    def is_satisfied(self, requirement: str, installed: dict[str, str]) -> bool:
+        # pip already installed this exact string, and those dists are still there untouched
+        recorded = self.known.get(requirement)
+        if recorded and all(installed.get(name) == version for name, version in recorded.items()):
+            return True
+
+        name, specifier = parse_requirement(requirement)
+        if not name or name not in installed:
+            return False
+        return specifier_ok(specifier, installed[name])
+
+    def missing(self, requirements: list[str]) -> list[str]:
+        """Requirements the venv does not satisfy yet (order kept, dupes dropped)."""
+        installed = get_venv_packages(self.venv_dir)
+        with self.lock:
+            todo = []
+            for requirement in requirements:
+                requirement = requirement.strip()
+                if requirement and requirement not in todo and not self.is_satisfied(requirement, installed):
+                    todo.append(requirement)
+            return todo
+
+    def known_names(self) -> set[str]:
+        """Normalized dist names pip installed into this venv before (even if gone since)."""
+        with self.lock:
+            return {name for dists in self.known.values() for name in dists}
+
+    def snapshot(self) -> dict[str, str]:
+        return dict(get_venv_packages(self.venv_dir))
+
+    def record(self, requirements: list[str], before: dict[str, str]):
+        """After a successful pip run: remember which dists each requirement string resolved to."""
+        after = get_venv_packages(self.venv_dir)
+        changed = {name: version for name, version in after.items() if before.get(name) != version}
+
+        with self.lock:
+            for requirement in requirements:
+                name = requirement_name(requirement)
+                if name and name in after:
+                    self.known[requirement] = {name: after[name]}
+                elif changed:
+                    # url / path / odd name => credit it with whatever pip just brought in
+                    self.known[requirement] = dict(changed)
+            try:
+                self.save()
+            except OSError as e:
+                print(f"⚠️  Could not save requirements index: {e}")
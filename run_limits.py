@@ -0,0 +1,212 @@
+"""
+Resource limits + accounting for generated script runs.
+
+Linux/macOS: the script gets its own process group (so a timeout kills it and everything it spawned),
+rlimits for CPU time / address space / open files, and its rusage. Both come from a tiny spawn helper
+(SPAWN_HELPER, python -I -S): it sets the rlimits, forks + execs the script, reaps it with os.wait4 and
+writes the usage to a pipe. So the limits are there before the script's first instruction, ru_maxrss is
+the script's own (a child forked straight from the server would report the server's RSS), and whoever
+holds the Popen can reap the helper any way it likes.
+Windows: wall timeout + plain kill only, usage is just elapsed time.
+
+Knobs (0 => no limit):
+    AUTOVIBE_LIMIT_CPU         CPU seconds, default = exec_timeout
+    AUTOVIBE_LIMIT_MEMORY_MB   address space, default 4096 (virtual, not RSS: numpy & co reserve a lot)
+    AUTOVIBE_LIMIT_NOFILE      open files, default 1024
+    AUTOVIBE_LIMIT_NPROC       processes, default 0 - RLIMIT_NPROC counts every process of the user,
+                               only turn it on when scripts run under a dedicated account
+"""
+
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+POSIX = os.name == 'posix' and resource is not None
+
+DEFAULT_MEMORY_MB = 4096
+DEFAULT_NOFILE = 1024
+# soft CPU limit sends SIGXCPU, hard limit this much later is SIGKILL
+CPU_HARD_GRACE = 5
+
+SIGNAL_REASONS = {
+    'SIGXCPU': 'CPU time limit',
+    'SIGKILL': 'killed (timeout or CPU hard limit)',
+    'SIGSEGV': 'crashed (often memory limit in native code)',
+    'SIGXFSZ': 'file size limit',
+}
+
+
+def env_number(name: str, default: float) -> float:
+    value = os.environ.get(name, '').strip()
+    return float(value) if value else default
+
+
+@dataclass
+class RunLimits:
+    wall_timeout: float = 120
+    cpu_seconds: int = 120
+    memory_mb: int = DEFAULT_MEMORY_MB
+    open_files: int = DEFAULT_NOFILE
+    processes: int = 0
+
+    @classmethod
+    def from_env(cls, exec_timeout: float = 120):
+        return cls(
+            wall_timeout=exec_timeout,
+            cpu_seconds=int(env_number('AUTOVIBE_LIMIT_CPU', exec_timeout)),
+            memory_mb=int(env_number('AUTOVIBE_LIMIT_MEMORY_MB', DEFAULT_MEMORY_MB)),
+            open_files=int(env_number('AUTOVIBE_LIMIT_NOFILE', DEFAULT_NOFILE)),
+            processes=int(env_number('AUTOVIBE_LIMIT_NPROC', 0)),
+        )
+
+    def rlimits(self) -> list[tuple[int, int, int]]:
+        """(resource, soft, hard) to apply in the child."""
+        if not POSIX:
+            return []
+        limits = []
+        if self.cpu_seconds > 0:
+            limits.append((resource.RLIMIT_CPU, self.cpu_seconds, self.cpu_seconds + CPU_HARD_GRACE))
+        if self.memory_mb > 0:
+            size = self.memory_mb * 1024 * 1024
+            limits.append((resource.RLIMIT_AS, size, size))
+        if self.open_files > 0:
+            limits.append((resource.RLIMIT_NOFILE, self.open_files, self.open_files))
+        if self.processes > 0 and hasattr(resource, 'RLIMIT_NPROC'):
+            limits.append((resource.RLIMIT_NPROC, self.processes, self.processes))
+        return limits
+
+    def spawn(self, argv: list[str], **kwargs) -> subprocess.Popen:
+        """Popen argv under the limits (kwargs: pipes, env...). POSIX: through the spawn helper, in its own
+        session, the usage pipe is proc.usage_fd (read by wait_usage)."""
+        if not POSIX:
+            return subprocess.Popen(argv, **kwargs)
+        usage_fd, write_fd = os.pipe()
+        try:
+            proc = subprocess.Popen(self.command(argv, write_fd), pass_fds=(write_fd,), start_new_session=True, **kwargs)
+        except BaseException:
+            os.close(usage_fd)
+            raise
+        finally:
+            os.close(write_fd)
+        proc.usage_fd = usage_fd
+        return proc
+
+    async def spawn_async(self, argv: list[str], **kwargs) -> asyncio.subprocess.Process:
+        """spawn() as an asyncio subprocess: the loop's child watcher reaps it, no thread blocked in a wait."""
+        if not POSIX:
+            return await asyncio.create_subprocess_exec(*argv, **kwargs)
+        usage_fd, write_fd = os.pipe()
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *self.command(argv, write_fd), pass_fds=(write_fd,), start_new_session=True, **kwargs)
+        except BaseException:
+            os.close(usage_fd)
+            raise
+        finally:
+            os.close(write_fd)
+        proc.usage_fd = usage_fd
+        return proc
+
+    def command(self, argv: list[str], usage_fd: int) -> list[str]:
+        """argv wrapped in the spawn helper (same interpreter as the script)."""
+        spec = ','.join(f"{res}:{soft}:{hard}" for res, soft, hard in self.rlimits())
+        return [argv[0], '-I', '-S', '-c', SPAWN_HELPER, spec, str(usage_fd), *argv]
+
+
+# run by RunLimits.command(): <python> -I -S -c SPAWN_HELPER "res:soft:hard,..." <usage fd> <argv...>
+# exits like the script did (same code, or killed by the same signal)
+SPAWN_HELPER = """
+import os, resource, signal, sys
+spec, usage_fd, argv = sys.argv[1], int(sys.argv[2]), sys.argv[3:]
+for item in filter(None, spec.split(',')):
+    res, soft, hard = map(int, item.split(':'))
+    cur_soft, cur_hard = resource.getrlimit(res)
+    if cur_hard != resource.RLIM_INFINITY:
+        hard = min(hard, cur_hard)
+        soft = min(soft, hard)
+    resource.setrlimit(res, (soft, hard))
+os.set_inheritable(usage_fd, False)
+pid = os.fork()
+if pid == 0:
+    try:
+        os.execv(argv[0], argv)
+    except OSError as e:
+        os.write(2, f"{argv[0]}: {e}\\n".encode())
+    os._exit(127)
+_, status, usage = os.wait4(pid, 0)
+os.write(usage_fd, f"{usage.ru_utime} {usage.ru_stime} {usage.ru_maxrss}".encode())
+code = os.waitstatus_to_exitcode(status)
+if code < 0:
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+    signal.signal(-code, signal.SIG_DFL)
+    os.kill(os.getpid(), -code)
+os._exit(code & 0xFF)
+"""
+
+
+def read_usage(usage_fd: int) -> dict:
+    """What the spawn helper wrote once the script exited; {} when it didn't get to (killed on timeout)."""
+    with open(usage_fd, 'rb') as pipe:
+        fields = pipe.read().split()
+    if len(fields) != 3:
+        return {}
+    # ru_maxrss is KB on Linux, bytes on macOS
+    max_rss = int(fields[2])
+    return {
+        'cpu_user_s': float(fields[0]),
+        'cpu_system_s': float(fields[1]),
+        'max_rss_kb': max_rss // 1024 if sys.platform == 'darwin' else max_rss,
+    }
+
+
+def kill_group(proc):
+    """Kill the script and everything it started (same process group)."""
+    try:
+        if POSIX:
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def wait_usage(proc, started: float) -> dict:
+    """Block until proc exits, reap it and return its resource usage. Sets proc.returncode."""
+    if hasattr(proc, 'wait_usage'):
+        return proc.wait_usage(started)  # forked by the executor pool's zygote, which reaps it
+    if not hasattr(proc, 'usage_fd'):
+        returncode = proc.wait()
+        return {'returncode': returncode, 'elapsed_s': time.monotonic() - started}
+
+    returncode = proc.wait()
+    return {'returncode': returncode, 'elapsed_s': time.monotonic() - started, **read_usage(proc.usage_fd)}
+
+
+async def wait_usage_async(proc, started: float) -> dict:
+    """wait_usage for spawn_async() processes and pooled ones, awaited instead of blocking.
+    The helper has written its usage and exited by the time proc.wait() returns, so reading it doesn't block."""
+    if hasattr(proc, 'wait_usage_async'):
+        return await proc.wait_usage_async(started)
+    returncode = await proc.wait()
+    usage = read_usage(proc.usage_fd) if hasattr(proc, 'usage_fd') else {}
+    return {'returncode': returncode, 'elapsed_s': time.monotonic() - started, **usage}
+
+
+def signal_reason(returncode: int) -> str | None:
+    """Human reason for a signal death (negative return code), None otherwise."""
+    if returncode is None or returncode >= 0:
+        return None
+    try:
+        name = signal.Signals(-returncode).name
+    except ValueError:
+        return f"signal {-returncode}"
+    return f"{name}: {SIGNAL_REASONS.get(name, 'killed by signal')}"
@@ -0,0 +1,171 @@
+"""
+Where a vibe spent its time: wall time per stage (generate, repair, validate, install, execute, check)
+per attempt, every LLM call with its token usage, and the script runs' rusage.
+
+Each run fills a RunMetrics (ToolReturn.metrics); finished runs are folded into run_stats,
+a process-wide aggregate (GET /stages on the REST server) to find the stage that actually dominates.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+from pydantic import BaseModel
+
+
+class RunUsage(BaseModel):
+    """What one script run actually cost (cpu/rss only where os.wait4 exists)."""
+    returncode: int | None = None
+    timed_out: bool = False
+    elapsed_s: float = 0.0
+    cpu_user_s: float | None = None
+    cpu_system_s: float | None = None
+    max_rss_kb: int | None = None
+
+
+class StageTiming(BaseModel):
+    stage: str
+    attempt: int
+    elapsed_s: float
+
+
+class LLMCall(BaseModel):
+    schema_name: str
+    model: str
+    attempt: int
+    elapsed_s: float
+    # waiting for an llm_slots slot, part of elapsed_s
+    waited_s: float = 0.0
+    cache_hit: bool = False
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+
+
+class RunMetrics(BaseModel):
+    # attempt the run is on (0 = first generation, n = n-th repair)
+    attempt: int = 0
+    total_s: float = 0.0
+    # ok | failed | max_retry | codegen_error | install_failed | exception, set when the run returns
+    outcome: str = ''
+    stages: list[StageTiming] = []
+    llm_calls: list[LLMCall] = []
+    executions: list[RunUsage] = []
+    # modules pip installed after a ModuleNotFoundError, same script re-run without an LLM repair
+    fast_repairs: list[str] = []
+    # requirements added from the script's imports, on top of what the model declared
+    inferred_requirements: list[str] = []
+    # third-party imports with no distribution we know, so not installed (the LLM repair deals with them)
+    skipped_requirements: list[str] = []
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.monotonic()
+        attempt = self.attempt
+        try:
+            yield
+        finally:
+            self.stages.append(StageTiming(stage=name, attempt=attempt, elapsed_s=time.monotonic() - started))
+
+    def llm_call(self, schema_name: str, model: str, elapsed_s: float, waited_s: float = 0.0, usage=None, cache_hit=False):
+        """usage = completion.usage from the OpenAI client (None for cache hits / providers without it)."""
+        details = getattr(usage, 'prompt_tokens_details', None)
+        self.llm_calls.append(LLMCall(
+            schema_name=schema_name,
+            model=model,
+            attempt=self.attempt,
+            elapsed_s=elapsed_s,
+            waited_s=waited_s,
+            cache_hit=cache_hit,
+            prompt_tokens=getattr(usage, 'prompt_tokens', None) or 0,
+            completion_tokens=getattr(usage, 'completion_tokens', None) or 0,
+            cached_tokens=getattr(details, 'cached_tokens', None) or 0,
+        ))
+
+    def by_stage(self) -> dict[str, float]:
+        totals = {}
+        for timing in self.stages:
+            totals[timing.stage] = totals.get(timing.stage, 0.0) + timing.elapsed_s
+        return totals
+
+
+def timed(metrics: RunMetrics | None, name: str):
+    """metrics.stage(name), or nothing when there is no run to record into."""
+    if metrics is None:
+        return _untimed()
+    return metrics.stage(name)
+
+
+@contextmanager
+def _untimed():
+    yield
+
+
+class RunStats:
+    """Finished runs, summed up: per stage count/total/max seconds, per model calls and tokens."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.runs = 0
+            self.total_s = 0.0
+            self.attempts = 0
+            self.stages: dict[str, dict] = {}
+            self.models: dict[str, dict] = {}
+            self.executions = {'count': 0, 'timed_out': 0, 'cpu_s': 0.0, 'max_rss_kb': 0}
+
+    def add(self, metrics: RunMetrics):
+        with self.lock:
+            self.runs += 1
+            self.total_s += metrics.total_s
+            self.attempts += metrics.attempt + 1
+            for timing in metrics.stages:
+                stage = self.stages.setdefault(timing.stage, {'count': 0, 'total_s': 0.0, 'max_s': 0.0})
+                stage['count'] += 1
+                stage['total_s'] += timing.elapsed_s
+                stage['max_s'] = max(stage['max_s'], timing.elapsed_s)
+            for call in metrics.llm_calls:
+                model = self.models.setdefault(call.model, {
+                    'calls': 0, 'cache_hits': 0, 'total_s': 0.0, 'waited_s': 0.0,
+                    'prompt_tokens': 0, 'completion_tokens': 0, 'cached_tokens': 0,
+                })
+                model['calls'] += 1
+                model['cache_hits'] += call.cache_hit
+                model['total_s'] += call.elapsed_s
+                model['waited_s'] += call.waited_s
+                model['prompt_tokens'] += call.prompt_tokens
+                model['completion_tokens'] += call.completion_tokens
+                model['cached_tokens'] += call.cached_tokens
+            for usage in metrics.executions:
+                self.executions['count'] += 1
+                self.executions['timed_out'] += usage.timed_out
+                self.executions['cpu_s'] += (usage.cpu_user_s or 0.0) + (usage.cpu_system_s or 0.0)
+                self.executions['max_rss_kb'] = max(self.executions['max_rss_kb'], usage.max_rss_kb or 0)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            stage_total = sum(stage['total_s'] for stage in self.stages.values())
+            stages = {
+                name: {
+                    **stage,
+                    'mean_s': stage['total_s'] / stage['count'],
+                    # of all stage time; stages overlap when pipelined, so this is a ranking, not a breakdown
+                    'share': stage['total_s'] / stage_total if stage_total else 0.0,
+                }
+                for name, stage in self.stages.items()
+            }
+            return {
+                'runs': self.runs,
+                'mean_run_s': self.total_s / self.runs if self.runs else None,
+                'mean_attempts': self.attempts / self.runs if self.runs else None,
+                'bottleneck': max(stages, key=lambda name: stages[name]['total_s']) if stages else None,
+                'stages': stages,
+                'models': {name: dict(model) for name, model in self.models.items()},
+                'executions': dict(self.executions),
+            }
+
+
+run_stats = RunStats()
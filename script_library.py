@@ -0,0 +1,172 @@
+"""
+Library of scripts that already did their job, so they can be run again by id without any LLM call.
+
+One entry per script file in vibe_scripts/ (id = file name without .py): the request that produced it,
+code hash, requirements, last validation verdict, runs / successes / run time.
+Successful vibes are added as they finish; scripts already sitting in vibe_scripts/ get picked up by
+sync() (no request, no verdict until someone reviews them).
+
+Only approved entries (last verdict: correct + ALLOW) are meant to run directly, and only while the
+file still has the hash that verdict was given for.
+
+On by default; AUTOVIBE_SCRIPT_LIBRARY=0 turns it off, =/path/file.sqlite3 moves it.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_PATH = Path("./vibe_scripts/library.sqlite3")
+
+
+def code_hash(code: str) -> str:
+    """Full md5 of script text (save_code uses first 8 chars for the filename)."""
+    return hashlib.md5(code.encode('utf-8')).hexdigest()
+
+
+class ScriptLibrary:
+    def __init__(self, path=DEFAULT_PATH, scripts_dir: Path = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.scripts_dir = Path(scripts_dir) if scripts_dir else self.path.parent
+
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS scripts (
+                id TEXT PRIMARY KEY,
+                filename TEXT NOT NULL,
+                request TEXT,
+                code_hash TEXT NOT NULL,
+                requirements TEXT NOT NULL DEFAULT '[]',
+                verdict TEXT,
+                verdict_hash TEXT,
+                approved INTEGER NOT NULL DEFAULT 0,
+                runs INTEGER NOT NULL DEFAULT 0,
+                successes INTEGER NOT NULL DEFAULT 0,
+                total_s REAL NOT NULL DEFAULT 0,
+                last_run REAL,
+                created REAL NOT NULL
+            )
+        """)
+        self.db.commit()
+
+    @classmethod
+    def from_env(cls, scripts_dir: Path = None):
+        """ScriptLibrary unless AUTOVIBE_SCRIPT_LIBRARY says off."""
+        setting = os.environ.get('AUTOVIBE_SCRIPT_LIBRARY', '1').strip()
+        if setting.lower() in ('', '0', 'false', 'no', 'off'):
+            return None
+        path = DEFAULT_PATH if setting.lower() in ('1', 'true', 'yes', 'on') else Path(setting)
+        return cls(path, scripts_dir)
+
+    def entry(self, row: sqlite3.Row) -> dict:
+        runs = row['runs']
+        return {
+            'id': row['id'],
+            'filename': row['filename'],
+            'request': row['request'],
+            'code_hash': row['code_hash'],
+            'requirements': json.loads(row['requirements']),
+            'verdict': json.loads(row['verdict']) if row['verdict'] else None,
+            # the verdict was given for the code as it is now
+            'approved': bool(row['approved']) and row['verdict_hash'] == row['code_hash'],
+            'runs': runs,
+            'success_rate': row['successes'] / runs if runs else None,
+            'avg_runtime_s': row['total_s'] / runs if runs else None,
+            'last_run': row['last_run'],
+            'created': row['created'],
+        }
+
+    def sync(self) -> list[str]:
+        """Register .py files in the scripts dir we don't know yet => their ids."""
+        with self.lock:
+            known = {row[0] for row in self.db.execute("SELECT id FROM scripts")}
+        added = []
+        for path in sorted(self.scripts_dir.glob('*.py')):
+            if path.stem in known:
+                continue
+            try:
+                code = path.read_text(encoding='utf-8')
+            except (OSError, UnicodeDecodeError):
+                continue
+            with self.lock:
+                self.db.execute(
+                    "INSERT OR IGNORE INTO scripts (id, filename, code_hash, created) VALUES (?, ?, ?, ?)",
+                    (path.stem, path.name, code_hash(code), time.time())
+                )
+                self.db.commit()
+            added.append(path.stem)
+        return added
+
+    def remember(self, filename: str, request: str, code: str, requirements: list[str], verdict, approved: bool,
+                 ok: bool = True, elapsed_s: float = 0.0) -> str:
+        """A vibe that worked: add / refresh its entry and count the run. => script id"""
+        script_id = Path(filename).stem
+        digest = code_hash(code)
+        verdict_json = verdict.model_dump_json() if verdict is not None else None
+        with self.lock:
+            self.db.execute("""
+                INSERT INTO scripts (id, filename, request, code_hash, requirements, verdict, verdict_hash, approved, created)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    request = COALESCE(excluded.request, scripts.request),
+                    code_hash = excluded.code_hash,
+                    requirements = excluded.requirements,
+                    verdict = excluded.verdict,
+                    verdict_hash = excluded.verdict_hash,
+                    approved = excluded.approved
+            """, (script_id, Path(filename).name, request, digest, json.dumps(requirements), verdict_json,
+                  digest, int(approved), time.time()))
+            self.db.commit()
+        self.record_run(script_id, ok, elapsed_s)
+        return script_id
+
+    def set_verdict(self, script_id: str, digest: str, verdict, approved: bool):
+        """Verdict for the code with hash digest (what was actually reviewed)."""
+        with self.lock:
+            self.db.execute(
+                "UPDATE scripts SET code_hash = ?, verdict = ?, verdict_hash = ?, approved = ? WHERE id = ?",
+                (digest, verdict.model_dump_json(), digest, int(approved), script_id)
+            )
+            self.db.commit()
+
+    def record_run(self, script_id: str, ok: bool, elapsed_s: float):
+        with self.lock:
+            self.db.execute(
+                "UPDATE scripts SET runs = runs + 1, successes = successes + ?, total_s = total_s + ?, last_run = ? WHERE id = ?",
+                (int(ok), elapsed_s, time.time(), script_id)
+            )
+            self.db.commit()
+
+    def get(self, script_id: str) -> dict | None:
+        with self.lock:
+            row = self.db.execute("SELECT * FROM scripts WHERE id = ?", (script_id,)).fetchone()
+        return self.entry(row) if row else None
+
+    def list(self, query: str = None, approved_only: bool = False, limit: int = 100) -> list[dict]:
+        """Most used first; query matches id or request text (case-insensitive substring)."""
+        sql, params = "SELECT * FROM scripts", []
+        if query:
+            sql += " WHERE id LIKE ? OR request LIKE ?"
+            params += [f"%{query}%"] * 2
+        sql += " ORDER BY runs DESC, created DESC"
+        with self.lock:
+            rows = self.db.execute(sql, params).fetchall()
+        entries = [self.entry(row) for row in rows]
+        if approved_only:
+            entries = [e for e in entries if e['approved']]
+        return entries[:limit]
+
+    def stats(self) -> dict:
+        with self.lock:
+            total, approved, runs = self.db.execute(
+                "SELECT COUNT(*), SUM(approved AND verdict_hash = code_hash), SUM(runs) FROM scripts"
+            ).fetchone()
+        return {'path': str(self.path), 'scripts': total, 'approved': approved or 0, 'runs': runs or 0}
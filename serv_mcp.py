@@ -1,9 +1,13 @@
 import sys
 import os
 
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import FastMCP, Context
 
-from autovibe import AutoVibe, ToolReturn
+from autovibe import AutoVibe, ToolReturn, ScriptRefused, SCRIPTS_DIR, script_library
+from system_info import warm_system_info
+from single_flight import SingleFlight, request_key
+from batch import BATCH_MAX_ITEMS, run_batch
+import metrics_registry
 
 # cause that damn thing lot loading env.
 from dotenv import load_dotenv
@@ -16,26 +20,46 @@ if sys.platform == "win32":
     os.environ['PYTHONIOENCODING'] = 'utf-8'
 
 mcp = FastMCP("AutoVibe")
+# agents retrying the same call while it still runs => they wait for that run
+coalescer = SingleFlight.from_env()
+
+metrics_registry.registry.callback(
+    'autovibe_coalesced_total', "Vibe requests by how they got their result (leader ran it)",
+    lambda: {(how,): n for how, n in coalescer.stats().items() if how in ('leader', 'joined', 'reused')},
+    ('how',), kind='counter')
 
 @mcp.tool(description="Generates python code and automatically runs it with auto-retry and safety checks")
-def auto_vibe(
+async def auto_vibe(
       content: str, 
       max_retry: int = 1,
       auto_check: bool = False,
       exec_timeout: int = 120,
+      pipeline: bool = True,
+      ctx: Context = None,
       ) -> dict:
     """Call VibeApi"""
 
     sys.stderr.write(f'autovibe called => {content}\n')
 
-    autovibe = AutoVibe(
+    # script output goes out as progress notifications (when the client sent a progressToken)
+    received = 0
+    async def on_output(stream, text):
+        nonlocal received
+        received += len(text)
+        if ctx:
+            await ctx.report_progress(received, message=text)
+
+    options = dict(
         max_retry=max_retry,
         auto_check=auto_check,
         exec_timeout=exec_timeout,
+        pipeline=pipeline,
         )
-    result = autovibe.as_tool(content)
+    autovibe = AutoVibe(**options, on_output=on_output)
+    # only the first of identical concurrent calls streams progress, the rest just get its result
+    result, how = await coalescer.do_async(request_key(content, options), lambda: autovibe.as_tool_async(content))
 
-    sys.stderr.write(f'autovibe result => {result}\n')
+    sys.stderr.write(f'autovibe result ({how}) => {result}\n')
 
 
     # Handle errors by raising an exception, which FastMCP will convert to proper MCP error format
@@ -45,5 +69,95 @@ def auto_vibe(
     return result.content
     
 
+@mcp.tool(description="Runs many auto_vibe requests concurrently (quick checks: ports, services, disks...), results in input order")
+async def auto_vibe_batch(
+      requests: list[str],
+      max_retry: int = 1,
+      auto_check: bool = False,
+      exec_timeout: int = 120,
+      pipeline: bool = True,
+      ctx: Context = None,
+      ) -> list[dict]:
+    """One entry per request: index, content, is_error, content/result text, timings."""
+    if not requests:
+        raise Exception("requests cannot be empty")
+    if len(requests) > BATCH_MAX_ITEMS:
+        raise Exception(f"too many requests: {len(requests)} > {BATCH_MAX_ITEMS}")
+
+    options = dict(max_retry=max_retry, auto_check=auto_check, exec_timeout=exec_timeout, pipeline=pipeline)
+    finished = 0
+    async def on_item(item):
+        nonlocal finished
+        finished += 1
+        if ctx:
+            status = 'error' if item['result']['is_error'] else 'ok'
+            await ctx.report_progress(finished, len(requests), message=f"#{item['index']} {status}")
+
+    summary = await run_batch([(content, options) for content in requests], coalescer, on_item)
+    sys.stderr.write(f"autovibe batch => {len(requests)} items, {summary['errors']} errors, {summary['elapsed_s']:.1f}s\n")
+
+    return [
+        {
+            'index': item['index'],
+            'request': item['content'],
+            'is_error': item['result']['is_error'],
+            'content': item['result']['content'],
+            'elapsed_s': item['elapsed_s'],
+        }
+        for item in summary['results']
+    ]
+
+
+@mcp.tool(description="Lists scripts that already worked (script library); approved ones can be re-run with run_script, no code generation")
+async def list_scripts(query: str = "", approved_only: bool = True, limit: int = 50) -> list[dict]:
+    """Most used first: id, request that made it, requirements, approved, runs, success rate, avg runtime."""
+    if not script_library:
+        raise Exception("script library is off (AUTOVIBE_SCRIPT_LIBRARY=0)")
+    return [
+        {key: entry[key] for key in ('id', 'request', 'requirements', 'approved', 'runs', 'success_rate', 'avg_runtime_s')}
+        for entry in script_library.list(query or None, approved_only, limit)
+    ]
+
+
+@mcp.tool(description="Runs an approved script from the library by id (see list_scripts) with optional command line args, no LLM involved")
+async def run_script(
+      script_id: str,
+      args: list[str] = None,
+      exec_timeout: int = 120,
+      ctx: Context = None,
+      ) -> dict:
+    """Same result as auto_vibe, without generating or validating anything."""
+    sys.stderr.write(f'run_script called => {script_id} {args or []}\n')
+
+    received = 0
+    async def on_output(stream, text):
+        nonlocal received
+        received += len(text)
+        if ctx:
+            await ctx.report_progress(received, message=text)
+
+    runner = AutoVibe(exec_timeout=exec_timeout, on_output=on_output)
+    try:
+        result = await runner.run_script_async(script_id, args or [])
+    except ScriptRefused as e:
+        raise Exception(str(e))
+
+    sys.stderr.write(f'run_script result => {result}\n')
+    if result.is_error:
+        raise Exception(result.content)
+
+    return result.content
+
+
 if __name__ == "__main__":
+    # probe the system once in background, so first vibe doesn't wait for it
+    warm_system_info(SCRIPTS_DIR / "venv")
+    # hand-made scripts in vibe_scripts/ join the library once, unapproved until reviewed
+    if script_library:
+        sys.stderr.write(f'library => {len(script_library.sync())} scripts picked up\n')
+    # stdio is the MCP channel, so metrics get their own little local endpoint
+    metrics_port = os.environ.get('AUTOVIBE_METRICS_PORT')
+    if metrics_port:
+        metrics_registry.serve(int(metrics_port))
+        sys.stderr.write(f'metrics => http://127.0.0.1:{metrics_port}/metrics\n')
     mcp.run()
\ No newline at end of file
@@ -1,19 +1,163 @@
 
-from flask import Flask, request, jsonify
+import argparse
+import asyncio
+import functools
+import importlib.util
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+from flask import Flask, Response, request, jsonify
 from pydantic import BaseModel
 from typing import List
 
 
-from autovibe import AutoVibe, ToolReturn
+import autovibe
+from autovibe import AutoVibe, ToolReturn, VibeEngine, ScriptRefused, SCRIPTS_DIR
+from system_info import warm_system_info
+from console_capture import read_log
+from job_store import JobRunner, QueueFull
+from single_flight import SingleFlight, request_key
+from batch import BATCH_MAX_ITEMS, run_batch
+from concurrency import Admission, limits_stats
+from run_metrics import run_stats
+from metrics_registry import CONTENT_TYPE, registry
 
 app = Flask(__name__)
+# identical /autovibe requests in flight share one run (AUTOVIBE_COALESCE_TTL => also reuse fresh results)
+coalescer = SingleFlight.from_env()
+# vibe requests this process works on at once / lets wait; beyond that 429/503 + Retry-After
+admission = Admission.from_env()
+
+registry.callback('autovibe_coalesced_total', "Vibe requests by how they got their result (leader ran it)",
+                  lambda: {(how,): n for how, n in coalescer.stats().items() if how in ('leader', 'joined', 'reused')},
+                  ('how',), kind='counter')
+registry.callback('autovibe_admission_inflight', "Admitted vibe requests running", lambda: admission.stats()['inflight'])
+registry.callback('autovibe_admission_queued', "Vibe requests waiting for admission", lambda: admission.stats()['queued'])
+registry.callback('autovibe_admission_rejected_total', "Vibe requests turned away, by status",
+                  lambda: {(str(status),): n for status, n in admission.stats()['rejected'].items()},
+                  ('status',), kind='counter')
 
 @app.route('/',  methods=['GET', 'POST'])
 def hello():
     return jsonify({'ok': 'ok'})
 
+@app.route('/cache', methods=['GET'])
+def cache_stats():
+    """LLM response cache hit/miss counters (AUTOVIBE_LLM_CACHE)."""
+    if not autovibe.llm_cache:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **autovibe.llm_cache.stats()})
+
+@app.route('/coalesce', methods=['GET'])
+def coalesce_stats():
+    """Single-flight counters: leader runs vs requests that joined one in flight / reused a result."""
+    return jsonify(coalescer.stats())
+
+@app.route('/limits', methods=['GET'])
+def limits():
+    """Process-wide slots for LLM calls / pip / script runs: limit, in use, waiting. Plus request admission
+    and the warm executor pool (spawns, startup time saved vs cold) when it's on."""
+    return jsonify({**limits_stats(), 'admission': admission.stats(), 'exec_pool': autovibe.exec_pool_stats()})
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Prometheus text format: requests by outcome, attempts, stage/LLM/pip/exec latency, tokens, caches, slots."""
+    return Response(registry.render(), content_type=CONTENT_TYPE)
+
+@app.route('/stages', methods=['GET'])
+def stage_stats():
+    """Where finished runs spent their time: per stage count/total/mean/max, LLM calls + tokens per model."""
+    return jsonify(run_stats.snapshot())
+
+@app.route('/verdicts', methods=['GET'])
+def verdict_stats():
+    """Stored validation verdicts, grouped by validator model and prompt version."""
+    if not autovibe.verdict_store:
+        return jsonify({'enabled': False})
+    return jsonify({
+        'enabled': True, 
+        'current_prompt_version': autovibe.VALIDATION_PROMPT_VERSION,
+        **autovibe.verdict_store.stats()
+    })
+
+@app.route('/verdicts', methods=['DELETE'])
+def verdict_invalidate():
+    """Drop stored verdicts. Filters (all optional): code_hash, model, prompt_version, stale=true
+    (stale => everything not made with the current validation prompt). No filters => wipe all."""
+    if not autovibe.verdict_store:
+        return jsonify({'enabled': False, 'deleted': 0})
+    
+    data = request.get_json(silent=True) or request.args
+    stale = str(data.get('stale', '')).lower() in ('1', 'true', 'yes')
+    deleted = autovibe.verdict_store.invalidate(
+        code_hash=data.get('code_hash'),
+        model=data.get('model'),
+        version=data.get('prompt_version'),
+        keep_version=autovibe.VALIDATION_PROMPT_VERSION if stale else None,
+    )
+    return jsonify({'enabled': True, 'deleted': deleted})
+
+@app.route('/logs/<log_id>', methods=['GET'])
+def get_log(log_id):
+    """Page through a run's full script output (ToolReturn.log_id).
+    Query: attempt (default 0), stream=stdout|stderr, offset, limit (chars). Follow next_offset until null."""
+    try:
+        page = read_log(
+            log_id,
+            attempt=int(request.args.get('attempt', 0)),
+            stream=request.args.get('stream', 'stdout'),
+            offset=int(request.args.get('offset', 0)),
+            limit=min(int(request.args.get('limit', 64 * 1024)), 1024 * 1024),
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except FileNotFoundError as e:
+        return jsonify({'error': str(e)}), 404
+    return jsonify(page)
+
+def autovibe_options(data: dict) -> dict:
+    """AutoVibe kwargs from a request body, with REST defaults."""
+    return dict(
+        max_retry=data.get('max_retry', 2),
+        auto_check=data.get('auto_check', True),
+        exec_timeout=data.get('exec_timeout', 120),
+        max_risk_level=data.get('max_risk_level', "DENY"),
+        pipeline=data.get('pipeline', True),
+    )
+
+def sse(event: str, payload) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+def overloaded(status: int, retry_after: int):
+    """429 = queue full, 503 = waited queue_timeout without getting a turn."""
+    reason = "too many requests waiting" if status == 429 else "no free slot in time"
+    error_response = ToolReturn(is_error=True, content=f"Error: server busy, {reason}", results=[])
+    response = jsonify(error_response.model_dump())
+    response.status_code = status
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+def admitted(view):
+    """Async vibe endpoints: wait for an admission slot (or get turned away) before doing anything."""
+    @functools.wraps(view)
+    async def wrapper(*args, **kwargs):
+        turned_away = await admission.enter_async()
+        if turned_away:
+            return overloaded(*turned_away)
+        started = time.monotonic()
+        try:
+            return await view(*args, **kwargs)
+        finally:
+            admission.leave(started)
+    return wrapper
+
 @app.route('/autovibe', methods=['POST'])
-def process_autovibe():
+@admitted
+async def process_autovibe():
     try:
         data = request.get_json()
 
@@ -28,25 +172,19 @@ def process_autovibe():
             return jsonify(error_response.model_dump()), 400
 
 
-        max_retry = data.get('max_retry', 2)
-        auto_check = data.get('auto_check', True)
-        exec_timeout = data.get('exec_timeout', 120)
-        max_risk_level = data.get('max_risk_level', "DENY")
-
-        
         # Initialize AutoVibe with the specified parameters
-        autovibe = AutoVibe(
-            max_retry=max_retry,
-            auto_check=auto_check,
-            exec_timeout=exec_timeout,
-            max_risk_level=max_risk_level
-        )
-        
-        # Process the user text (adjust method name based on your AutoVibe API)
-        results: ToolReturn = autovibe.as_tool(content)
+        options = autovibe_options(data)
+        autovibe = AutoVibe(**options)
         
+        # Process the user text; identical request already running => wait for that one instead
+        results, how = await coalescer.do_async(
+            request_key(content, options), 
+            lambda: autovibe.as_tool_async(content)
+        )
         
-        return jsonify(results.model_dump())
+        response = jsonify(results.model_dump())
+        response.headers['X-Autovibe-Coalesced'] = how
+        return response
         
     except Exception as e:
         error_response = ToolReturn(
@@ -56,5 +194,288 @@ def process_autovibe():
         )
         return jsonify(error_response.model_dump()), 500
 
+# ScriptRefused.reason => HTTP status for /scripts/<id>/run
+REFUSAL_STATUS = {'unknown': 404, 'gone': 404, 'not_approved': 403, 'changed': 409, 'bad_args': 400}
+
+def library_entry(script_id: str):
+    """Library entry or a 404 response (also when the library is off)."""
+    entry = autovibe.script_library.get(script_id) if autovibe.script_library else None
+    if not entry:
+        return None, (jsonify({'error': f"Unknown script: {script_id}"}), 404)
+    return entry, None
+
+@app.route('/scripts', methods=['GET'])
+def list_scripts():
+    """Script library: scripts that already worked, most used first. Query: q (matches id / request),
+    approved=1 (only the ones /scripts/<id>/run accepts), limit. Files put in vibe_scripts/ by hand
+    show up after a restart (sync_library)."""
+    if not autovibe.script_library:
+        return jsonify({'enabled': False, 'scripts': []})
+    scripts = autovibe.script_library.list(
+        query=request.args.get('q'),
+        approved_only=request.args.get('approved', '').lower() in ('1', 'true', 'yes'),
+        limit=min(int(request.args.get('limit', 100)), 1000),
+    )
+    return jsonify({'enabled': True, **autovibe.script_library.stats(), 'scripts': scripts})
+
+@app.route('/scripts/<script_id>', methods=['GET'])
+def get_script(script_id):
+    """One library entry plus its code."""
+    entry, missing = library_entry(script_id)
+    if missing:
+        return missing
+    try:
+        code = (SCRIPTS_DIR / entry['filename']).read_text(encoding='utf-8')
+    except OSError:
+        code = None
+    return jsonify({**entry, 'code': code})
+
+@app.route('/scripts/<script_id>/validate', methods=['POST'])
+def review_script(script_id):
+    """Validate the script as it is on disk now (LLM unless a stored verdict covers it); a clean ALLOW approves it."""
+    entry, missing = library_entry(script_id)
+    if missing:
+        return missing
+    try:
+        return jsonify(AutoVibe().review_script(script_id))
+    except OSError as e:
+        return jsonify({'error': str(e)}), 404
+
+@app.route('/scripts/<script_id>/run', methods=['POST'])
+@admitted
+async def run_library_script(script_id):
+    """Run an approved library script directly, no LLM: {"args": [...], "exec_timeout": 120}.
+    404 unknown script / file gone, 403 not approved, 409 changed since review, 400 bad args."""
+    data = request.get_json(silent=True) or {}
+    try:
+        runner = AutoVibe(auto_check=False, exec_timeout=data.get('exec_timeout', 120))
+        results = await runner.run_script_async(script_id, data.get('args') or [])
+    except ScriptRefused as e:
+        error_response = ToolReturn(is_error=True, content=f"Error: {e}", results=[])
+        return jsonify(error_response.model_dump()), REFUSAL_STATUS.get(e.reason, 403)
+    except Exception as e:
+        error_response = ToolReturn(is_error=True, content=f"Error processing request: {str(e)}", results=[])
+        return jsonify(error_response.model_dump()), 500
+    return jsonify(results.model_dump())
+
+def batch_items(data: dict) -> tuple[list[tuple[str, dict]], str | None]:
+    """{"items": ["check port 80", {"content": "...", "max_retry": 3}, ...], <defaults for all items>}
+    => ([(content, AutoVibe kwargs)], error)"""
+    items = data.get('items')
+    if not isinstance(items, list) or not items:
+        return [], "'items' must be a non-empty list"
+    if len(items) > BATCH_MAX_ITEMS:
+        return [], f"too many items: {len(items)} > {BATCH_MAX_ITEMS}"
+
+    defaults = {k: v for k, v in data.items() if k != 'items'}
+    parsed = []
+    for index, item in enumerate(items):
+        item = {'content': item} if isinstance(item, str) else item
+        content = item.get('content', '') if isinstance(item, dict) else ''
+        if not content or not content.strip():
+            return [], f"item {index}: 'content' is required and cannot be empty"
+        parsed.append((content, autovibe_options({**defaults, **item})))
+    return parsed, None
+
+@app.route('/autovibe/batch', methods=['POST'])
+@admitted
+async def process_batch():
+    """Run many vibes concurrently => {"results": [{index, content, started_s, elapsed_s, coalesced, result}], ...}"""
+    items, error = batch_items(request.get_json(silent=True) or {})
+    if error:
+        return jsonify({'error': error}), 400
+    return jsonify(await run_batch(items, coalescer))
+
+@app.route('/autovibe/batch/stream', methods=['POST'])
+def stream_batch():
+    """Batch as Server-Sent Events: one `item` event per finished item (finish order, has its index),
+    then `done` with {elapsed_s, errors, count}."""
+    items, error = batch_items(request.get_json(silent=True) or {})
+    if error:
+        return jsonify({'error': error}), 400
+    if turned_away := admission.enter():
+        return overloaded(*turned_away)
+    started = time.monotonic()
+
+    events = queue.Queue()
+
+    def run():
+        try:
+            summary = asyncio.run(run_batch(items, coalescer, on_item=lambda item: events.put(('item', item))))
+            events.put(('done', {'elapsed_s': summary['elapsed_s'], 'errors': summary['errors'], 'count': len(items)}))
+        except Exception as e:
+            events.put(('done', {'error': f"Error processing batch: {str(e)}", 'count': len(items)}))
+        finally:
+            admission.leave(started)
+        events.put(None)
+
+    threading.Thread(target=run, name='autovibe-batch', daemon=True).start()
+
+    def stream():
+        while (event := events.get()) is not None:
+            yield sse(*event)
+
+    return Response(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+
+def run_job(job_id, content, options, progress) -> ToolReturn:
+    return AutoVibe(**options, on_progress=progress).as_tool(content)
+
+jobs = JobRunner.from_env(run_job)
+
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    """Queue a vibe, answer right away with its id (202). Same body as /autovibe."""
+    data = request.get_json(silent=True) or {}
+    content = data.get('content', '')
+    if not content or content.strip() == '':
+        return jsonify({'error': "'content' field is required and cannot be empty"}), 400
+
+    try:
+        job_id = jobs.submit(content, autovibe_options(data))
+    except QueueFull as e:
+        response = jsonify({'error': f"job queue full: {e}"})
+        response.status_code = 429
+        response.headers['Retry-After'] = str(admission.retry_after())
+        return response
+    return jsonify({'id': job_id, 'status': 'queued', 'url': f"/jobs/{job_id}"}), 202
+
+@app.route('/jobs', methods=['GET'])
+def list_jobs():
+    """Recent jobs (newest first), optional ?status=queued|running|done|failed|interrupted&limit=50."""
+    limit = min(int(request.args.get('limit', 50)), 500)
+    return jsonify({
+        'counts': jobs.store.stats(),
+        'jobs': jobs.store.recent(request.args.get('status'), limit),
+    })
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Status, current stage/attempt, AutoVibeCheck results so far, final ToolReturn once done."""
+    job = jobs.store.get(job_id)
+    if not job:
+        return jsonify({'error': f"no such job: {job_id}"}), 404
+    return jsonify(job)
+
+@app.route('/autovibe/stream', methods=['POST'])
+def stream_autovibe():
+    """Same as /autovibe, but as Server-Sent Events:
+    `output` events ({stream, text}) while scripts run, then one `result` event with the ToolReturn."""
+    data = request.get_json(silent=True) or {}
+    content = data.get('content', '')
+    if not content or content.strip() == '':
+        error_response = ToolReturn(
+            is_error=True,
+            content="Error: 'content' field is required and cannot be empty",
+            results=[]
+        )
+        return jsonify(error_response.model_dump()), 400
+
+    options = autovibe_options(data)
+    if turned_away := admission.enter():
+        return overloaded(*turned_away)
+    started = time.monotonic()
+    events = queue.Queue()
+
+    def run():
+        try:
+            autovibe = AutoVibe(
+                **options, 
+                on_output=lambda stream, text: events.put(('output', {'stream': stream, 'text': text}))
+            )
+            result = autovibe.as_tool(content)
+        except Exception as e:
+            result = ToolReturn(is_error=True, content=f"Error processing request: {str(e)}", results=[])
+        finally:
+            admission.leave(started)
+        events.put(('result', result.model_dump()))
+        events.put(None)
+
+    threading.Thread(target=run, name='autovibe-stream', daemon=True).start()
+
+    def stream():
+        while (event := events.get()) is not None:
+            yield sse(*event)
+
+    return Response(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',  # nginx: don't sit on the chunks
+    })
+
+def sync_library():
+    """Register scripts sitting in vibe_scripts/ that the library doesn't know yet (unapproved until reviewed)."""
+    if autovibe.script_library:
+        print(f"📚 Scripts picked up by the library: {len(autovibe.script_library.sync())}")
+
+def init_worker():
+    """Everything a serving process should have ready before the first request:
+    the shared engine (venv checked once), script library, system info probe, and its share of queued jobs."""
+    VibeEngine.shared()
+    sync_library()
+    # probe the system once in background, so first vibe doesn't wait for it
+    warm_system_info(SCRIPTS_DIR / "venv")
+    print(f"📋 Jobs resumed: {jobs.resume_queued()}")
+
+def serve_production(host: str, port: int, workers: int, threads: int):
+    """gunicorn (gthread) if installed, else waitress, else werkzeug's threaded server (single process)."""
+    print(f"🚀 Production mode on {host}:{port}, {workers} worker(s) x {threads} thread(s), admission {admission.stats()}")
+    # once, before any worker: nobody is running anything yet
+    print(f"📋 Jobs interrupted by the restart: {jobs.mark_interrupted()}")
+    if importlib.util.find_spec('gunicorn'):
+        # exec instead of fork-from-here: each worker imports this module fresh (own sqlite handles,
+        # thread pools, engine) and runs init_worker() on import
+        os.environ['AUTOVIBE_SERVER_WORKER'] = '1'
+        os.execv(sys.executable, [
+            sys.executable, '-m', 'gunicorn', 'serv_rest:app',
+            '--pythonpath', os.path.dirname(os.path.abspath(__file__)),
+            '--bind', f"{host}:{port}",
+            '--workers', str(workers),
+            '--threads', str(threads),
+            '--worker-class', 'gthread',
+            # a vibe may legitimately take minutes (retries x exec_timeout)
+            '--timeout', os.environ.get('AUTOVIBE_WORKER_TIMEOUT') or '900',
+            '--graceful-timeout', '30',
+        ])
+
+    init_worker()
+    if workers > 1:
+        print(f"⚠️ gunicorn not installed, serving from a single process (asked for {workers} workers)")
+    try:
+        from waitress import serve
+        serve(app, host=host, port=port, threads=threads, channel_timeout=900)
+    except ImportError:
+        from werkzeug.serving import run_simple
+        print("⚠️ neither gunicorn nor waitress installed, using werkzeug's threaded server")
+        run_simple(host, port, app, threaded=True)
+
+if os.environ.get('AUTOVIBE_SERVER_WORKER') == '1' and __name__ != '__main__':
+    init_worker()
+
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=51551)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="AutoVibe REST server")
+    parser.add_argument('--prod', action='store_true', default=os.environ.get('AUTOVIBE_SERVER_MODE') == 'prod',
+                        help="production server: several workers, no debugger/reloader (AUTOVIBE_SERVER_MODE=prod)")
+    parser.add_argument('--host', default=os.environ.get('AUTOVIBE_HOST') or '0.0.0.0')
+    parser.add_argument('--port', type=int, default=int(os.environ.get('AUTOVIBE_PORT') or 51551))
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('AUTOVIBE_WORKERS') or 2),
+                        help="processes (gunicorn only), AUTOVIBE_WORKERS")
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('AUTOVIBE_THREADS') or 0),
+                        help="threads per process, AUTOVIBE_THREADS (default: enough for max inflight + queued)")
+    args = parser.parse_args()
+
+    if args.prod:
+        # every admitted or queued request holds a thread while it waits, plus a few for /jobs, /limits, ...
+        threads = args.threads or admission.slots.limit + admission.max_queued + 4
+        serve_production(args.host, args.port, args.workers, threads)
+        sys.exit(0)
+
+    # probe the system once in background, so first vibe doesn't wait for it
+    warm_system_info(SCRIPTS_DIR / "venv")
+    debug = True
+    # with the debug reloader this file runs twice, only the serving child should pick jobs back up
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        print(f"📋 Jobs after restart: {jobs.recover()}")
+        sync_library()
+    app.run(debug=debug, host=args.host, port=args.port)
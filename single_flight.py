@@ -0,0 +1,132 @@
+"""
+Single-flight for vibe requests: identical requests arriving while one is running attach to it
+instead of starting their own generate/validate/run loop, and all get the same ToolReturn.
+
+Key = normalized content (trimmed, whitespace collapsed) + the options that change the outcome.
+Optional reuse window: AUTOVIBE_COALESCE_TTL=<seconds> also hands out a finished, successful
+result to identical requests arriving shortly after (errors are never reused, a retry should retry).
+
+Works across threads and event loops (Flask runs each async view in its own loop): the shared
+result is a concurrent.futures.Future, async callers await it through asyncio.wrap_future.
+A leader that gets cancelled (its client went away) doesn't take the joiners down with it: they
+start over and one of them leads. Joiners only see a cancellation when they are cancelled themselves.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+# how a caller got its result
+LEADER = 'leader'
+JOINED = 'joined'
+REUSED = 'reused'
+
+
+class LeaderCancelled(Exception):
+    """Set on the shared future when the leader was cancelled: joiners claim again instead of failing."""
+
+
+def normalize_request(content: str) -> str:
+    return ' '.join(content.split())
+
+
+def request_key(content: str, options: dict) -> str:
+    material = json.dumps({'content': normalize_request(content), 'options': options}, sort_keys=True, default=str)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+class SingleFlight:
+    def __init__(self, reuse_ttl: float = 0.0):
+        self.reuse_ttl = reuse_ttl
+        self.lock = threading.Lock()
+        self.in_flight: dict[str, Future] = {}
+        self.finished: dict[str, tuple[float, object]] = {}  # key => (expires, result)
+        self.counts = {LEADER: 0, JOINED: 0, REUSED: 0}
+
+    @classmethod
+    def from_env(cls):
+        return cls(reuse_ttl=float(os.environ.get('AUTOVIBE_COALESCE_TTL') or 0))
+
+    def claim(self, key: str) -> tuple[str, Future | object]:
+        """(LEADER, fresh future to fill) | (JOINED, future of the running one) | (REUSED, result)."""
+        now = time.monotonic()
+        with self.lock:
+            for old in [k for k, (expires, _) in self.finished.items() if expires <= now]:
+                del self.finished[old]
+            if key in self.finished:
+                self.counts[REUSED] += 1
+                return REUSED, self.finished[key][1]
+            if key in self.in_flight:
+                self.counts[JOINED] += 1
+                return JOINED, self.in_flight[key]
+            future = Future()
+            self.in_flight[key] = future
+            self.counts[LEADER] += 1
+            return LEADER, future
+
+    def settle(self, key: str, future: Future, result=None, error: BaseException = None):
+        with self.lock:
+            self.in_flight.pop(key, None)
+            if error is None and self.reuse_ttl > 0 and not getattr(result, 'is_error', False):
+                self.finished[key] = (time.monotonic() + self.reuse_ttl, result)
+        if error is None:
+            future.set_result(result)
+        else:
+            future.set_exception(error)
+
+    def do(self, key: str, fn) -> tuple[object, str]:
+        """Run fn() unless an identical call is running / was just done. -> (result, how)."""
+        while True:
+            how, claimed = self.claim(key)
+            if how == REUSED:
+                return claimed, how
+            if how != JOINED:
+                break
+            try:
+                return claimed.result(), how
+            except LeaderCancelled:
+                continue
+        try:
+            result = fn()
+        except BaseException as e:
+            self.settle(key, claimed, error=e)
+            raise
+        self.settle(key, claimed, result)
+        return result, how
+
+    async def do_async(self, key: str, coro_fn) -> tuple[object, str]:
+        """Async do(): coro_fn() is awaited by the leader only."""
+        while True:
+            how, claimed = self.claim(key)
+            if how == REUSED:
+                return claimed, how
+            if how != JOINED:
+                break
+            try:
+                # shielded: one joiner going away must not cancel the shared future for everybody
+                return await asyncio.shield(asyncio.wrap_future(claimed)), how
+            except LeaderCancelled:
+                continue
+        try:
+            result = await coro_fn()
+        except asyncio.CancelledError:
+            self.settle(key, claimed, error=LeaderCancelled())
+            raise
+        except BaseException as e:
+            self.settle(key, claimed, error=e)
+            raise
+        self.settle(key, claimed, result)
+        return result, how
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                'in_flight': len(self.in_flight),
+                'reuse_ttl': self.reuse_ttl,
+                'reusable': len(self.finished),
+                **self.counts,
+            }
@@ -2,25 +2,156 @@ import os
 import sys
 import platform
 import shutil
-import subprocess
+import re
+import sysconfig
+import threading
+import importlib.metadata
+import time
 from pathlib import Path
 from datetime import datetime
 
-def get_python_packages():
-    """Get installed Python packages."""
+# how long a system snapshot stays fresh, seconds (env override for long-lived servers)
+SYSTEM_INFO_TTL = float(os.environ.get('AUTOVIBE_SYSINFO_TTL', 300))
+
+# site-packages dir => (mtime_ns, {name: version}); pip touches the dir on every install/uninstall
+_packages_cache = {}
+_packages_lock = threading.Lock()
+
+def normalize_package_name(name):
+    """PEP 503 normalized name: 'Foo_Bar.baz' => 'foo-bar-baz'."""
+    return re.sub(r'[-_.]+', '-', name).lower()
+
+def get_venv_packages(venv_dir=None):
+    """{normalized name: version} read from dist-info metadata on disk, no pip process.
+    venv_dir=None => packages of the interpreter running us."""
+    if venv_dir is None:
+        site_dirs = [Path(sysconfig.get_paths()['purelib'])]
+    else:
+        site_dirs = venv_site_packages(venv_dir)
+    
+    packages = {}
+    for site in site_dirs:
+        try:
+            mtime = site.stat().st_mtime_ns
+        except OSError:
+            continue
+        with _packages_lock:
+            cached = _packages_cache.get(str(site))
+        if cached and cached[0] == mtime:
+            packages.update(cached[1])
+            continue
+        
+        found = {}
+        for dist in importlib.metadata.distributions(path=[str(site)]):
+            name = dist.metadata['Name']
+            if name:
+                found.setdefault(normalize_package_name(name), dist.version)
+        with _packages_lock:
+            _packages_cache[str(site)] = (mtime, found)
+        packages.update(found)
+    
+    return packages
+
+# site-packages dir => (mtime_ns, {top level import names})
+_imports_cache = {}
+
+def get_venv_import_names(venv_dir):
+    """Top level names importable from the venv's site-packages (packages, modules, extensions),
+    cached by dir mtime like get_venv_packages."""
+    names = set()
+    for site in venv_site_packages(venv_dir):
+        try:
+            mtime = site.stat().st_mtime_ns
+        except OSError:
+            continue
+        with _packages_lock:
+            cached = _imports_cache.get(str(site))
+        if cached and cached[0] == mtime:
+            names |= cached[1]
+            continue
+
+        found = set()
+        with os.scandir(site) as entries:
+            for entry in entries:
+                name, _, suffix = entry.name.partition('.')
+                if not name.isidentifier():
+                    continue
+                if entry.is_dir() and not suffix:
+                    found.add(name)
+                elif suffix == 'py' or suffix.endswith(('so', 'pyd')):
+                    found.add(name)
+        with _packages_lock:
+            _imports_cache[str(site)] = (mtime, found)
+        names |= found
+    return names
+
+def get_python_packages(venv_dir=None):
+    """Get installed Python packages (names) of the venv scripts actually run in."""
     try:
-        result = subprocess.run([sys.executable, '-m', 'pip', 'list'], 
-                              capture_output=True, text=True, timeout=10)
-        if result.returncode == 0:
-            lines = result.stdout.strip().split('\n')[2:]  # Skip header
-            return [line.split()[0] for line in lines if line.strip()][:20]  # Top 20
-    except:
-        pass
-    return []
-
-def categorize_commands():
+        return sorted(get_venv_packages(venv_dir))
+    except Exception:
+        return []
+
+# Define patterns for categorization
+COMMAND_PATTERNS = {
+    'Development Tools': ['python', 'node', 'npm', 'java', 'javac', 'gcc', 'g++', 'make', 'cmake', 'dotnet', 'go', 'rust', 'cargo', 'ruby', 'php', 'perl', 'R', 'scala', 'kotlin'],
+    'Version Control': ['git', 'svn', 'hg', 'bzr', 'cvs'],
+    'Package Managers': ['pip', 'conda', 'npm', 'yarn', 'brew', 'choco', 'apt', 'yum', 'pacman', 'gem', 'composer'],
+    'Network Tools': ['curl', 'wget', 'ssh', 'scp', 'rsync', 'ping', 'traceroute', 'nslookup', 'dig', 'netstat', 'telnet', 'ftp', 'sftp'],
+    'System Tools': ['ps', 'top', 'htop', 'kill', 'killall', 'df', 'du', 'mount', 'umount', 'lsof', 'netstat', 'systemctl', 'service'],
+    'Text/File Tools': ['grep', 'sed', 'awk', 'sort', 'uniq', 'head', 'tail', 'cat', 'less', 'more', 'vim', 'nano', 'emacs', 'code', 'subl'],
+    'Databases': ['mysql', 'psql', 'sqlite3', 'mongo', 'redis-cli', 'influx'],
+    'Cloud/DevOps': ['docker', 'kubectl', 'helm', 'terraform', 'ansible', 'vagrant', 'aws', 'gcloud', 'azure', 'heroku'],
+    'Multimedia': ['ffmpeg', 'convert', 'gimp', 'inkscape', 'vlc']
+}
+
+def scan_path_executables(path_dirs=None):
+    """One pass over PATH => {command name: full path} of executables.
+    First dir wins, same as shutil.which. On Windows names are indexed without PATHEXT suffix too."""
+    if path_dirs is None:
+        path_dirs = os.environ.get('PATH', '').split(os.pathsep)
+    
+    pathext = set()
+    if os.name == 'nt':
+        pathext = {ext.lower() for ext in os.environ.get('PATHEXT', '.COM;.EXE;.BAT;.CMD').split(';') if ext}
+    
+    index = {}
+    seen_dirs = set()
+    for path_dir in path_dirs:
+        if not path_dir or path_dir in seen_dirs:
+            continue
+        seen_dirs.add(path_dir)
+        try:
+            with os.scandir(path_dir) as entries:
+                for entry in entries:
+                    try:
+                        if not entry.is_file():  # follows symlinks, like which()
+                            continue
+                    except OSError:
+                        continue
+                    name = entry.name.lower()
+                    if pathext:
+                        root, ext = os.path.splitext(name)
+                        if ext not in pathext:
+                            continue
+                        names = (name, root)
+                    else:
+                        names = (name,)
+                    if all(n in index for n in names):
+                        continue
+                    if not os.access(entry.path, os.X_OK):
+                        continue
+                    for n in names:
+                        index.setdefault(n, entry.path)
+        except (PermissionError, OSError):
+            continue
+    
+    return index
+
+def categorize_commands(index=None):
     """Categorize available commands by type."""
-    path_dirs = os.environ.get('PATH', '').split(os.pathsep)
+    if index is None:
+        index = scan_path_executables()
     
     categories = {
         'Development Tools': set(),
@@ -35,36 +166,14 @@ def categorize_commands():
         'Other Tools': set()
     }
     
-    # Define patterns for categorization
-    patterns = {
-        'Development Tools': ['python', 'node', 'npm', 'java', 'javac', 'gcc', 'g++', 'make', 'cmake', 'dotnet', 'go', 'rust', 'cargo', 'ruby', 'php', 'perl', 'R', 'scala', 'kotlin'],
-        'Version Control': ['git', 'svn', 'hg', 'bzr', 'cvs'],
-        'Package Managers': ['pip', 'conda', 'npm', 'yarn', 'brew', 'choco', 'apt', 'yum', 'pacman', 'gem', 'composer'],
-        'Network Tools': ['curl', 'wget', 'ssh', 'scp', 'rsync', 'ping', 'traceroute', 'nslookup', 'dig', 'netstat', 'telnet', 'ftp', 'sftp'],
-        'System Tools': ['ps', 'top', 'htop', 'kill', 'killall', 'df', 'du', 'mount', 'umount', 'lsof', 'netstat', 'systemctl', 'service'],
-        'Text/File Tools': ['grep', 'sed', 'awk', 'sort', 'uniq', 'head', 'tail', 'cat', 'less', 'more', 'vim', 'nano', 'emacs', 'code', 'subl'],
-        'Databases': ['mysql', 'psql', 'sqlite3', 'mongo', 'redis-cli', 'influx'],
-        'Cloud/DevOps': ['docker', 'kubectl', 'helm', 'terraform', 'ansible', 'vagrant', 'aws', 'gcloud', 'azure', 'heroku'],
-        'Multimedia': ['ffmpeg', 'convert', 'gimp', 'inkscape', 'vlc']
-    }
     
-    # Scan PATH for executables
-    found_commands = set()
-    for path_dir in path_dirs:
-        try:
-            path_obj = Path(path_dir)
-            if path_obj.exists() and path_obj.is_dir():
-                for file in path_obj.iterdir():
-                    if file.is_file() and os.access(file, os.X_OK):
-                        cmd_name = file.stem.lower()  # Remove extension
-                        found_commands.add(cmd_name)
-        except (PermissionError, OSError):
-            continue
+    # PATH was scanned once into index, every lookup below is a dict hit
+    found_commands = set(index)
     
     # Categorize found commands
-    for category, cmd_list in patterns.items():
+    for category, cmd_list in COMMAND_PATTERNS.items():
         for cmd in cmd_list:
-            if cmd.lower() in found_commands or shutil.which(cmd):
+            if cmd.lower() in found_commands:
                 categories[category].add(cmd)
     
     # Find uncategorized commands (limit to avoid spam)
@@ -106,19 +215,10 @@ def get_key_paths():
     
     return paths
 
-def system_info():
-    """Returns comprehensive but focused system information."""
-    
-    # Get current time
-    current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+def system_snapshot(venv_dir=None):
+    """Probe the box: OS, python, key paths, installed tools and venv packages. Slow-ish, cache it."""
     
     info = f"""
-═══════════════════════════════════════════════════════════════
-                        SYSTEM OVERVIEW
-═══════════════════════════════════════════════════════════════
-
-🕐 Current Time: {current_time}
-
 🖥️  Operating System:
    Platform: {platform.system()} {platform.release()} ({platform.machine()})
    Version:  {platform.version()}
@@ -136,7 +236,8 @@ def system_info():
         info += f"\n   {name:<20}: {path}"
     
     info += "\n\n🛠️  Installed Tools & Commands:"
-    categories = categorize_commands()
+    index = scan_path_executables()
+    categories = categorize_commands(index)
     
     for category, commands in categories.items():
         if commands:  # Only show categories with found commands
@@ -146,12 +247,111 @@ def system_info():
                 if i % 6 == 0:
                     info += "\n     "
                 # Check if command actually exists and add indicator
-                status = "✅" if shutil.which(cmd) else "❓"
+                status = "✅" if cmd.lower() in index else "❓"
                 info += f"{status}{cmd:<12}"
     
+    if venv_dir is not None:
+        packages = get_venv_packages(venv_dir)
+        info += f"\n\n📦 Python packages available to scripts (venv: {venv_dir}):"
+        if packages:
+            shown = sorted(packages.items())[:60]
+            for i, (name, version) in enumerate(shown):
+                if i % 4 == 0:
+                    info += "\n     "
+                info += f"{name}=={version}  "
+            if len(packages) > len(shown):
+                info += f"\n     ... +{len(packages) - len(shown)} more"
+        else:
+            info += "\n     (none yet, list them in requirements)"
+    
+    return info.strip()
+
+def render_system_info(snapshot):
+    """Wrap a snapshot with the header and current time (time is never cached)."""
     
+    # Get current time
+    current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    
+    info = f"""
+═══════════════════════════════════════════════════════════════
+                        SYSTEM OVERVIEW
+═══════════════════════════════════════════════════════════════
+
+🕐 Current Time: {current_time}
+
+{snapshot}
+"""
     return info.strip()
 
+def system_info():
+    """Returns comprehensive but focused system information."""
+    return render_system_info(system_snapshot())
+
+
+# ---- process-wide snapshot cache ----
+# code_gen_system runs on every generate/repair, the probe does not need to.
+
+_snapshot_cache = {'key': None, 'snapshot': None, 'taken_at': 0.0}
+_snapshot_lock = threading.Lock()
+
+def venv_site_packages(venv_dir):
+    """site-packages dirs of a venv (Lib/ on Windows, lib/pythonX.Y/ elsewhere)."""
+    if not venv_dir:
+        return []
+    venv_dir = Path(venv_dir)
+    if os.name == 'nt':
+        candidates = [venv_dir / 'Lib' / 'site-packages']
+    else:
+        candidates = sorted(venv_dir.glob('lib/python*/site-packages'))
+    return [p for p in candidates if p.is_dir()]
+
+def _snapshot_key(venv_dir=None):
+    """Anything that changes this makes the snapshot stale: PATH and the venv package set."""
+    stamps = []
+    for site in venv_site_packages(venv_dir):
+        try:
+            # pip install/uninstall adds or removes dist-info dirs => dir mtime moves
+            stamps.append((str(site), site.stat().st_mtime_ns))
+        except OSError:
+            continue
+    return (os.environ.get('PATH', ''), tuple(stamps))
+
+def cached_system_info(venv_dir=None, ttl=None):
+    """system_info(), but the probe is reused until TTL runs out or PATH/venv changes."""
+    ttl = SYSTEM_INFO_TTL if ttl is None else ttl
+    key = _snapshot_key(venv_dir)
+    
+    with _snapshot_lock:
+        fresh = (
+            _snapshot_cache['snapshot'] is not None
+            and _snapshot_cache['key'] == key
+            and time.monotonic() - _snapshot_cache['taken_at'] < ttl
+        )
+        if not fresh:
+            _snapshot_cache['snapshot'] = system_snapshot(venv_dir)
+            _snapshot_cache['key'] = key
+            _snapshot_cache['taken_at'] = time.monotonic()
+        snapshot = _snapshot_cache['snapshot']
+    
+    return render_system_info(snapshot)
+
+def invalidate_system_info():
+    """Drop the cached snapshot, next call probes again."""
+    with _snapshot_lock:
+        _snapshot_cache['snapshot'] = None
+        _snapshot_cache['key'] = None
+
+def warm_system_info(venv_dir=None):
+    """Take the first snapshot in a background thread, so first request doesn't pay for it."""
+    thread = threading.Thread(
+        target=cached_system_info, 
+        kwargs={'venv_dir': venv_dir}, 
+        name='system-info-warmup', 
+        daemon=True
+    )
+    thread.start()
+    return thread
+
 def quick_command_check(commands):
     """Quick check for specific commands."""
     print("\n🔍 Quick Command Check:")
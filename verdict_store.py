@@ -0,0 +1,108 @@
+"""
+Validation verdicts by script hash: byte-identical code => same ValidationResult, no LLM call.
+
+Key = (full md5 of code, validator model, prompt version). Prompt version is a hash of the
+validation prompt, so editing the policy text naturally stops old verdicts from matching.
+Use invalidate() / DELETE /verdicts to drop verdicts by hand (e.g. policy changed elsewhere).
+
+On by default; AUTOVIBE_VERDICT_STORE=0 turns it off, =/path/file.sqlite3 moves it.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_PATH = Path("./vibe_scripts/verdicts.sqlite3")
+
+
+def prompt_version(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:12]
+
+
+class VerdictStore:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS verdicts (
+                code_hash TEXT NOT NULL,
+                model TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                verdict TEXT NOT NULL,
+                created REAL NOT NULL,
+                PRIMARY KEY (code_hash, model, prompt_version)
+            )
+        """)
+        self.db.commit()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls):
+        """VerdictStore unless AUTOVIBE_VERDICT_STORE says off."""
+        setting = os.environ.get('AUTOVIBE_VERDICT_STORE', '1').strip()
+        if setting.lower() in ('', '0', 'false', 'no', 'off'):
+            return None
+        path = DEFAULT_PATH if setting.lower() in ('1', 'true', 'yes', 'on') else Path(setting)
+        return cls(path)
+
+    def get(self, schema, code_hash: str, model: str, version: str):
+        with self.lock:
+            row = self.db.execute(
+                "SELECT verdict FROM verdicts WHERE code_hash = ? AND model = ? AND prompt_version = ?",
+                (code_hash, model, version)
+            ).fetchone()
+            if row:
+                try:
+                    verdict = schema.model_validate_json(row[0])
+                    self.hits += 1
+                    return verdict
+                except ValueError:
+                    pass
+            self.misses += 1
+        return None
+
+    def put(self, code_hash: str, model: str, version: str, verdict):
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO verdicts VALUES (?, ?, ?, ?, ?)",
+                (code_hash, model, version, verdict.model_dump_json(), time.time())
+            )
+            self.db.commit()
+
+    def invalidate(self, code_hash: str = None, model: str = None, version: str = None, keep_version: str = None) -> int:
+        """Delete verdicts matching all given filters (no filters => everything).
+        keep_version drops every verdict NOT made under that prompt version. Returns rows deleted."""
+        where, params = [], []
+        for column, value in (('code_hash', code_hash), ('model', model), ('prompt_version', version)):
+            if value:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if keep_version:
+            where.append("prompt_version != ?")
+            params.append(keep_version)
+
+        sql = "DELETE FROM verdicts" + (" WHERE " + " AND ".join(where) if where else "")
+        with self.lock:
+            deleted = self.db.execute(sql, params).rowcount
+            self.db.commit()
+        return deleted
+
+    def stats(self) -> dict:
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT model, prompt_version, COUNT(*) FROM verdicts GROUP BY model, prompt_version"
+            ).fetchall()
+        return {
+            'path': str(self.path),
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': [{'model': m, 'prompt_version': v, 'count': n} for m, v, n in rows],
+        }